@@ -13,4 +13,23 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from users.providers import aclose_provider  # noqa: E402 (depende dos apps carregados)
+
+
+async def application(scope, receive, send):
+    """
+    Aplicação Django com o protocolo de lifespan do servidor ASGI (que o Django não trata):
+    no desligamento, fecha os clientes HTTP assíncronos dos provedores de login social.
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await aclose_provider()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
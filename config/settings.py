@@ -140,7 +140,7 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -209,6 +209,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploads e arquivos gerados (fotos de perfil, PDFs das exportações em segundo plano)
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -248,3 +252,28 @@ CORS_ALLOW_METHODS = [
 ]
 
 STRIPE_SECRET_KEY = os.getenv('STRIPE_WEBHOOK_SECRET')
+
+LIFE_PLAN_EXPORT_WORKERS = int(os.getenv('LIFE_PLAN_EXPORT_WORKERS', 2))
+LIFE_PLAN_EXPORT_JOB_TIMEOUT = int(os.getenv('LIFE_PLAN_EXPORT_JOB_TIMEOUT', 600))
+LIFE_PLAN_RENDER_CACHE_BYTES = int(os.getenv('LIFE_PLAN_RENDER_CACHE_BYTES', 64 * 1024 * 1024))
+LIFE_PLAN_CONTENT_HASH_CACHE_SIZE = int(os.getenv('LIFE_PLAN_CONTENT_HASH_CACHE_SIZE', 1024))
+LIFE_PLAN_MONTE_CARLO_WORKERS = int(os.getenv('LIFE_PLAN_MONTE_CARLO_WORKERS', 0))
+LIFE_PLAN_IMPORT_BATCH_SIZE = int(os.getenv('LIFE_PLAN_IMPORT_BATCH_SIZE', 1000))
+
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', 60))
+TOKEN_AUTH_SHARED_CACHE = os.getenv('TOKEN_AUTH_SHARED_CACHE') or None
+TOKEN_AUTH_SHARED_CACHE_TTL = int(os.getenv('TOKEN_AUTH_SHARED_CACHE_TTL', 300))
+AUTH_TOKEN_TTL = int(os.getenv('AUTH_TOKEN_TTL', 30 * 24 * 3600))
+TOKEN_REVOCATION_REFRESH = int(os.getenv('TOKEN_REVOCATION_REFRESH', 5))
+AUTH_TOKEN_REVOKED_RETENTION = int(os.getenv('AUTH_TOKEN_REVOKED_RETENTION', 7 * 24 * 3600))
+
+SOCIAL_AUTH_IDENTITY_PROVIDER = os.getenv('SOCIAL_AUTH_IDENTITY_PROVIDER', 'users.providers.HttpIdentityProvider')
+SOCIAL_AUTH_HTTP_TIMEOUT = (
+    float(os.getenv('SOCIAL_AUTH_HTTP_CONNECT_TIMEOUT', 3.05)),
+    float(os.getenv('SOCIAL_AUTH_HTTP_READ_TIMEOUT', 5)),
+)
+SOCIAL_AUTH_HTTP_POOL_SIZE = int(os.getenv('SOCIAL_AUTH_HTTP_POOL_SIZE', 20))
+SOCIAL_AUTH_STUB_DELAY = float(os.getenv('SOCIAL_AUTH_STUB_DELAY', 0))
+SOCIAL_IDENTITY_CACHE_TTL = int(os.getenv('SOCIAL_IDENTITY_CACHE_TTL', 300))
+GOOGLE_JWKS_CACHE_TTL = int(os.getenv('GOOGLE_JWKS_CACHE_TTL', 3600))
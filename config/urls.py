@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import include, path
 from users.api.viewsets import CustomPasswordResetConfirmViewAPI, PasswordResetRequest, UserRegistrationView
-from users.token import CombinedLoginView
+from users.async_views import AsyncCombinedLoginView, AsyncSocialRegisterView
+from users.token import CombinedLoginView, LogoutView, RotateTokenView
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -14,7 +15,11 @@ API_PREFIX = "api/v1/"
 urlpatterns += [
     path(f"{API_PREFIX}", include("routes.api_router"), name="api"),
     path(f"{API_PREFIX}rest-auth/login/", CombinedLoginView.as_view(), name="auth-token"),
+    path(f"{API_PREFIX}rest-auth/logout/", LogoutView.as_view(), name="auth-logout"),
+    path(f"{API_PREFIX}rest-auth/token/rotate/", RotateTokenView.as_view(), name="auth-token-rotate"),
     path(f'{API_PREFIX}register/', UserRegistrationView.as_view(), name='user-registration'),
+    path(f"{API_PREFIX}async/rest-auth/login/", AsyncCombinedLoginView.as_view(), name="auth-token-async"),
+    path(f"{API_PREFIX}async/register/social/", AsyncSocialRegisterView.as_view(), name="user-registration-social-async"),
     
     path(
         f"{API_PREFIX}password_reset/",
@@ -1,5 +1,8 @@
+from collections import defaultdict
 from django.contrib import admin
-from .models import LifePlan, LifePlanItem
+from django.db.models import Sum
+from .models import LifePlan, LifePlanGoalProgress, LifePlanItem, LifePlanMonthlySummary
+from .rollups import items_changed
 
 class LifePlanItemInline(admin.TabularInline):
     model = LifePlanItem
@@ -39,7 +42,11 @@ class LifePlanAdmin(admin.ModelAdmin):
     get_total_lucro_prejuizo.short_description = 'Total Lucro/Prejuízo'
 
     def get_category_total(self, obj, category):
-        return sum(item.value for item in obj.items.filter(category=category))
+        return obj.monthly_summaries.filter(category=category).aggregate(total=Sum('total_value'))['total'] or 0
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        items_changed(form.instance.id)
 
 class LifePlanItemAdmin(admin.ModelAdmin):
     list_display = (
@@ -48,5 +55,48 @@ class LifePlanItemAdmin(admin.ModelAdmin):
     search_fields = ('life_plan__user__email', 'life_plan__user__username', 'name')
     list_filter = ('category', 'date', 'created_at')
 
+    def save_model(self, request, obj, form, change):
+        previous = (
+            LifePlanItem.objects.filter(pk=obj.pk).values('life_plan_id', 'date', 'category', 'name').first()
+            if change else None
+        )
+        super().save_model(request, obj, form, change)
+        dates, keys = [obj.date], [(obj.category, obj.name)]
+        if previous:
+            previous_key = (previous['category'], previous['name'])
+            if previous['life_plan_id'] != obj.life_plan_id:
+                items_changed(previous['life_plan_id'], [previous['date']], [previous_key])
+            else:
+                dates.append(previous['date'])
+                keys.append(previous_key)
+        items_changed(obj.life_plan_id, dates, keys)
+
+    def delete_model(self, request, obj):
+        life_plan_id, date, key = obj.life_plan_id, obj.date, (obj.category, obj.name)
+        super().delete_model(request, obj)
+        items_changed(life_plan_id, [date], [key])
+
+    def delete_queryset(self, request, queryset):
+        touched_dates = defaultdict(set)
+        touched_keys = defaultdict(set)
+        for life_plan_id, date, category, name in queryset.values_list('life_plan_id', 'date', 'category', 'name'):
+            touched_dates[life_plan_id].add(date)
+            touched_keys[life_plan_id].add((category, name))
+        super().delete_queryset(request, queryset)
+        for life_plan_id, dates in touched_dates.items():
+            items_changed(life_plan_id, dates, touched_keys[life_plan_id])
+
+class LifePlanMonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ('life_plan', 'month', 'category', 'total_value', 'total_meta', 'item_count')
+    search_fields = ('life_plan__user__email', 'life_plan__user__username')
+    list_filter = ('category', 'month')
+
+class LifePlanGoalProgressAdmin(admin.ModelAdmin):
+    list_display = ('life_plan', 'category', 'name', 'cumulative_value', 'meta', 'percent', 'projected_completion')
+    search_fields = ('life_plan__user__email', 'life_plan__user__username', 'name')
+    list_filter = ('category',)
+
 admin.site.register(LifePlan, LifePlanAdmin)
 admin.site.register(LifePlanItem, LifePlanItemAdmin)
+admin.site.register(LifePlanMonthlySummary, LifePlanMonthlySummaryAdmin)
+admin.site.register(LifePlanGoalProgress, LifePlanGoalProgressAdmin)
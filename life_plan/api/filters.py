@@ -0,0 +1,23 @@
+from django_filters import rest_framework as filters
+from life_plan.models import LifePlanItem
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    pass
+
+
+class LifePlanItemFilter(filters.FilterSet):
+    """
+    Filtros da listagem de itens: plano, categorias (separadas por vírgula),
+    intervalo de datas, ano e nome.
+    """
+    life_plan = filters.NumberFilter(field_name='life_plan_id')
+    category = CharInFilter(field_name='category', lookup_expr='in')
+    date_from = filters.DateFilter(field_name='date', lookup_expr='gte')
+    date_to = filters.DateFilter(field_name='date', lookup_expr='lte')
+    year = filters.NumberFilter(field_name='date', lookup_expr='year')
+    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+
+    class Meta:
+        model = LifePlanItem
+        fields = ['life_plan', 'category', 'date_from', 'date_to', 'year', 'name']
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class LifePlanItemCursorPagination(CursorPagination):
+    """Paginação por cursor em (data, id), estável mesmo com inserções entre páginas."""
+    ordering = ('date', 'id')
+    page_size = 200
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -1,8 +1,13 @@
 from rest_framework import serializers
-from life_plan.models import LifePlan, LifePlanItem
-from datetime import datetime
-from collections import defaultdict
-from decimal import Decimal
+from life_plan.models import LifePlan, LifePlanExportJob, LifePlanGoalProgress, LifePlanItem
+from life_plan.bulk import ITEM_CATEGORIES, create_plan_items, item_rows_from_payload, reconcile_plan_items
+from datetime import date, datetime
+from life_plan.rollups import month_start, next_month, profit_loss_by_month
+from life_plan.projection import INVESTMENT_CATEGORIES, MAX_PROJECTION_YEARS, PROJECTION_CATEGORIES
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Sum
 
 
 class LifePlanItemSerializer(serializers.ModelSerializer):
@@ -13,6 +18,179 @@ class LifePlanItemSerializer(serializers.ModelSerializer):
         fields = ['category', 'name', 'value', 'date', 'meta']
 
 
+class LifePlanGoalProgressSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LifePlanGoalProgress
+        fields = [
+            'category', 'name', 'cumulative_value', 'meta', 'percent', 'item_count',
+            'first_month', 'last_month', 'projected_completion', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class LifePlanCellOperationSerializer(serializers.Serializer):
+    OPERATION_CHOICES = ['upsert', 'delete']
+
+    op = serializers.ChoiceField(choices=OPERATION_CHOICES, default='upsert')
+    category = serializers.ChoiceField(choices=sorted(ITEM_CATEGORIES))
+    name = serializers.CharField(max_length=100)
+    month = serializers.DateField(input_formats=['%Y-%m', '%Y-%m-%d'])
+    value = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    meta = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+
+    def validate_month(self, value):
+        return value.replace(day=1)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'upsert' and attrs.get('value') is None:
+            raise serializers.ValidationError({"value": "O valor é obrigatório para upsert."})
+        return attrs
+
+
+class LifePlanCellBatchSerializer(serializers.Serializer):
+    operations = LifePlanCellOperationSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class LifePlanRollForwardSerializer(serializers.Serializer):
+    source_year = serializers.IntegerField(min_value=1900, max_value=9999)
+    target_year = serializers.IntegerField(min_value=1900, max_value=9999)
+    adjustments = serializers.DictField(
+        child=serializers.DecimalField(max_digits=6, decimal_places=2, min_value=-100, max_value=1000),
+        required=False,
+        default=dict,
+        help_text="Ajuste percentual por categoria, ex.: {\"custos\": 4.5}.",
+    )
+    replace = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs['source_year'] == attrs['target_year']:
+            raise serializers.ValidationError({"target_year": "O ano de destino deve ser diferente do ano de origem."})
+        return attrs
+
+
+class LifePlanCloneSerializer(serializers.Serializer):
+    user = serializers.PrimaryKeyRelatedField(queryset=get_user_model().objects.all())
+    name = serializers.CharField(max_length=100, required=False)
+
+    def validate_user(self, value):
+        if LifePlan.objects.filter(user=value).exists():
+            raise serializers.ValidationError("Este usuário já possui um plano de vida.")
+        return value
+
+
+class LifePlanImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    partial = serializers.BooleanField(default=False)
+    replace = serializers.BooleanField(default=False)
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=5000, default=lambda: getattr(settings, 'LIFE_PLAN_IMPORT_BATCH_SIZE', 1000)
+    )
+
+
+class LifePlanExportFilterSerializer(serializers.Serializer):
+    user = serializers.IntegerField(required=False)
+    plan = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+
+class LifePlanWindowSerializer(serializers.Serializer):
+    """
+    Parâmetros de consulta da leitura de planos: `from`/`to` (meses, inclusivos)
+    e `fields` (lista separada por vírgula das partes opcionais a incluir).
+    """
+    OPTIONAL_FIELDS = ['items', 'total_per_category', 'profit_loss_by_date']
+
+    def get_fields(self):
+        return {
+            'from': serializers.DateField(input_formats=['%Y-%m', '%Y-%m-%d'], required=False),
+            'to': serializers.DateField(input_formats=['%Y-%m', '%Y-%m-%d'], required=False),
+            'fields': serializers.CharField(required=False, allow_blank=True),
+        }
+
+    def validate_fields(self, value):
+        selected = {field.strip() for field in value.split(',') if field.strip()}
+        unknown = selected - set(self.OPTIONAL_FIELDS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Campos desconhecidos: {', '.join(sorted(unknown))}. "
+                f"Opções: {', '.join(self.OPTIONAL_FIELDS)}."
+            )
+        return selected
+
+    def validate(self, attrs):
+        if attrs.get('from'):
+            attrs['from'] = month_start(attrs['from'])
+        if attrs.get('to'):
+            attrs['to'] = month_start(attrs['to'])
+        if attrs.get('from') and attrs.get('to') and attrs['from'] > attrs['to']:
+            raise serializers.ValidationError({"to": "O mês final deve ser igual ou posterior ao inicial."})
+        return attrs
+
+
+class ProjectionAssumptionsSerializer(serializers.Serializer):
+    """Premissas anuais de um cenário (taxas em fração: 0.05 = 5% a.a.)."""
+    income_growth = serializers.FloatField(min_value=-0.99, max_value=1, default=0)
+    inflation = serializers.FloatField(min_value=-0.99, max_value=1, default=0)
+    investment_return = serializers.FloatField(min_value=-0.99, max_value=1, default=0)
+    category_growth = serializers.DictField(
+        child=serializers.FloatField(min_value=-0.99, max_value=1), required=False, default=dict
+    )
+    initial_cash = serializers.FloatField(default=0)
+    initial_investments = serializers.FloatField(default=0)
+
+    def validate_category_growth(self, value):
+        unknown = set(value) - set(PROJECTION_CATEGORIES)
+        if unknown:
+            raise serializers.ValidationError(f"Categorias desconhecidas: {', '.join(sorted(unknown))}.")
+        return value
+
+
+class ProjectionRequestSerializer(serializers.Serializer):
+    """
+    Um cenário em `assumptions` devolve as séries mensais completas;
+    uma lista em `scenarios` devolve apenas os indicadores finais de cada um.
+    """
+    years = serializers.IntegerField(min_value=1, max_value=MAX_PROJECTION_YEARS, default=10)
+    assumptions = ProjectionAssumptionsSerializer(required=False)
+    scenarios = ProjectionAssumptionsSerializer(many=True, required=False, allow_empty=False, max_length=5000)
+
+    def validate(self, attrs):
+        if 'assumptions' in attrs and 'scenarios' in attrs:
+            raise serializers.ValidationError("Informe `assumptions` ou `scenarios`, não ambos.")
+        return attrs
+
+
+class MonteCarloRequestSerializer(serializers.Serializer):
+    """Parâmetros da simulação de Monte Carlo (retorno e volatilidade anuais em fração)."""
+    categories = serializers.ListField(
+        child=serializers.ChoiceField(choices=INVESTMENT_CATEGORIES), required=False, allow_empty=False,
+        default=lambda: list(INVESTMENT_CATEGORIES)
+    )
+    years = serializers.IntegerField(min_value=1, max_value=MAX_PROJECTION_YEARS, default=30)
+    paths = serializers.IntegerField(min_value=100, max_value=20000, default=10000)
+    expected_return = serializers.FloatField(min_value=-0.99, max_value=1, default=0.08)
+    volatility = serializers.FloatField(min_value=0, max_value=2, default=0.15)
+    initial_balance = serializers.FloatField(default=0)
+    seed = serializers.IntegerField(min_value=0, required=False)
+
+
+class LifePlanExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LifePlanExportJob
+        fields = ['id', 'life_plan', 'dark_mode', 'status', 'error', 'created_at', 'finished_at', 'download_url']
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != LifePlanExportJob.STATUS_DONE:
+            return None
+        path = f"/api/v1/life-plan/{obj.life_plan_id}/export-jobs/{obj.pk}/download/"
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+
 class LifePlanSerializer(serializers.ModelSerializer):
     items_for_plan = serializers.JSONField(write_only=True, required=False)
     years = serializers.ListField(
@@ -31,38 +209,34 @@ class LifePlanSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'items', 'total_per_category', 'profit_loss_by_date']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('window', {}).get('fields')
+        if selected is not None:
+            for field_name in LifePlanWindowSerializer.OPTIONAL_FIELDS:
+                if field_name not in selected:
+                    self.fields.pop(field_name, None)
+
+    def windowed_summaries(self, obj):
+        """Resumos mensais do plano restritos à janela `from`/`to` da requisição."""
+        window = self.context.get('window', {})
+        summaries = obj.monthly_summaries.all()
+        if window.get('from'):
+            summaries = summaries.filter(month__gte=window['from'])
+        if window.get('to'):
+            summaries = summaries.filter(month__lt=next_month(window['to']))
+        return summaries
+
     def get_total_per_category(self, obj):
-        totals = defaultdict(Decimal)
-        for item in obj.items.all():
-            totals[item.category] += Decimal(item.value)
-        return {category: float(total) for category, total in totals.items()}
+        totals = (
+            self.windowed_summaries(obj).order_by()
+            .values('category')
+            .annotate(total=Sum('total_value'))
+        )
+        return {row['category']: float(row['total'] or 0) for row in totals}
 
     def get_profit_loss_by_date(self, obj):
-        profit_loss_by_date = defaultdict(Decimal)
-        receitas_by_date = defaultdict(Decimal)
-        renda_extra_by_date = defaultdict(Decimal)
-        custos_by_date = defaultdict(Decimal)
-
-        for item in obj.items.all():
-            if item.category == "receitas":
-                receitas_by_date[item.date] += Decimal(item.value)
-            elif item.category == "renda_extra":
-                renda_extra_by_date[item.date] += Decimal(item.value)
-            elif item.category in ["estudos", "custos"]:
-                custos_by_date[item.date] += Decimal(item.value)
-
-        all_dates = set(list(receitas_by_date.keys()) +
-                    list(renda_extra_by_date.keys()) +
-                    list(custos_by_date.keys()))
-
-        for date in all_dates:
-            profit_loss_by_date[date] = (
-                receitas_by_date.get(date, Decimal(0)) +
-                renda_extra_by_date.get(date, Decimal(0)) -
-                custos_by_date.get(date, Decimal(0))
-            )
-
-        return [{"date": date, "profit_loss": float(value)} for date, value in profit_loss_by_date.items()]
+        return profit_loss_by_month(self.windowed_summaries(obj))
 
     def create_default_items(self, life_plan, years):
         """Cria itens padrão para cada mês de cada ano especificado."""
@@ -79,18 +253,14 @@ class LifePlanSerializer(serializers.ModelSerializer):
             'renda_extra': ["Aluguel", "Dividendos", "Venda de Produtos", "Plataforma"],
         }
 
-        for year in years:
-            for month in range(1, 13):
-                for category, item_names in default_items.items():
-                    for name in item_names:
-                        LifePlanItem.objects.create(
-                            life_plan=life_plan,
-                            category=category,
-                            name=name,
-                            value=0,
-                            date=datetime.strptime(f"{year}-{month:02d}-01", "%Y-%m-%d").date(),
-                            meta=0
-                        )
+        rows = (
+            (category, name, date(year, month, 1), 0, 0)
+            for year in years
+            for month in range(1, 13)
+            for category, item_names in default_items.items()
+            for name in item_names
+        )
+        create_plan_items(life_plan, rows)
 
     def create(self, validated_data):
         """Criação de um LifePlan e seus itens padrão."""
@@ -101,42 +271,25 @@ class LifePlanSerializer(serializers.ModelSerializer):
             current_year = datetime.now().year
             years = [current_year]
 
-        life_plan = LifePlan.objects.create(**validated_data)
-
-        if not items_for_plan:
-            self.create_default_items(life_plan, years)
-        else:
-            for category_name, category_data in items_for_plan.items():
-                for item_data in category_data['items']:
-                    LifePlanItem.objects.create(
-                        life_plan=life_plan,
-                        category=category_name,
-                        name=item_data['name'],
-                        value=item_data['value'],
-                        date=datetime.strptime(item_data['date'], "%Y-%m-%d").date(),
-                        meta=item_data.get('meta', 0) or 0
-                    )
+        with transaction.atomic():
+            life_plan = LifePlan.objects.create(**validated_data)
+
+            if not items_for_plan:
+                self.create_default_items(life_plan, years)
+            else:
+                create_plan_items(life_plan, item_rows_from_payload(items_for_plan))
 
         return life_plan
 
     def update(self, instance, validated_data):
         """Atualizar um LifePlan e seus itens."""
         items_for_plan = validated_data.pop('items_for_plan', None)
-        instance.name = validated_data.get('name', instance.name)
-        instance.save()
-
-        if items_for_plan:
-            instance.items.all().delete()
-
-            for category_name, category_data in items_for_plan.items():
-                for item_data in category_data['items']:
-                    LifePlanItem.objects.create(
-                        life_plan=instance,
-                        category=category_name,
-                        name=item_data['name'],
-                        value=item_data['value'],
-                        date=datetime.strptime(item_data['date'], "%Y-%m-%d").date(),
-                        meta=item_data.get('meta', 0) or 0
-                    )
+
+        with transaction.atomic():
+            instance.name = validated_data.get('name', instance.name)
+            instance.save()
+
+            if items_for_plan:
+                reconcile_plan_items(instance, item_rows_from_payload(items_for_plan))
 
         return instance
@@ -1,33 +1,78 @@
-import io
-import csv
 from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from django.http import HttpResponse
-from datetime import datetime
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib import colors
-from reportlab.lib.units import mm, cm  
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, 
-    PageBreak, Image, Flowable, KeepTogether, HRFlowable
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from datetime import date, datetime
+from tempfile import TemporaryFile
+from life_plan.models import (
+    LifePlan, LifePlanExportJob, LifePlanGoalProgress, LifePlanItem, LifePlanMonthlySummary
+)
+from life_plan.jobs import enqueue_export, fail_stale_jobs, find_cached_export
+from life_plan.cache import etag_matches, export_cache_key, export_etag, render_cache
+from life_plan.bulk import ItemValueOverflow, apply_cell_operations, clone_plan, roll_forward_year
+from life_plan.imports import ImportFormatError, import_plan_items
+from life_plan.reports import build_plan_matrix, render_plan_pdf
+from life_plan.spreadsheets import XLSX_CONTENT_TYPE, write_plan_xlsx
+from life_plan.projection import plan_profile, projection_detail, projection_summaries
+from life_plan.montecarlo import monte_carlo
+from life_plan.exports import (
+    CSV_FIELDS, CSV_HEADER, MULTI_PLAN_CSV_FIELDS, MULTI_PLAN_CSV_HEADER, iter_item_rows, stream_csv
+)
+from life_plan.rollups import items_changed, next_month, profit_loss_by_month
+from life_plan.api.filters import LifePlanItemFilter
+from life_plan.api.pagination import LifePlanItemCursorPagination
+from life_plan.api.serializers import (
+    LifePlanCellBatchSerializer, LifePlanCloneSerializer, LifePlanExportFilterSerializer,
+    LifePlanExportJobSerializer, LifePlanGoalProgressSerializer, LifePlanImportSerializer,
+    LifePlanItemSerializer, LifePlanRollForwardSerializer, LifePlanSerializer, LifePlanWindowSerializer,
+    MonteCarloRequestSerializer, ProjectionRequestSerializer
 )
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from reportlab.lib.colors import HexColor, Color
-from life_plan.models import LifePlan, LifePlanItem
-from life_plan.api.serializers import LifePlanSerializer, LifePlanItemSerializer
 from rest_framework import viewsets, serializers, status
-from collections import defaultdict
+
+def not_modified(etag):
+    response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    return response
+
 
 class LifePlanViewSet(viewsets.ModelViewSet):
     queryset = LifePlan.objects.all()
     serializer_class = LifePlanSerializer
     permission_classes = (IsAuthenticated,)
 
+    def get_window(self):
+        """Janela `from`/`to` e seleção `fields` da leitura (list/retrieve/matrix)."""
+        if not hasattr(self, '_window'):
+            self._window = {}
+            if self.action in ('list', 'retrieve', 'matrix'):
+                serializer = LifePlanWindowSerializer(data=self.request.query_params)
+                serializer.is_valid(raise_exception=True)
+                self._window = serializer.validated_data
+        return self._window
+
     def get_queryset(self):
-        return LifePlan.objects.filter(user=self.request.user)
+        if self.action == 'clone' and self.request.user.is_staff:
+            return LifePlan.objects.all()
+        queryset = LifePlan.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            window = self.get_window()
+            if window.get('fields') is None or 'items' in window['fields']:
+                items = LifePlanItem.objects.all()
+                if window.get('from'):
+                    items = items.filter(date__gte=window['from'])
+                if window.get('to'):
+                    items = items.filter(date__lt=next_month(window['to']))
+                queryset = queryset.prefetch_related(Prefetch('items', queryset=items))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['window'] = self.get_window()
+        return context
 
     def perform_create(self, serializer):
         if LifePlan.objects.filter(user=self.request.user).exists():
@@ -49,90 +94,247 @@ class LifePlanViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
+    @action(detail=True, methods=['patch'], url_path='cells')
+    def batch_cells(self, request, pk=None):
+        """
+        Edita várias células (categoria, nome, mês) de uma vez e devolve
+        apenas os totais dos meses/categorias afetados.
+        """
+        life_plan = self.get_object()
+        serializer = LifePlanCellBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        touched = apply_cell_operations(life_plan, serializer.validated_data['operations'])
+        months = sorted({month for month, _ in touched})
+        summaries = LifePlanMonthlySummary.objects.filter(life_plan=life_plan, month__in=months)
+
+        current = {
+            (month, category): (total_value, total_meta, item_count)
+            for month, category, total_value, total_meta, item_count in summaries.values_list(
+                'month', 'category', 'total_value', 'total_meta', 'item_count'
+            )
+        }
+        totals = []
+        for month, category in sorted(touched):
+            total_value, total_meta, item_count = current.get((month, category), (0, 0, 0))
+            totals.append({
+                "month": month,
+                "category": category,
+                "total_value": float(total_value),
+                "total_meta": float(total_meta),
+                "item_count": item_count,
+            })
+
+        return Response({
+            "totals": totals,
+            "profit_loss_by_date": profit_loss_by_month(summaries),
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='goals')
+    def goals(self, request, pk=None):
+        """Progresso precalculado de cada linha em direção à sua meta (filtro opcional `category`)."""
+        life_plan = self.get_object()
+        progress = LifePlanGoalProgress.objects.filter(life_plan=life_plan).order_by('category', 'name')
+        categories = [category for category in request.query_params.get('category', '').split(',') if category]
+        if categories:
+            progress = progress.filter(category__in=categories)
+        return Response(LifePlanGoalProgressSerializer(progress, many=True).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='matrix')
+    def matrix(self, request, pk=None):
+        """
+        Plano já pivotado (linha x mês) em formato colunar.
+        Aceita a mesma janela `from`/`to` da leitura do plano.
+        """
+        life_plan = self.get_object()
+        window = self.get_window()
+        items = life_plan.items.all()
+        if window.get('from'):
+            items = items.filter(date__gte=window['from'])
+        if window.get('to'):
+            items = items.filter(date__lt=next_month(window['to']))
+
+        return Response({
+            "id": life_plan.id,
+            "name": life_plan.name,
+            "updated_at": life_plan.updated_at,
+            **build_plan_matrix(items).to_columns(),
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='projection')
+    def projection(self, request, pk=None):
+        """
+        Projeta o plano por até 30 anos a partir do seu ano mais recente,
+        com crescimento/inflação por categoria e retorno dos investimentos.
+        """
+        life_plan = self.get_object()
+        serializer = ProjectionRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        profile = plan_profile(life_plan)
+
+        if 'scenarios' in data:
+            return Response({
+                "start": profile.start,
+                "years": data['years'],
+                "scenarios": projection_summaries(profile, data['scenarios'], data['years']),
+            }, status=status.HTTP_200_OK)
+
+        return Response(
+            projection_detail(profile, data.get('assumptions', {}), data['years']),
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['post'], url_path='monte-carlo')
+    def monte_carlo(self, request, pk=None):
+        """
+        Simula N trajetórias de retorno para os aportes de investimentos/intercâmbio
+        e devolve faixas de percentis do saldo e a probabilidade de atingir cada meta.
+        """
+        life_plan = self.get_object()
+        serializer = MonteCarloRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        result = monte_carlo(
+            plan_profile(life_plan),
+            categories=data['categories'],
+            years=data['years'],
+            expected_return=data['expected_return'],
+            volatility=data['volatility'],
+            initial_balance=data['initial_balance'],
+            paths=data['paths'],
+            seed=data.get('seed'),
+            workers=getattr(settings, 'LIFE_PLAN_MONTE_CARLO_WORKERS', 0),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='roll-forward')
+    def roll_forward(self, request, pk=None):
+        """Copia os itens de um ano para outro, com ajuste percentual opcional por categoria."""
+        life_plan = self.get_object()
+        serializer = LifePlanRollForwardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if not life_plan.items.filter(date__year=data['source_year']).exists():
+            return Response(
+                {"error": f"O plano não tem itens em {data['source_year']}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not data['replace'] and life_plan.items.filter(date__year=data['target_year']).exists():
+            return Response(
+                {"error": f"O plano já tem itens em {data['target_year']}. Use replace para substituí-los."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = roll_forward_year(
+                life_plan, data['source_year'], data['target_year'], data['adjustments'], replace=data['replace']
+            )
+        except ItemValueOverflow as exc:
+            raise serializers.ValidationError({"adjustments": str(exc)})
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], url_path='clone', permission_classes=[IsAdminUser])
+    def clone(self, request, pk=None):
+        """Copia o plano inteiro para um usuário que ainda não tem plano (somente staff)."""
+        life_plan = self.get_object()
+        serializer = LifePlanCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        clone = clone_plan(life_plan, serializer.validated_data['user'], serializer.validated_data.get('name'))
+        return Response(
+            LifePlanSerializer(clone, context={**self.get_serializer_context(), 'window': {'fields': set()}}).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_items(self, request, pk=None):
+        """
+        Importa itens de um CSV (mesmas colunas da exportação) ou XLSX.
+        Responde 400 com os erros por linha quando a importação é recusada.
+        """
+        life_plan = self.get_object()
+        serializer = LifePlanImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            result = import_plan_items(
+                life_plan,
+                data['file'],
+                batch_size=data['batch_size'],
+                partial=data['partial'],
+                replace=data['replace'],
+            )
+        except ImportFormatError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if result['error_count'] and not data['partial']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['get'], url_path='export-csv')
     def export_csv(self, request, pk=None):
         life_plan = self.get_object()
-        items = LifePlanItem.objects.filter(life_plan=life_plan)
+        etag = export_etag(export_cache_key(life_plan, 'csv'))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        rows = iter_item_rows(LifePlanItem.objects.filter(life_plan=life_plan), CSV_FIELDS)
 
-        response = HttpResponse(content_type='text/csv')
+        response = StreamingHttpResponse(stream_csv(CSV_HEADER, rows), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="life_plan_{life_plan.id}_{datetime.now().strftime("%Y%m%d")}.csv"'
+        response['ETag'] = etag
+        return response
+
+    @action(detail=False, methods=['get'], url_path='export-csv', permission_classes=[IsAdminUser])
+    def export_csv_multi(self, request):
+        """
+        Exportação (staff) de vários planos em um único CSV em streaming,
+        filtrando por usuário, plano e/ou intervalo de datas dos itens.
+        """
+        filters = LifePlanExportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        items = LifePlanItem.objects.all()
+        if 'user' in params:
+            items = items.filter(life_plan__user_id=params['user'])
+        if 'plan' in params:
+            items = items.filter(life_plan_id=params['plan'])
+        if 'date_from' in params:
+            items = items.filter(date__gte=params['date_from'])
+        if 'date_to' in params:
+            items = items.filter(date__lte=params['date_to'])
 
-        writer = csv.writer(response)
-        writer.writerow(['Category', 'Name', 'Value', 'Date', 'Meta'])
-        for item in items:
-            writer.writerow([item.category, item.name, item.value, item.date, item.meta])
+        rows = iter_item_rows(items, MULTI_PLAN_CSV_FIELDS, ordering=('life_plan_id', 'date', 'category', 'pk'))
 
+        response = StreamingHttpResponse(stream_csv(MULTI_PLAN_CSV_HEADER, rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="life_plans_{datetime.now().strftime("%Y%m%d")}.csv"'
         return response
 
-    def add_header_footer(self, canvas, doc):
-        """Adds header and footer to each page."""
-        canvas.saveState()
-        
-        canvas.setFillColor(HexColor("#F8F9FF"))
-        canvas.rect(0, 0, doc.pagesize[0], doc.pagesize[1], fill=1, stroke=0)
-        
-        canvas.setFillColor(HexColor("#818CF8"))
-        canvas.setFillAlpha(0.1)
-        canvas.circle(doc.pagesize[0] - 50 * mm, doc.pagesize[1] - 50 * mm, 100 * mm, fill=1, stroke=0)
-        
-        canvas.setFillColor(HexColor("#EC4899"))
-        canvas.setFillAlpha(0.1)
-        canvas.circle(50 * mm, 50 * mm, 80 * mm, fill=1, stroke=0)
-        
-        canvas.setFillAlpha(1)
-        
-        canvas.setStrokeColorRGB(0.8, 0.8, 0.8)
-        canvas.line(15 * mm, doc.pagesize[1] - 20 * mm, doc.pagesize[0] - 15 * mm, doc.pagesize[1] - 20 * mm)
-        
-        canvas.setStrokeColorRGB(0.8, 0.8, 0.8)
-        canvas.line(15 * mm, 15 * mm, doc.pagesize[0] - 15 * mm, 15 * mm)
-        
-        canvas.setFont("Helvetica", 9)
-        page_num = canvas.getPageNumber()
-        text = f"Página {page_num}"
-        canvas.setFillColor(HexColor("#DB2777"))
-        canvas.drawRightString(doc.pagesize[0] - 15 * mm, 10 * mm, text)
-
-        canvas.setFont("Helvetica-Bold", 12)
-        canvas.setFillColor(HexColor("#DB2777"))
-        canvas.drawString(15 * mm, doc.pagesize[1] - 15 * mm, doc.title)
-        
-        canvas.restoreState()
-
-    def add_dark_header_footer(self, canvas, doc):
-        """Adds header and footer to each page with dark theme."""
-        canvas.saveState()
-        
-        canvas.setFillColor(HexColor("#0F172A"))
-        canvas.rect(0, 0, doc.pagesize[0], doc.pagesize[1], fill=1, stroke=0)
-        
-        canvas.setFillColor(HexColor("#DB2777"))
-        canvas.setFillAlpha(0.1)
-        canvas.circle(doc.pagesize[0] - 50 * mm, doc.pagesize[1] - 50 * mm, 100 * mm, fill=1, stroke=0)
-        
-        canvas.setFillColor(HexColor("#8B5CF6"))
-        canvas.setFillAlpha(0.1)
-        canvas.circle(50 * mm, 50 * mm, 80 * mm, fill=1, stroke=0)
-        
-        canvas.setFillAlpha(1)
-        
-        canvas.setStrokeColor(HexColor("#334155"))
-        canvas.line(15 * mm, doc.pagesize[1] - 20 * mm, doc.pagesize[0] - 15 * mm, doc.pagesize[1] - 20 * mm)
-        
-        canvas.setStrokeColor(HexColor("#334155"))
-        canvas.line(15 * mm, 15 * mm, doc.pagesize[0] - 15 * mm, 15 * mm)
-        
-        canvas.setFont("Helvetica", 9)
-        page_num = canvas.getPageNumber()
-        text = f"Página {page_num}"
-        canvas.setFillColor(HexColor("#EC4899"))
-        canvas.drawRightString(doc.pagesize[0] - 15 * mm, 10 * mm, text)
-        
-        canvas.setFont("Helvetica-Bold", 12)
-        canvas.setFillColor(HexColor("#EC4899"))
-        canvas.drawString(15 * mm, doc.pagesize[1] - 15 * mm, doc.title)
-        
-        canvas.restoreState()
+    @action(detail=True, methods=['get'], url_path='export-xlsx')
+    def export_xlsx(self, request, pk=None):
+        """Planilha Excel no layout do PDF, gravada em arquivo temporário e enviada em blocos."""
+        life_plan = self.get_object()
+        etag = export_etag(export_cache_key(life_plan, 'xlsx'))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        output = TemporaryFile()
+        write_plan_xlsx(life_plan, output)
+        output.seek(0)
+
+        response = FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"plano_de_vida_{life_plan.id}.xlsx",
+            content_type=XLSX_CONTENT_TYPE,
+        )
+        response['ETag'] = etag
+        return response
 
     @action(detail=True, methods=['get'], url_path='export-pdf')
     def export_pdf(self, request, pk=None):
@@ -142,332 +344,63 @@ class LifePlanViewSet(viewsets.ModelViewSet):
             return Response({"error": "Plano de vida não encontrado."}, status=404)
 
         is_dark_mode = request.query_params.get('dark_mode', 'false').lower() == 'true'
-        
-        buffer = io.BytesIO()
-        
-        pdf = SimpleDocTemplate(
-            buffer, 
-            pagesize=landscape(A4), 
-            rightMargin=15 * mm, 
-            leftMargin=15 * mm, 
-            topMargin=25 * mm, 
-            bottomMargin=20 * mm,
-            title=life_plan.name
-        )
-        
-        styles = getSampleStyleSheet()
-        
-        if is_dark_mode:
-            text_color = HexColor("#FFFFFF")
-            heading_color = HexColor("#EC4899")
-            subheading_color = HexColor("#8B5CF6")
-            card_bg_color = HexColor("#1E293B")
-            card_border_color = HexColor("#334155") 
-            table_header_bg = HexColor("#334155")
-            table_header_text = HexColor("#FFFFFF")
-            table_odd_row_bg = HexColor("#1E293B")
-            table_even_row_bg = HexColor("#0F172A")
-            table_border_color = HexColor("#475569")
-            positive_value_color = HexColor("#10B981")
-            negative_value_color = HexColor("#EF4444")
-        else:
-            text_color = HexColor("#1E293B")
-            heading_color = HexColor("#DB2777")
-            subheading_color = HexColor("#4F46E5")
-            card_bg_color = HexColor("#FFFFFF")
-            card_border_color = HexColor("#E0E7FF")
-            table_header_bg = HexColor("#818CF8")
-            table_header_text = HexColor("#FFFFFF")
-            table_odd_row_bg = HexColor("#FFFFFF")
-            table_even_row_bg = HexColor("#F1F5F9")
-            table_border_color = HexColor("#E2E8F0")
-            positive_value_color = HexColor("#059669")
-            negative_value_color = HexColor("#DC2626")
-        
-        title_style = ParagraphStyle(
-            'Title', 
-            parent=styles['Title'],
-            fontSize=16, 
-            textColor=heading_color,
-            alignment=TA_CENTER,
-            spaceAfter=5 * mm
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'Subtitle', 
-            parent=styles['Heading2'],
-            fontSize=12, 
-            textColor=subheading_color,
-            alignment=TA_CENTER,
-            spaceAfter=10 * mm
-        )
-        
-        date_style = ParagraphStyle(
-            'Date', 
-            parent=styles['Normal'],
-            fontSize=9, 
-            textColor=text_color,
-            alignment=TA_CENTER,
-            spaceAfter=10 * mm
-        )
-        
-        category_style = ParagraphStyle(
-            'Category', 
-            parent=styles['Heading2'],
-            fontSize=12, 
-            textColor=heading_color,
-            alignment=TA_LEFT,
-            spaceBefore=8 * mm,
-            spaceAfter=4 * mm,
-            fontName='Helvetica-Bold'
-        )
-        
-        header_cell_style = ParagraphStyle(
-            'HeaderCell',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=table_header_text,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        name_cell_style = ParagraphStyle(
-            'NameCell',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=text_color,
-            alignment=TA_LEFT,
-            fontName='Helvetica'
-        )
-        
-        value_cell_style = ParagraphStyle(
-            'ValueCell',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=text_color,
-            alignment=TA_RIGHT,
-            fontName='Helvetica'
-        )
-        
-        positive_value_style = ParagraphStyle(
-            'PositiveValueCell',
-            parent=value_cell_style,
-            textColor=positive_value_color
-        )
-        
-        negative_value_style = ParagraphStyle(
-            'NegativeValueCell',
-            parent=value_cell_style,
-            textColor=negative_value_color
-        )
-        
-        subtotal_cell_style = ParagraphStyle(
-            'SubtotalCell',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=table_header_text,
-            alignment=TA_RIGHT,
-            fontName='Helvetica-Bold'
-        )
-        
-        subtotal_name_style = ParagraphStyle(
-            'SubtotalNameCell',
-            parent=subtotal_cell_style,
-            alignment=TA_LEFT
-        )
-        
-        elements = []
-
-        elements.append(Paragraph("Plano de Vida", title_style))
-        elements.append(Paragraph(life_plan.name, subtitle_style))
-        
-        report_date = f"Data de geração: {datetime.now().strftime('%d/%m/%Y')}"
-        elements.append(Paragraph(report_date, date_style))
-        
-        categories_data = defaultdict(lambda: defaultdict(list))
-        all_dates = set()
-        
-        for item in life_plan.items.all():
-            date_str = item.date.strftime('%Y-%m')
-            all_dates.add(date_str)
-            categories_data[item.category][item.name].append({
-                'date': date_str,
-                'value': item.value,
-                'meta': item.meta
-            })
-        
-        all_dates = sorted(list(all_dates))
-        
-        months = {
-            '01': 'jan', '02': 'fev', '03': 'mar', '04': 'abr',
-            '05': 'mai', '06': 'jun', '07': 'jul', '08': 'ago',
-            '09': 'set', '10': 'out', '11': 'nov', '12': 'dez'
-        }
-        
-        category_order = [
-            "receitas",
-            "renda_extra",
-            "estudos",
-            "custos",
-            "lucroPrejuizo",
-            "investimentos",
-            "realizacoes",
-            "intercambio",
-            "empresas",
-            "pessoais",
-        ]
-        
-        category_display_names = {
-            "receitas": "Receitas",
-            "renda_extra": "Renda Extra",
-            "estudos": "Estudos",
-            "custos": "Custos",
-            "lucroPrejuizo": "Lucro/Prejuízo",
-            "investimentos": "Investimentos",
-            "realizacoes": "Realizações",
-            "intercambio": "Intercâmbio",
-            "empresas": "Empresas",
-            "pessoais": "Pessoais",
-        }
-        
-        for category_name in category_order:
-            if category_name not in categories_data and category_name != "lucroPrejuizo":
-                continue
-                
-            display_category = category_display_names.get(category_name, category_name.capitalize())
-            
-            elements.append(Paragraph(display_category, category_style))
-            
-            header_row = [Paragraph("Nome", header_cell_style)]
-            for date_str in all_dates:
-                year, month = date_str.split('-')
-                header_row.append(Paragraph(f"{months[month]} - {year}", header_cell_style))
-            header_row.append(Paragraph("Total", header_cell_style))
-            
-            table_data = [header_row]
-            
-            category_items = categories_data.get(category_name, {})
-            
-            if category_name == "lucroPrejuizo":
-                profit_loss_row = [Paragraph("Lucro/Prejuízo", name_cell_style)]
-                total_profit = 0
-                
-                for date_str in all_dates:
-                    receitas_total = sum(item['value'] for items in categories_data.get("receitas", {}).values() 
-                                        for item in items if item['date'] == date_str)
-                    renda_extra_total = sum(item['value'] for items in categories_data.get("renda_extra", {}).values()
-                                       for item in items if item['date'] == date_str)                                            
-                    custos_total = sum(item['value'] for items in categories_data.get("custos", {}).values() 
-                                      for item in items if item['date'] == date_str)
-                    estudos_total = sum(item['value'] for items in categories_data.get("estudos", {}).values() 
-                                       for item in items if item['date'] == date_str)
-                    
-                    profit = (receitas_total + renda_extra_total) - custos_total - estudos_total
-                    total_profit += profit
-                    
-                    style = positive_value_style if profit >= 0 else negative_value_style
-                    profit_loss_row.append(Paragraph(f"R$ {profit:,.2f}", style))
-                
-                style = positive_value_style if total_profit >= 0 else negative_value_style
-                profit_loss_row.append(Paragraph(f"R$ {total_profit:,.2f}", style))
-                table_data.append(profit_loss_row)
-            else:
-                for item_name, items in category_items.items():
-                    row = [Paragraph(item_name, name_cell_style)]
-                    total_value = 0
-                    
-                    for date_str in all_dates:
-                        value = 0
-                        for item in items:
-                            if item['date'] == date_str:
-                                value = item['value']
-                                total_value += value
-                                break
-                        
-                        row.append(Paragraph(f"R$ {value:,.2f}", value_cell_style))
-                    
-                    row.append(Paragraph(f"R$ {total_value:,.2f}", value_cell_style))
-                    table_data.append(row)
-            
-            if len(table_data) > 1:
-                subtotal_row = [Paragraph("Subtotal", subtotal_name_style)]
-                total_subtotal = 0
-                
-                for i, date_str in enumerate(all_dates):
-                    if category_name == "lucroPrejuizo":
-                        cell_value = table_data[1][i+1]
-                        if isinstance(cell_value, Paragraph):
-                            value_str = cell_value.text
-                        else:
-                            value_str = cell_value
-                        
-                        value_str = value_str.replace('R$ ', '').replace('.', '').replace(',', '.')
-                        subtotal = float(value_str)
-                    else:
-                        subtotal = 0
-                        for row in table_data[1:]:
-                            cell_value = row[i+1]
-                            if isinstance(cell_value, Paragraph):
-                                value_str = cell_value.text
-                            else:
-                                value_str = cell_value
-                            
-                            value_str = value_str.replace('R$ ', '').replace('.', '').replace(',', '.')
-                            subtotal += float(value_str)
-                    
-                    total_subtotal += subtotal
-                    subtotal_row.append(Paragraph(f"R$ {subtotal:,.2f}", subtotal_cell_style))
-                
-                subtotal_row.append(Paragraph(f"R$ {total_subtotal:,.2f}", subtotal_cell_style))
-                table_data.append(subtotal_row)
-            
-            available_width = pdf.width
-            name_col_width = available_width * 0.2
-            total_col_width = available_width * 0.1
-            date_col_width = (available_width - name_col_width - total_col_width) / len(all_dates)
-            
-            col_widths = [name_col_width] + [date_col_width] * len(all_dates) + [total_col_width]
-            
-            table = Table(table_data, colWidths=col_widths, repeatRows=1)
-            
-            table_style = [
-                ('BACKGROUND', (0, 0), (-1, 0), table_header_bg),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                
-                ('GRID', (0, 0), (-1, -1), 0.5, table_border_color),
-                
-                ('BACKGROUND', (0, 1), (-1, -2), table_odd_row_bg),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -2), [table_odd_row_bg, table_even_row_bg]),
-                
-                ('BACKGROUND', (0, -1), (-1, -1), table_header_bg),
-                
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                
-                ('WORDWRAP', (0, 0), (-1, -1), True),
-            ]
-            
-            table.setStyle(TableStyle(table_style))
-            
-            elements.append(table)
-            elements.append(Spacer(1, 5 * mm))
-        
-        if is_dark_mode:
-            pdf.build(elements, onFirstPage=self.add_dark_header_footer, onLaterPages=self.add_dark_header_footer)
-        else:
-            pdf.build(elements, onFirstPage=self.add_header_footer, onLaterPages=self.add_header_footer)
-            
-        buffer.seek(0)
 
-        response = HttpResponse(buffer, content_type='application/pdf')
+        cache_key = export_cache_key(life_plan, 'pdf', is_dark_mode)
+        etag = export_etag(cache_key)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        content = render_cache.get(cache_key)
+        if content is None:
+            # PDF já gerado por um job hoje (a data impressa bate com a da chave): servido direto do arquivo.
+            cached = find_cached_export(life_plan, is_dark_mode, rendered_on=date.today())
+            if cached is not None:
+                response = FileResponse(
+                    cached.file.open('rb'), as_attachment=True, filename=f"plano_de_vida_{life_plan.id}.pdf"
+                )
+                response['ETag'] = etag
+                return response
+            content = render_plan_pdf(life_plan, is_dark_mode)
+            render_cache.set(cache_key, life_plan.id, content)
+
+        response = HttpResponse(content, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="plano_de_vida_{life_plan.id}.pdf"'
+        response['ETag'] = etag
         return response
 
+    @action(detail=True, methods=['post'], url_path='export-jobs')
+    def create_export_job(self, request, pk=None):
+        """
+        Enfileira a geração do PDF em segundo plano. Se já existir um PDF pronto
+        (ou em geração) para o estado atual do plano, o mesmo job é devolvido.
+        """
+        life_plan = self.get_object()
+        is_dark_mode = str(request.data.get('dark_mode', request.query_params.get('dark_mode', 'false'))).lower() == 'true'
+
+        job = enqueue_export(life_plan, is_dark_mode)
+        serializer = LifePlanExportJobSerializer(job, context={'request': request})
+        response_status = status.HTTP_200_OK if job.status == LifePlanExportJob.STATUS_DONE else status.HTTP_202_ACCEPTED
+        return Response(serializer.data, status=response_status)
+
+    @action(detail=True, methods=['get'], url_path=r'export-jobs/(?P<job_id>\d+)')
+    def export_job_status(self, request, pk=None, job_id=None):
+        life_plan = self.get_object()
+        fail_stale_jobs(life_plan.export_jobs.filter(pk=job_id))
+        try:
+            job = life_plan.export_jobs.get(pk=job_id)
+        except LifePlanExportJob.DoesNotExist:
+            return Response({"error": "Exportação não encontrada."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(LifePlanExportJobSerializer(job, context={'request': request}).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path=r'export-jobs/(?P<job_id>\d+)/download')
+    def download_export_job(self, request, pk=None, job_id=None):
+        life_plan = self.get_object()
+        try:
+            job = life_plan.export_jobs.get(pk=job_id, status=LifePlanExportJob.STATUS_DONE)
+        except LifePlanExportJob.DoesNotExist:
+            return Response({"error": "Exportação não encontrada ou ainda não concluída."}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=f"plano_de_vida_{life_plan.id}.pdf")
+
 
 class LifePlanItemViewSet(viewsets.ModelViewSet):
     """
@@ -476,6 +409,8 @@ class LifePlanItemViewSet(viewsets.ModelViewSet):
     queryset = LifePlanItem.objects.all()
     serializer_class = LifePlanItemSerializer
     permission_classes = (IsAuthenticated,)
+    filterset_class = LifePlanItemFilter
+    pagination_class = LifePlanItemCursorPagination
 
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -483,4 +418,21 @@ class LifePlanItemViewSet(viewsets.ModelViewSet):
         return LifePlanItem.objects.filter(life_plan__user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save()
\ No newline at end of file
+        item = serializer.save()
+        items_changed(item.life_plan_id, [item.date], [(item.category, item.name)])
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        previous_plan_id, previous_date = instance.life_plan_id, instance.date
+        previous_key = (instance.category, instance.name)
+        item = serializer.save()
+        if item.life_plan_id != previous_plan_id:
+            items_changed(previous_plan_id, [previous_date], [previous_key])
+            items_changed(item.life_plan_id, [item.date], [(item.category, item.name)])
+        else:
+            items_changed(item.life_plan_id, [previous_date, item.date], [previous_key, (item.category, item.name)])
+
+    def perform_destroy(self, instance):
+        life_plan_id, date, key = instance.life_plan_id, instance.date, (instance.category, instance.name)
+        instance.delete()
+        items_changed(life_plan_id, [date], [key])
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LifePlanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'life_plan'
+
+    def ready(self):
+        import life_plan.signals  # noqa: F401
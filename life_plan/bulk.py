@@ -0,0 +1,275 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from life_plan.models import LifePlan, LifePlanItem
+from life_plan.rollups import items_changed, month_start, months_filter
+from life_plan.seeding import DEFAULT_ITEMS
+
+BULK_BATCH_SIZE = 1000
+
+CENTS = Decimal('0.01')
+
+# Maior valor que cabe em LifePlanItem.value/meta (max_digits=10, decimal_places=2).
+MAX_ITEM_VALUE = Decimal('99999999.99')
+
+# Categorias aceitas em escritas por API: as do modelo e as que o plano padrão semeia.
+ITEM_CATEGORIES = {category for category, _ in LifePlanItem.CATEGORY_CHOICES} | set(DEFAULT_ITEMS)
+
+
+def to_decimal(value):
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def item_rows_from_payload(items_for_plan):
+    """
+    Converte o payload `items_for_plan` ({categoria: {"items": [...]}})
+    em tuplas (categoria, nome, data, valor, meta).
+    """
+    for category_name, category_data in items_for_plan.items():
+        for item_data in category_data['items']:
+            yield (
+                category_name,
+                item_data['name'],
+                datetime.strptime(item_data['date'], "%Y-%m-%d").date(),
+                to_decimal(item_data['value']),
+                to_decimal(item_data.get('meta', 0)),
+            )
+
+
+def create_plan_items(life_plan, rows):
+    """Insere as linhas em lote e atualiza os resumos do plano."""
+    items = [
+        LifePlanItem(life_plan=life_plan, category=category, name=name, date=date, value=value, meta=meta)
+        for category, name, date, value, meta in rows
+    ]
+    with transaction.atomic():
+        LifePlanItem.objects.bulk_create(items, batch_size=BULK_BATCH_SIZE)
+        items_changed(
+            life_plan.id,
+            {item.date for item in items},
+            {(item.category, item.name) for item in items},
+        )
+    return items
+
+
+def reconcile_plan_items(life_plan, rows):
+    """
+    Faz o plano refletir exatamente `rows` alterando apenas o necessário.
+
+    Cada linha é associada a um item existente pela chave (categoria, nome, data);
+    itens sem correspondência são criados, itens com valor/meta diferentes são
+    atualizados e os que sobraram são removidos com um único DELETE.
+    """
+    existing = defaultdict(list)
+    for pk, category, name, date, value, meta in (
+        LifePlanItem.objects.filter(life_plan=life_plan)
+        .order_by('pk')
+        .values_list('pk', 'category', 'name', 'date', 'value', 'meta')
+    ):
+        existing[(category, name, date)].append((pk, value, meta))
+
+    to_create = []
+    to_update = []
+    touched_dates = set()
+    touched_keys = set()
+
+    for category, name, date, value, meta in rows:
+        matches = existing.get((category, name, date))
+        if matches:
+            pk, current_value, current_meta = matches.pop(0)
+            if current_value != value or current_meta != meta:
+                to_update.append(LifePlanItem(pk=pk, value=value, meta=meta))
+                touched_dates.add(date)
+                touched_keys.add((category, name))
+        else:
+            to_create.append(LifePlanItem(
+                life_plan=life_plan, category=category, name=name, date=date, value=value, meta=meta
+            ))
+            touched_dates.add(date)
+            touched_keys.add((category, name))
+
+    to_delete = []
+    for (category, name, date), leftovers in existing.items():
+        if leftovers:
+            to_delete.extend(pk for pk, _, _ in leftovers)
+            touched_dates.add(date)
+            touched_keys.add((category, name))
+
+    with transaction.atomic():
+        if to_delete:
+            LifePlanItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            LifePlanItem.objects.bulk_update(to_update, ['value', 'meta'], batch_size=BULK_BATCH_SIZE)
+        if to_create:
+            LifePlanItem.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        items_changed(life_plan.id, touched_dates, touched_keys)
+
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deleted': len(to_delete),
+    }
+
+
+def apply_cell_operations(life_plan, operations):
+    """
+    Aplica uma lista de operações de célula (upsert/delete) identificadas por
+    (categoria, nome, mês) com consultas em lote dentro de uma transação.
+
+    Operações repetidas para a mesma célula são aplicadas em ordem (a última vence).
+    Se houver mais de um item no mês, o mais antigo recebe o valor e os demais são removidos.
+    Retorna os pares (mês, categoria) afetados.
+    """
+    keys = {(op['category'], op['name'], op['month']) for op in operations}
+    if not keys:
+        return set()
+
+    # A célula é o mês inteiro: itens em qualquer dia do mês pertencem a ela.
+    existing = defaultdict(list)
+    for item in (
+        LifePlanItem.objects.filter(
+            months_filter({month for _, _, month in keys}),
+            life_plan=life_plan,
+            category__in={category for category, _, _ in keys},
+            name__in={name for _, name, _ in keys},
+        )
+        .order_by('pk')
+        .only('pk', 'category', 'name', 'date', 'value', 'meta')
+    ):
+        key = (item.category, item.name, month_start(item.date))
+        if key in keys:
+            existing[key].append(item)
+
+    cells = {}
+    for key in keys:
+        items = existing.get(key, [])
+        cells[key] = {'item': items[0] if items else None, 'duplicates': items[1:], 'deleted': False}
+
+    for op in operations:
+        key = (op['category'], op['name'], op['month'])
+        cell = cells[key]
+        if op['op'] == 'delete':
+            cell['deleted'] = True
+            continue
+
+        cell['deleted'] = False
+        item = cell['item']
+        if item is None:
+            item = LifePlanItem(
+                life_plan=life_plan, category=key[0], name=key[1], date=key[2], value=0, meta=0
+            )
+            cell['item'] = item
+        item.value = op['value']
+        if op.get('meta') is not None:
+            item.meta = op['meta']
+
+    to_create, to_update, to_delete = [], [], []
+    for cell in cells.values():
+        item = cell['item']
+        to_delete.extend(duplicate.pk for duplicate in cell['duplicates'])
+        if item is None:
+            continue
+        if cell['deleted']:
+            if item.pk:
+                to_delete.append(item.pk)
+        elif item.pk:
+            to_update.append(item)
+        else:
+            to_create.append(item)
+
+    with transaction.atomic():
+        if to_delete:
+            LifePlanItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            LifePlanItem.objects.bulk_update(to_update, ['value', 'meta'], batch_size=BULK_BATCH_SIZE)
+        if to_create:
+            LifePlanItem.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        items_changed(
+            life_plan.id,
+            {month for _, _, month in keys},
+            {(category, name) for category, name, _ in keys},
+        )
+
+    return {(month, category) for category, _, month in keys}
+
+
+class ItemValueOverflow(ValueError):
+    """Um valor calculado não cabe nos campos decimais do item."""
+
+
+def shift_year(value, year):
+    try:
+        return value.replace(year=year)
+    except ValueError:
+        return value.replace(year=year, day=28)
+
+
+def roll_forward_year(life_plan, source_year, target_year, adjustments=None, replace=False):
+    """
+    Copia os itens de `source_year` para `target_year`, aplicando o ajuste
+    percentual da categoria (em `adjustments`) a valor e meta.
+
+    Os itens de origem são lidos com um único `values_list` e gravados com
+    `bulk_create` em lotes; com `replace`, o ano de destino é esvaziado antes.
+    Levanta ItemValueOverflow, sem gravar nada, se algum valor ajustado não couber no campo.
+    """
+    adjustments = adjustments or {}
+    factors = {category: 1 + Decimal(percent) / 100 for category, percent in adjustments.items()}
+    items = LifePlanItem.objects.filter(life_plan=life_plan)
+
+    to_create = [
+        LifePlanItem(
+            life_plan=life_plan,
+            category=category,
+            name=name,
+            date=shift_year(item_date, target_year),
+            value=(value * factors.get(category, 1)).quantize(CENTS),
+            meta=(meta * factors.get(category, 1)).quantize(CENTS),
+        )
+        for category, name, item_date, value, meta in (
+            items.filter(date__year=source_year)
+            .order_by('date', 'pk')
+            .values_list('category', 'name', 'date', 'value', 'meta')
+            .iterator(chunk_size=BULK_BATCH_SIZE)
+        )
+    ]
+
+    for item in to_create:
+        if max(abs(item.value), abs(item.meta)) > MAX_ITEM_VALUE:
+            raise ItemValueOverflow(
+                f"O ajuste leva '{item.name}' ({item.category}) além do valor máximo permitido ({MAX_ITEM_VALUE})."
+            )
+
+    with transaction.atomic():
+        target = items.filter(date__year=target_year)
+        touched_dates = set(target.values_list('date', flat=True).distinct()) if replace else set()
+        touched_keys = set(target.values_list('category', 'name').distinct()) if replace else set()
+        deleted = target.delete()[0] if replace else 0
+        LifePlanItem.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        touched_dates.update(item.date for item in to_create)
+        touched_keys.update((item.category, item.name) for item in to_create)
+        items_changed(life_plan.id, touched_dates, touched_keys)
+
+    return {'created': len(to_create), 'deleted': deleted}
+
+
+def clone_plan(life_plan, user, name=None):
+    """Cria uma cópia completa do plano (itens incluídos) para `user`."""
+    with transaction.atomic():
+        clone = LifePlan.objects.create(user=user, name=name or life_plan.name)
+        LifePlanItem.objects.bulk_create(
+            [
+                LifePlanItem(life_plan=clone, category=category, name=item_name, date=date, value=value, meta=meta)
+                for category, item_name, date, value, meta in (
+                    LifePlanItem.objects.filter(life_plan=life_plan)
+                    .order_by('pk')
+                    .values_list('category', 'name', 'date', 'value', 'meta')
+                    .iterator(chunk_size=BULK_BATCH_SIZE)
+                )
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        items_changed(clone.id)
+    return clone
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+
+
+class RenderCache:
+    """
+    Cache LRU em memória, limitado pelo total de bytes, para exportações
+    renderizadas. Cada entrada guarda o plano de origem para permitir
+    invalidação quando os itens do plano mudam.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, life_plan_id, content):
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            self._entries[key] = (life_plan_id, content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def discard_plan(self, life_plan_id):
+        with self._lock:
+            for key in [key for key, (plan_id, _) in self._entries.items() if plan_id == life_plan_id]:
+                self._size -= len(self._entries.pop(key)[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+render_cache = RenderCache(getattr(settings, "LIFE_PLAN_RENDER_CACHE_BYTES", 64 * 1024 * 1024))
+
+_content_hashes = OrderedDict()
+_content_hashes_lock = threading.Lock()
+CONTENT_HASHES_SIZE = getattr(settings, "LIFE_PLAN_CONTENT_HASH_CACHE_SIZE", 1024)
+
+
+def plan_content_hash(life_plan):
+    """
+    Hash SHA-256 do conteúdo do plano (nome e itens em ordem estável).
+    O resultado é memorizado por (plano, updated_at), que avança a cada escrita nos itens,
+    num LRU limitado a LIFE_PLAN_CONTENT_HASH_CACHE_SIZE planos.
+    """
+    from life_plan.models import LifePlanItem
+
+    memo_key = (life_plan.pk, life_plan.updated_at)
+    with _content_hashes_lock:
+        cached = _content_hashes.get(life_plan.pk)
+        if cached is not None and cached[0] == memo_key:
+            _content_hashes.move_to_end(life_plan.pk)
+            return cached[1]
+
+    digest = hashlib.sha256(life_plan.name.encode())
+    for row in (
+        LifePlanItem.objects.filter(life_plan=life_plan)
+        .order_by('date', 'category', 'name', 'pk')
+        .values_list('category', 'name', 'date', 'value', 'meta')
+        .iterator(chunk_size=2000)
+    ):
+        digest.update(repr(row).encode())
+    content_hash = digest.hexdigest()
+
+    with _content_hashes_lock:
+        _content_hashes[life_plan.pk] = (memo_key, content_hash)
+        _content_hashes.move_to_end(life_plan.pk)
+        while len(_content_hashes) > CONTENT_HASHES_SIZE:
+            _content_hashes.popitem(last=False)
+    return content_hash
+
+
+def export_cache_key(life_plan, export_format, dark_mode=False):
+    """
+    Chave do conteúdo exportado. O PDF inclui a data de geração no corpo,
+    por isso a data do dia também entra na chave.
+    """
+    parts = [export_format, plan_content_hash(life_plan)]
+    if export_format == 'pdf':
+        parts += [str(int(bool(dark_mode))), date.today().isoformat()]
+    return ':'.join(parts)
+
+
+def export_etag(cache_key):
+    return quote_etag(hashlib.sha256(cache_key.encode()).hexdigest()[:32])
+
+
+def etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def invalidate_plan_exports(life_plan_id):
+    render_cache.discard_plan(life_plan_id)
+    with _content_hashes_lock:
+        _content_hashes.pop(life_plan_id, None)
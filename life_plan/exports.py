@@ -0,0 +1,32 @@
+import csv
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_HEADER = ['Category', 'Name', 'Value', 'Date', 'Meta']
+CSV_FIELDS = ('category', 'name', 'value', 'date', 'meta')
+
+MULTI_PLAN_CSV_HEADER = ['Plan', 'User'] + CSV_HEADER
+MULTI_PLAN_CSV_FIELDS = ('life_plan_id', 'life_plan__user__email') + CSV_FIELDS
+
+
+class Echo:
+    """Pseudo-buffer: `write` devolve a linha em vez de guardá-la, para o csv.writer alimentar um gerador."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_item_rows(queryset, fields, ordering=('date', 'category', 'pk')):
+    """Linhas (tuplas) dos itens em ordem, lidas do banco em blocos, sem instanciar modelos."""
+    return (
+        queryset.order_by(*ordering)
+        .values_list(*fields)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
@@ -0,0 +1,207 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from openpyxl import load_workbook
+from life_plan.bulk import CENTS, ITEM_CATEGORIES
+from life_plan.exports import CSV_FIELDS
+from life_plan.models import LifePlanItem
+from life_plan.rollups import items_changed
+
+IMPORT_CATEGORIES = ITEM_CATEGORIES
+REQUIRED_COLUMNS = ('category', 'name', 'value', 'date')
+DATE_FORMATS = ('%Y-%m-%d', '%Y-%m', '%d/%m/%Y')
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(Exception):
+    """Problema no arquivo como um todo (formato ou cabeçalho), não em uma linha."""
+
+
+class RowError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def iter_csv_table(uploaded_file):
+    """Linhas do CSV (cabeçalho incluído) lidas incrementalmente do arquivo enviado."""
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise ImportFormatError("O CSV deve estar codificado em UTF-8.")
+    finally:
+        text.detach()
+
+
+def iter_xlsx_table(uploaded_file):
+    """Linhas da primeira planilha do XLSX, lidas em modo somente leitura (sem carregar o arquivo todo)."""
+    try:
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFormatError("Não foi possível ler o arquivo XLSX.")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_table(uploaded_file):
+    name = (uploaded_file.name or '').lower()
+    if name.endswith('.csv'):
+        return iter_csv_table(uploaded_file)
+    if name.endswith('.xlsx'):
+        return iter_xlsx_table(uploaded_file)
+    raise ImportFormatError("Formato não suportado. Envie um arquivo .csv ou .xlsx.")
+
+
+def column_positions(header):
+    """Mapeia o cabeçalho (o mesmo da exportação CSV, sem diferenciar maiúsculas) para as posições das colunas."""
+    normalized = [str(cell or '').strip().lower() for cell in header]
+    positions = {field: normalized.index(field) for field in CSV_FIELDS if field in normalized}
+    missing = [field for field in REQUIRED_COLUMNS if field not in positions]
+    if missing:
+        raise ImportFormatError(f"Colunas obrigatórias ausentes: {', '.join(missing)}.")
+    return positions
+
+
+def parse_decimal(value):
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value)).quantize(CENTS)
+    return Decimal(str(value).strip()).quantize(CENTS)
+
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError
+
+
+def parse_row(cells, positions):
+    """Valida uma linha e devolve (categoria, nome, data, valor, meta) ou levanta RowError."""
+    def cell(field):
+        position = positions.get(field)
+        if position is None or position >= len(cells):
+            return None
+        value = cells[position]
+        return value.strip() if isinstance(value, str) else value
+
+    errors = {}
+
+    category = cell('category')
+    if not category:
+        errors['category'] = "Categoria obrigatória."
+    elif category not in IMPORT_CATEGORIES:
+        errors['category'] = f"Categoria desconhecida: {category}."
+
+    name = cell('name')
+    if not name:
+        errors['name'] = "Nome obrigatório."
+    elif len(str(name)) > 100:
+        errors['name'] = "O nome deve ter no máximo 100 caracteres."
+
+    item_date = None
+    if cell('date') in (None, ''):
+        errors['date'] = "Data obrigatória."
+    else:
+        try:
+            item_date = parse_date(cell('date'))
+        except ValueError:
+            errors['date'] = "Data inválida. Use AAAA-MM-DD, AAAA-MM ou DD/MM/AAAA."
+
+    values = {}
+    for field, required in (('value', True), ('meta', False)):
+        raw = cell(field)
+        if raw in (None, ''):
+            if required:
+                errors[field] = "Valor obrigatório."
+            values[field] = Decimal(0).quantize(CENTS)
+            continue
+        try:
+            values[field] = parse_decimal(raw)
+        except InvalidOperation:
+            errors[field] = "Número inválido."
+            continue
+        if not values[field].is_finite():
+            errors[field] = "Número inválido."
+            continue
+        if values[field].copy_abs() >= Decimal('1e8'):
+            errors[field] = "Número maior que o permitido."
+
+    if errors:
+        raise RowError(errors)
+    return category, str(name), item_date, values['value'], values['meta']
+
+
+def import_plan_items(life_plan, uploaded_file, batch_size, partial=False, replace=False):
+    """
+    Importa os itens de um CSV/XLSX no formato da exportação, validando linha a linha
+    e gravando em lotes de `batch_size` dentro de uma transação.
+
+    Sem `partial`, qualquer linha inválida desfaz a importação inteira (as demais linhas
+    continuam sendo validadas para o relatório); com `partial`, as linhas inválidas são ignoradas.
+    Com `replace`, os itens atuais do plano são removidos antes da importação.
+    """
+    table = iter_table(uploaded_file)
+    positions = column_positions(next(table, None) or [])
+
+    result = {'rows': 0, 'created': 0, 'error_count': 0, 'errors': []}
+    touched_dates = set()
+    touched_keys = set()
+    batch = []
+
+    with transaction.atomic():
+        if replace:
+            LifePlanItem.objects.filter(life_plan=life_plan).delete()
+
+        for line, cells in enumerate(table, start=2):
+            if not any(value not in (None, '') for value in cells):
+                continue
+            result['rows'] += 1
+            try:
+                category, name, item_date, value, meta = parse_row(cells, positions)
+            except RowError as exc:
+                result['error_count'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'row': line, 'errors': exc.errors})
+                continue
+
+            if result['error_count'] and not partial:
+                continue
+
+            batch.append(LifePlanItem(
+                life_plan=life_plan, category=category, name=name, date=item_date, value=value, meta=meta
+            ))
+            touched_dates.add(item_date)
+            touched_keys.add((category, name))
+            if len(batch) >= batch_size:
+                LifePlanItem.objects.bulk_create(batch)
+                result['created'] += len(batch)
+                batch = []
+
+        if result['error_count'] and not partial:
+            transaction.set_rollback(True)
+            result['created'] = 0
+            return result
+
+        if batch:
+            LifePlanItem.objects.bulk_create(batch)
+            result['created'] += len(batch)
+
+        if replace:
+            items_changed(life_plan.id)
+        elif result['created']:
+            items_changed(life_plan.id, touched_dates, touched_keys)
+
+    return result
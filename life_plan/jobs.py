@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from life_plan.models import LifePlanExportJob
+from life_plan.reports import render_plan_pdf
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool de threads do processo usado para renderizar exportações fora do ciclo da requisição."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "LIFE_PLAN_EXPORT_WORKERS", 2),
+                thread_name_prefix="life-plan-export",
+            )
+        return _executor
+
+
+def fail_stale_jobs(queryset=None):
+    """
+    Marca como falhos os jobs pendentes/em execução há mais de LIFE_PLAN_EXPORT_JOB_TIMEOUT
+    segundos: a thread que os renderizaria morreu com o processo (reinício ou deploy) e,
+    sem isso, ficariam presos e bloqueariam novos jobs para o mesmo estado do plano.
+    """
+    if queryset is None:
+        queryset = LifePlanExportJob.objects.all()
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "LIFE_PLAN_EXPORT_JOB_TIMEOUT", 600))
+    return queryset.filter(
+        status__in=[LifePlanExportJob.STATUS_PENDING, LifePlanExportJob.STATUS_RUNNING],
+        created_at__lt=cutoff,
+    ).update(status=LifePlanExportJob.STATUS_FAILED, error="Tempo limite excedido.", finished_at=timezone.now())
+
+
+def find_cached_export(life_plan, dark_mode, rendered_on=None):
+    """
+    Último PDF pronto para o estado atual do plano (plano + updated_at + dark_mode), se houver.
+    Com `rendered_on`, só vale um PDF gerado nesse dia (hora local), já que a data de geração é impressa.
+    """
+    jobs = LifePlanExportJob.objects.filter(
+        cache_key=LifePlanExportJob.build_cache_key(life_plan, dark_mode),
+        status=LifePlanExportJob.STATUS_DONE,
+    )
+    if rendered_on is not None:
+        day_start = datetime.combine(rendered_on, time.min).astimezone()
+        jobs = jobs.filter(finished_at__gte=day_start, finished_at__lt=day_start + timedelta(days=1))
+    return (
+        jobs
+        .exclude(file="")
+        .order_by("-finished_at")
+        .first()
+    )
+
+
+def enqueue_export(life_plan, dark_mode):
+    """
+    Devolve um job para o PDF do plano: o já pronto hoje (cache; o PDF imprime a data
+    de geração), um ainda em andamento para o mesmo estado do plano, ou um novo job enfileirado.
+    """
+    cache_key = LifePlanExportJob.build_cache_key(life_plan, dark_mode)
+    fail_stale_jobs(LifePlanExportJob.objects.filter(cache_key=cache_key))
+    job = find_cached_export(life_plan, dark_mode, rendered_on=date.today())
+    if job is not None:
+        return job
+
+    job = (
+        LifePlanExportJob.objects.filter(
+            cache_key=cache_key,
+            status__in=[LifePlanExportJob.STATUS_PENDING, LifePlanExportJob.STATUS_RUNNING],
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if job is not None:
+        return job
+
+    job = LifePlanExportJob.objects.create(life_plan=life_plan, dark_mode=dark_mode, cache_key=cache_key)
+    transaction.on_commit(lambda: get_executor().submit(run_export_job, job.pk))
+    return job
+
+
+def run_export_job(job_id):
+    close_old_connections()
+    try:
+        # Só um job ainda pendente é executado (um já marcado como falho por tempo limite, não).
+        started = LifePlanExportJob.objects.filter(pk=job_id, status=LifePlanExportJob.STATUS_PENDING).update(
+            status=LifePlanExportJob.STATUS_RUNNING
+        )
+        if not started:
+            return
+        job = LifePlanExportJob.objects.select_related("life_plan").get(pk=job_id)
+
+        try:
+            content = render_plan_pdf(job.life_plan, job.dark_mode)
+        except Exception as exc:
+            job.status = LifePlanExportJob.STATUS_FAILED
+            job.error = str(exc)
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "error", "finished_at"])
+            return
+
+        job.file.save(f"plano_de_vida_{job.life_plan_id}_{job.pk}.pdf", ContentFile(content), save=False)
+        job.status = LifePlanExportJob.STATUS_DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=["file", "status", "finished_at"])
+
+        discard_stale_exports(job)
+    finally:
+        close_old_connections()
+
+
+def discard_stale_exports(job):
+    """
+    Remove PDFs anteriores do mesmo plano/tema, que já não refletem o estado atual
+    ou foram gerados em outro dia (com outra data de geração impressa).
+    """
+    stale = (
+        LifePlanExportJob.objects.filter(life_plan_id=job.life_plan_id, dark_mode=job.dark_mode)
+        .exclude(pk=job.pk)
+        .exclude(status__in=[LifePlanExportJob.STATUS_PENDING, LifePlanExportJob.STATUS_RUNNING])
+    )
+    for old_job in stale:
+        if old_job.file:
+            old_job.file.delete(save=False)
+        old_job.delete()
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from life_plan.models import LifePlan
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Cria o plano de vida padrão para usuários que ainda não possuem um."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas lista quantos usuários seriam provisionados.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(life_plans__isnull=True).order_by("pk")
+        total = users.count()
+
+        if options["dry_run"]:
+            self.stdout.write(f"{total} usuário(s) sem plano de vida.")
+            return
+
+        created = 0
+        for user in users.iterator():
+            LifePlan.create_default_plan(user=user)
+            created += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{created} plano(s) padrão criado(s)."))
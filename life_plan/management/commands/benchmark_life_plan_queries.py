@@ -0,0 +1,132 @@
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Sum
+from life_plan.models import LifePlan, LifePlanItem
+from life_plan.seeding import default_plan_template
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria um banco descartável (o mesmo do `manage.py test`), popula vários planos e compara "
+        "planos de execução e tempos das consultas de LifePlanItem sem e com os índices compostos. "
+        "O banco configurado não é alterado: nem dados nem índices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plans", type=int, default=200, help="Quantidade de planos a popular.")
+        parser.add_argument("--years", type=int, default=3, help="Anos de itens por plano.")
+        parser.add_argument("--repeat", type=int, default=20, help="Execuções de cada consulta.")
+        parser.add_argument(
+            "--noinput", "--no-input", action="store_false", dest="interactive",
+            help="Remove sem perguntar um banco de testes que tenha sobrado de outra execução.",
+        )
+
+    def handle(self, *args, **options):
+        # Os índices são removidos e os dados populados só no banco de testes, criado e
+        # destruído aqui; a conexão volta ao banco configurado ao final.
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options["interactive"], serialize=False)
+        try:
+            self.benchmark(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        plan = self.seed(options["plans"], options["years"])
+        queries = self.queries(plan)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Sem índices compostos"))
+        self.drop_indexes()
+        self.analyze()
+        before = self.run(queries, options["repeat"])
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Com índices compostos"))
+        self.create_indexes()
+        self.analyze()
+        after = self.run(queries, options["repeat"])
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Resumo (mediana em ms)"))
+        for label in queries:
+            self.stdout.write(f"{label:<45} {before[label]:>9.3f} -> {after[label]:>9.3f}")
+
+    def seed(self, plan_count, years):
+        self.stdout.write(f"Populando {plan_count} plano(s) x {years} ano(s)...")
+        users = User.objects.bulk_create([
+            User(username=f"benchmark-{index}", email=f"benchmark-{index}@example.com", referral_code=f"BM{index:08d}")
+            for index in range(plan_count)
+        ])
+        plans = LifePlan.objects.bulk_create([LifePlan(user=user, name="Benchmark") for user in users])
+
+        template = default_plan_template()
+        first_year = date.today().year
+        batch = []
+        for plan in plans:
+            for year in range(first_year, first_year + years):
+                batch.extend(
+                    LifePlanItem(
+                        life_plan=plan, category=category, name=name,
+                        date=date(year, month, 1), value=value, meta=meta,
+                    )
+                    for month, category, name, value, meta in template
+                )
+            if len(batch) >= 10000:
+                LifePlanItem.objects.bulk_create(batch, batch_size=2000)
+                batch = []
+        LifePlanItem.objects.bulk_create(batch, batch_size=2000)
+
+        self.stdout.write(f"{LifePlanItem.objects.count()} itens.")
+        return plans[len(plans) // 2]
+
+    def queries(self, plan):
+        month = date(date.today().year, 6, 1)
+        items = LifePlanItem.objects.filter(life_plan=plan)
+        return {
+            "itens do plano ordenados (serializer/CSV)": items.order_by("date", "category").values_list(
+                "category", "name", "date", "value", "meta"
+            ),
+            "totais por mês/categoria (resumo mensal)": items.filter(date=month).order_by().values(
+                "date", "category"
+            ).annotate(total=Sum("value"), count=Count("id")),
+            "célula por (categoria, nome, data)": items.filter(
+                category="receitas", name="Salário", date=month
+            ).values_list("pk", "value"),
+            "linha de um item ao longo dos meses": items.filter(
+                category="investimentos", name="Renda Fixa"
+            ).order_by("date").values_list("date", "value"),
+        }
+
+    def drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for index in LifePlanItem._meta.indexes:
+                schema_editor.remove_index(LifePlanItem, index)
+
+    def create_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for index in LifePlanItem._meta.indexes:
+                schema_editor.add_index(LifePlanItem, index)
+
+    def analyze(self):
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def run(self, queries, repeat):
+        medians = {}
+        for label, queryset in queries.items():
+            self.stdout.write(self.style.SQL_KEYWORD(label))
+            self.stdout.write(queryset.explain())
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[label] = statistics.median(timings)
+            self.stdout.write(f"  mediana {medians[label]:.3f} ms\n")
+        return medians
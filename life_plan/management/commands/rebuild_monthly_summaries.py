@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from life_plan.models import LifePlan
+from life_plan.rollups import refresh_goal_progress, refresh_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o resumo mensal (mês x categoria) e o progresso das metas dos planos de vida."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--plan",
+            type=int,
+            action="append",
+            dest="plans",
+            help="ID do plano a reconstruir (pode ser repetido). Sem ele, todos os planos são reconstruídos.",
+        )
+
+    def handle(self, *args, **options):
+        plans = LifePlan.objects.order_by("pk")
+        if options["plans"]:
+            plans = plans.filter(pk__in=options["plans"])
+
+        rebuilt = 0
+        for plan_id in plans.values_list("pk", flat=True).iterator():
+            refresh_monthly_summaries(plan_id)
+            refresh_goal_progress(plan_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} plano(s) reconstruído(s)."))
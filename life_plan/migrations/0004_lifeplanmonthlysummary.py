@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_monthly_summaries(apps, schema_editor):
+    LifePlanItem = apps.get_model('life_plan', 'LifePlanItem')
+    LifePlanMonthlySummary = apps.get_model('life_plan', 'LifePlanMonthlySummary')
+
+    rows = (
+        LifePlanItem.objects.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('life_plan_id', 'month', 'category')
+        .annotate(total_value=Sum('value'), total_meta=Sum('meta'), item_count=Count('id'))
+    )
+    LifePlanMonthlySummary.objects.bulk_create(
+        (LifePlanMonthlySummary(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('life_plan', '0003_lifeplanitem_meta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LifePlanMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('category', models.CharField(max_length=20, verbose_name='Category')),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Value')),
+                ('total_meta', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Meta')),
+                ('item_count', models.PositiveIntegerField(default=0, verbose_name='Item Count')),
+                ('life_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='life_plan.lifeplan', verbose_name='Life Plan')),
+            ],
+            options={
+                'verbose_name': 'Life Plan Monthly Summary',
+                'verbose_name_plural': 'Life Plan Monthly Summaries',
+                'constraints': [models.UniqueConstraint(fields=('life_plan', 'month', 'category'), name='unique_life_plan_summary_month_category')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('life_plan', '0004_lifeplanmonthlysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LifePlanExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dark_mode', models.BooleanField(default=False, verbose_name='Dark Mode')),
+                ('cache_key', models.CharField(db_index=True, max_length=100, verbose_name='Cache Key')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('file', models.FileField(blank=True, null=True, upload_to='life_plan_exports/', verbose_name='File')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('life_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='life_plan.lifeplan', verbose_name='Life Plan')),
+            ],
+            options={
+                'verbose_name': 'Life Plan Export Job',
+                'verbose_name_plural': 'Life Plan Export Jobs',
+            },
+        ),
+    ]
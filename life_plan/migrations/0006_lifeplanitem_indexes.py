@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(migrations.AddIndex):
+    """
+    No PostgreSQL usa CREATE INDEX CONCURRENTLY, que não bloqueia escritas
+    em tabelas grandes; nos demais bancos se comporta como AddIndex.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('life_plan', '0005_lifeplanexportjob'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lifeplanitem',
+            options={'ordering': ['date', 'category']},
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='lifeplanitem',
+            index=models.Index(fields=['life_plan', 'date', 'category'], name='lifeplanitem_plan_date_cat'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='lifeplanitem',
+            index=models.Index(fields=['life_plan', 'category', 'name', 'date'], name='lifeplanitem_plan_cat_name_dt'),
+        ),
+    ]
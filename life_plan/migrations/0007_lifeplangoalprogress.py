@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:46
+
+from datetime import date
+from decimal import ROUND_CEILING, Decimal
+from itertools import groupby
+from operator import itemgetter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Cópia congelada de life_plan.rollups.build_goal_progress na data desta migração,
+# para que mudanças futuras no módulo não alterem o histórico.
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    if index // 12 > date.max.year:
+        return None
+    return date(index // 12, index % 12 + 1, 1)
+
+
+PROJECTION_HORIZON_MONTHS = 100 * 12
+MAX_PERCENT = Decimal('99999999.99')
+
+
+def clamp_percent(value):
+    """Percentual limitado ao que cabe em LifePlanGoalProgress.percent (max_digits=10)."""
+    return max(-MAX_PERCENT, min(MAX_PERCENT, value)).quantize(Decimal('0.01'))
+
+
+def build_goal_progress(rows):
+    for (category, name), group in groupby(rows, key=itemgetter(0, 1)):
+        group = list(group)
+        meta = max(row[4] for row in group)
+        months = sorted({month_start(row[2]) for row in group})
+
+        cumulative = Decimal(0)
+        reached = None
+        for _, _, item_date, value, _ in group:
+            cumulative += value
+            if reached is None and meta > 0 and cumulative >= meta:
+                reached = month_start(item_date)
+
+        projected = reached
+        if projected is None and meta > 0 and cumulative > 0:
+            monthly_average = cumulative / len(months)
+            remaining = ((meta - cumulative) / monthly_average).to_integral_value(rounding=ROUND_CEILING)
+            if remaining <= PROJECTION_HORIZON_MONTHS:
+                projected = add_months(months[-1], int(remaining))
+
+        yield {
+            'category': category,
+            'name': name,
+            'cumulative_value': cumulative,
+            'meta': meta,
+            'percent': clamp_percent(cumulative * 100 / meta) if meta > 0 else None,
+            'item_count': len(group),
+            'first_month': months[0],
+            'last_month': months[-1],
+            'projected_completion': projected,
+        }
+
+
+def populate_goal_progress(apps, schema_editor):
+    LifePlanItem = apps.get_model('life_plan', 'LifePlanItem')
+    LifePlanGoalProgress = apps.get_model('life_plan', 'LifePlanGoalProgress')
+
+    for life_plan_id in LifePlanItem.objects.order_by().values_list('life_plan_id', flat=True).distinct():
+        rows = (
+            LifePlanItem.objects.filter(life_plan_id=life_plan_id)
+            .order_by('category', 'name', 'date', 'pk')
+            .values_list('category', 'name', 'date', 'value', 'meta')
+        )
+        LifePlanGoalProgress.objects.bulk_create(
+            (LifePlanGoalProgress(life_plan_id=life_plan_id, **row) for row in build_goal_progress(rows.iterator())),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('life_plan', '0006_lifeplanitem_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LifePlanGoalProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20, verbose_name='Category')),
+                ('name', models.CharField(max_length=100, verbose_name='Item Name')),
+                ('cumulative_value', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Cumulative Value')),
+                ('meta', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Meta')),
+                ('percent', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Percent')),
+                ('item_count', models.PositiveIntegerField(default=0, verbose_name='Item Count')),
+                ('first_month', models.DateField(blank=True, null=True, verbose_name='First Month')),
+                ('last_month', models.DateField(blank=True, null=True, verbose_name='Last Month')),
+                ('projected_completion', models.DateField(blank=True, null=True, verbose_name='Projected Completion')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('life_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_progress', to='life_plan.lifeplan', verbose_name='Life Plan')),
+            ],
+            options={
+                'verbose_name': 'Life Plan Goal Progress',
+                'verbose_name_plural': 'Life Plan Goal Progress',
+                'constraints': [models.UniqueConstraint(fields=('life_plan', 'category', 'name'), name='unique_life_plan_goal_category_name')],
+            },
+        ),
+        migrations.RunPython(populate_goal_progress, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime
+from life_plan.seeding import DEFAULT_PLAN_NAME, seed_default_items
 
 class LifePlan(models.Model):
     user = models.ForeignKey(
@@ -18,7 +19,7 @@ class LifePlan(models.Model):
         return f"Life Plan for {self.user.email}"
 
     @classmethod
-    def create_default_plan(cls, user, name="Meu Plano de Vida"):
+    def create_default_plan(cls, user, name=DEFAULT_PLAN_NAME):
         """
         Cria um plano de vida padrão para o usuário com itens pré-definidos para 1 ano
         apenas se o usuário ainda não tiver um plano
@@ -27,117 +28,12 @@ class LifePlan(models.Model):
         if existing_plan:
             return existing_plan
 
-        plan = cls.objects.create(
-        user=user,
-        name=name
-        )
-
-        current_year = datetime.now().year
-
-        default_items = {
-            'receitas': [
-                {"name": "Salário", "value": 5000.00, "meta": 5000.00},
-                {"name": "Freelance", "value": 1000.00, "meta": 1000.00},
-                {"name": "Outras Receitas", "value": 500.00, "meta": 500.00},
-            ],
-            'renda_extra': [
-                {"name": "Aluguel", "value": 800.00, "meta": 9600.00},
-                {"name": "Dividendos", "value": 300.00, "meta": 3600.00},
-                {"name": "Venda de Produtos", "value": 400.00, "meta": 4800.00},
-                {"name": "Plataforma", "value": 4420.00, "meta": 6000.00},
-            ],
-            'custos': [
-                {"name": "Moradia", "value": 1800.00, "meta": 1800.00},
-                {"name": "Alimentação", "value": 1200.00, "meta": 1200.00},
-                {"name": "Transporte", "value": 600.00, "meta": 600.00},
-                {"name": "Saúde", "value": 400.00, "meta": 400.00},
-                {"name": "Lazer", "value": 500.00, "meta": 500.00},
-                {"name": "Serviços", "value": 450.00, "meta": 450.00},
-            ],
-            'estudos': [
-                {"name": "Curso de Especialização", "value": 500.00, "meta": 6000.00},
-                {"name": "Idiomas", "value": 200.00, "meta": 2400.00},
-                {"name": "Livros/Material", "value": 100.00, "meta": 1200.00},
-            ],
-            'investimentos': [
-                {"name": "Reserva de Emergência", "value": 500.00, "meta": 6000.00},
-                {"name": "Renda Fixa", "value": 150.00, "meta": 1800.00},
-                {"name": "Renda Variável", "value": 100.00, "meta": 1200.00},
-            ],
-            'realizacoes': [
-                {"name": "Viagem Nacional", "value": 3000.00, "meta": 3000.00, "month": 7},
-                {"name": "Compra de Notebook", "value": 5000.00, "meta": 5000.00, "month": 10},
-                {"name": "Reforma do Quarto", "value": 2500.00, "meta": 2500.00, "month": 12},
-            ],
-            'intercambio': [
-                {"name": "Poupança para Intercâmbio", "value": 1000.00, "meta": 12000.00},
-            ],
-            'empresas': [
-                {"name": "Projeto Freelance", "value": 2000.00, "meta": 5000.00, "month": 6},
-                {"name": "Startup Tecnologia", "value": 10000.00, "meta": 50000.00, "month": 3},
-                {"name": "E-commerce", "value": 5000.00, "meta": 20000.00, "month": 9},
-                {"name": "Consultoria", "value": 1500.00, "meta": 15000.00, "month": 1},
-                {"name": "Curso Online", "value": 3000.00, "meta": 12000.00, "month": 4},
-            ],
-            'pessoais': [
-                {"name": "Desenvolvimento Pessoal", "value": 200.00, "meta": 2400.00},
-                {"name": "Terapia", "value": 300.00, "meta": 3600.00},
-                {"name": "Atividade Física", "value": 150.00, "meta": 1800.00},
-                {"name": "Hobby", "value": 100.00, "meta": 1200.00},
-                {"name": "Voluntariado", "value": 50.00, "meta": 600.00},
-            ],
-        }
-
-        for month in range(1, 13):
-            date = datetime(current_year, month, 1).date()
-
-            for category in ['receitas', 'renda_extra', 'custos', 'estudos', 'investimentos', 'intercambio', 'pessoais']:
-                for item in default_items.get(category, []):
-                    LifePlanItem.objects.create(
-                        life_plan=plan,
-                        category=category,
-                        name=item["name"],
-                        value=item["value"],
-                        date=date,
-                        meta=item["meta"]
-                    )
-
-            for item in default_items.get('realizacoes', []):
-                if item.get("month") == month:
-                    LifePlanItem.objects.create(
-                        life_plan=plan,
-                        category='realizacoes',
-                        name=item["name"],
-                        value=item["value"],
-                        date=date,
-                        meta=item["meta"]
-                    )
-
-            for item in default_items.get('empresas', []):
-                if item.get("month") == month:
-                    LifePlanItem.objects.create(
-                        life_plan=plan,
-                        category='empresas',
-                        name=item["name"],
-                        value=item["value"],
-                        date=date,
-                        meta=item["meta"]
-                    )
-
-            receitas_total = sum(item["value"] for item in default_items.get('receitas', []))
-            renda_extra_total = sum(item["value"] for item in default_items.get('renda_extra', []))
-            custos_total = sum(item["value"] for item in default_items.get('custos', []))
-            estudos_total = sum(item["value"] for item in default_items.get('estudos', []))
-            
-            lucro = (receitas_total + renda_extra_total) - (custos_total + estudos_total)
-            LifePlanItem.objects.create(
-                life_plan=plan,
-                category='lucro_prejuizo',
-                name="Lucro/Prejuízo Mensal",
-                value=lucro,
-                date=date,
-                meta=lucro
+        with transaction.atomic():
+            plan = cls.objects.create(
+                user=user,
+                name=name
             )
+            seed_default_items(plan, datetime.now().year)
 
         return plan
 
@@ -166,5 +62,113 @@ class LifePlanItem(models.Model):
     meta = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Meta")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
 
+    class Meta:
+        ordering = ['date', 'category']
+        indexes = [
+            models.Index(fields=['life_plan', 'date', 'category'], name='lifeplanitem_plan_date_cat'),
+            models.Index(fields=['life_plan', 'category', 'name', 'date'], name='lifeplanitem_plan_cat_name_dt'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.name}: {self.value}"
+
+class LifePlanMonthlySummary(models.Model):
+    life_plan = models.ForeignKey(
+        LifePlan,
+        on_delete=models.CASCADE,
+        related_name="monthly_summaries",
+        verbose_name="Life Plan"
+    )
+    month = models.DateField(verbose_name="Month")
+    category = models.CharField(max_length=20, verbose_name="Category")
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total Value")
+    total_meta = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total Meta")
+    item_count = models.PositiveIntegerField(default=0, verbose_name="Item Count")
+
+    class Meta:
+        verbose_name = _("Life Plan Monthly Summary")
+        verbose_name_plural = _("Life Plan Monthly Summaries")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['life_plan', 'month', 'category'],
+                name='unique_life_plan_summary_month_category'
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.category} - {self.name}: {self.value}"
\ No newline at end of file
+        return f"{self.life_plan_id} - {self.month:%Y-%m} - {self.category}: {self.total_value}"
+
+
+class LifePlanGoalProgress(models.Model):
+    """
+    Progresso de cada linha (categoria, nome) do plano em direção à sua meta,
+    mantido por `items_changed` a cada escrita nos itens.
+    """
+    life_plan = models.ForeignKey(
+        LifePlan,
+        on_delete=models.CASCADE,
+        related_name="goal_progress",
+        verbose_name="Life Plan"
+    )
+    category = models.CharField(max_length=20, verbose_name="Category")
+    name = models.CharField(max_length=100, verbose_name="Item Name")
+    cumulative_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Cumulative Value")
+    meta = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Meta")
+    percent = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Percent")
+    item_count = models.PositiveIntegerField(default=0, verbose_name="Item Count")
+    first_month = models.DateField(null=True, blank=True, verbose_name="First Month")
+    last_month = models.DateField(null=True, blank=True, verbose_name="Last Month")
+    projected_completion = models.DateField(null=True, blank=True, verbose_name="Projected Completion")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+
+    class Meta:
+        verbose_name = _("Life Plan Goal Progress")
+        verbose_name_plural = _("Life Plan Goal Progress")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['life_plan', 'category', 'name'],
+                name='unique_life_plan_goal_category_name'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.life_plan_id} - {self.category} - {self.name}: {self.percent}%"
+
+
+class LifePlanExportJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _("Pending")),
+        (STATUS_RUNNING, _("Running")),
+        (STATUS_DONE, _("Done")),
+        (STATUS_FAILED, _("Failed")),
+    ]
+
+    life_plan = models.ForeignKey(
+        LifePlan,
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+        verbose_name="Life Plan"
+    )
+    dark_mode = models.BooleanField(default=False, verbose_name="Dark Mode")
+    cache_key = models.CharField(max_length=100, db_index=True, verbose_name="Cache Key")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    file = models.FileField(upload_to="life_plan_exports/", blank=True, null=True, verbose_name="File")
+    error = models.TextField(blank=True, default="", verbose_name="Error")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name="Finished At")
+
+    class Meta:
+        verbose_name = _("Life Plan Export Job")
+        verbose_name_plural = _("Life Plan Export Jobs")
+
+    def __str__(self):
+        return f"Export {self.pk} of plan {self.life_plan_id} ({self.status})"
+
+    @staticmethod
+    def build_cache_key(life_plan, dark_mode):
+        return f"pdf:{life_plan.pk}:{life_plan.updated_at.isoformat()}:{int(bool(dark_mode))}"
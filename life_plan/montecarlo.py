@@ -0,0 +1,120 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Este módulo é importado pelos processos do pool: mantenha no topo apenas
+# dependências leves (NumPy) e importe Django/ORM dentro das funções.
+
+PERCENTILES = [5, 25, 50, 75, 95]
+PATHS_PER_CHUNK = 2000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers):
+    """Pool de processos (spawn) compartilhado pelas simulações."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def monthly_log_return_params(expected_return, volatility):
+    """Média e desvio mensais do log-retorno para um retorno anual esperado e volatilidade anual."""
+    sigma = volatility / np.sqrt(12)
+    mu = np.log1p(expected_return) / 12 - sigma ** 2 / 2
+    return mu, sigma
+
+
+def simulate_chunk(seed_sequence, paths, contributions, row_contributions, mu, sigma, initial_balance):
+    """
+    Simula `paths` trajetórias de retorno e devolve (saldos totais, saldos finais por linha).
+
+    Com G[t] = prod_{k<=t} (1 + r[k]), o saldo B[t] = B[t-1] * (1 + r[t]) + aporte[t]
+    tem forma fechada B[t] = G[t] * (B0 + soma_{s<=t} aporte[s] / G[s]). O saldo final de cada
+    linha é um único produto de matrizes entre 1/G e os aportes das linhas.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    growth = np.exp(np.cumsum(rng.normal(mu, sigma, size=(paths, len(contributions))), axis=1))
+    discount = 1 / growth
+    balances = growth * (initial_balance + np.cumsum(contributions * discount, axis=1))
+    row_final = growth[:, -1:] * (discount @ row_contributions.T)
+    return balances, row_final
+
+
+def run_simulation(contributions, row_contributions, expected_return, volatility,
+                   initial_balance=0, paths=10000, seed=None, workers=0):
+    """
+    Executa a simulação em blocos de PATHS_PER_CHUNK trajetórias. Cada bloco recebe
+    uma semente derivada de `seed`, então o resultado é o mesmo em série ou no pool.
+    """
+    mu, sigma = monthly_log_return_params(expected_return, volatility)
+    sizes = [min(PATHS_PER_CHUNK, paths - offset) for offset in range(0, paths, PATHS_PER_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [
+        (chunk_seed, size, contributions, row_contributions, mu, sigma, initial_balance)
+        for chunk_seed, size in zip(seeds, sizes)
+    ]
+
+    if workers and len(arguments) > 1:
+        futures = [get_executor(workers).submit(simulate_chunk, *args) for args in arguments]
+        results = [future.result() for future in futures]
+    else:
+        results = [simulate_chunk(*args) for args in arguments]
+
+    balances = np.concatenate([balances for balances, _ in results])
+    row_final = np.concatenate([row_final for _, row_final in results])
+    return balances, row_final
+
+
+def monte_carlo(profile, categories, years, expected_return, volatility,
+                initial_balance=0, paths=10000, seed=None, workers=0):
+    """
+    Simula os aportes mensais das categorias de investimento do ano-base do plano
+    e devolve faixas de percentis do saldo e a probabilidade de atingir cada meta.
+    """
+    from life_plan.projection import CATEGORY_INDEX, projection_months
+
+    horizon = years * 12
+    calendar_months = (profile.start.month - 1 + np.arange(horizon)) % 12
+    contributions = profile.category_values[[CATEGORY_INDEX[category] for category in categories]].sum(axis=0)
+    contributions = contributions[calendar_months]
+
+    goal_rows = [
+        index for index, (category, _) in enumerate(profile.goals) if category in categories
+    ]
+    row_contributions = profile.goal_values[goal_rows][:, calendar_months]
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+
+    balances, row_final = run_simulation(
+        contributions, row_contributions, expected_return, volatility,
+        initial_balance=initial_balance, paths=paths, seed=seed, workers=workers,
+    )
+    bands = np.percentile(balances, PERCENTILES, axis=0)
+    metas = profile.goal_metas[goal_rows]
+
+    return {
+        "seed": seed,
+        "paths": paths,
+        "months": [month.isoformat() for month in projection_months(profile, years)],
+        "contributed": (initial_balance + np.cumsum(contributions)).round(2).tolist(),
+        "percentiles": {f"p{percentile}": band.round(2).tolist() for percentile, band in zip(PERCENTILES, bands)},
+        "goals": [
+            {
+                "category": profile.goals[index][0],
+                "name": profile.goals[index][1],
+                "meta": round(float(meta), 2),
+                "probability": round(float((row_final[:, column] >= meta).mean()), 4),
+                "median_final": round(float(np.median(row_final[:, column])), 2),
+            }
+            for column, (index, meta) in enumerate(zip(goal_rows, metas))
+        ],
+    }
@@ -0,0 +1,225 @@
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from life_plan.reports import build_plan_matrix
+from life_plan.rollups import month_start, next_month
+
+INCOME_CATEGORIES = ['receitas', 'renda_extra']
+EXPENSE_CATEGORIES = ['custos', 'estudos', 'pessoais']
+INVESTMENT_CATEGORIES = ['investimentos', 'intercambio']
+GOAL_CATEGORIES = ['realizacoes', 'empresas']
+PROJECTION_CATEGORIES = INCOME_CATEGORIES + EXPENSE_CATEGORIES + INVESTMENT_CATEGORIES + GOAL_CATEGORIES
+
+CATEGORY_INDEX = {category: index for index, category in enumerate(PROJECTION_CATEGORIES)}
+
+MAX_PROJECTION_YEARS = 30
+SCENARIO_CHUNK_SIZE = 256
+
+
+def category_indexes(categories):
+    return [CATEGORY_INDEX[category] for category in categories]
+
+
+INCOME_INDEXES = category_indexes(INCOME_CATEGORIES)
+EXPENSE_INDEXES = category_indexes(EXPENSE_CATEGORIES)
+INVESTMENT_INDEXES = category_indexes(INVESTMENT_CATEGORIES)
+GOAL_INDEXES = category_indexes(GOAL_CATEGORIES)
+
+
+class PlanProfile:
+    """
+    Ano-base de um plano usado nas projeções.
+
+    `category_values` tem formato (categorias, 12) com o valor mais recente de
+    cada mês do calendário; `goal_values` (metas, 12) guarda as linhas de
+    investimentos/objetivos que têm meta, com `goal_categories` e `goal_metas` alinhados.
+    """
+
+    def __init__(self, start, category_values, goals, goal_categories, goal_values, goal_metas):
+        self.start = start
+        self.category_values = category_values
+        self.goals = goals
+        self.goal_categories = goal_categories
+        self.goal_values = goal_values
+        self.goal_metas = goal_metas
+
+
+def build_plan_profile(matrix):
+    """Reduz a PlanMatrix ao ano-base: para cada mês do calendário vale a ocorrência mais recente."""
+    row_profile = np.zeros((len(matrix.rows), 12))
+    for column, month in enumerate(matrix.months):
+        # Só células presentes: um mês ausente num ano posterior não apaga o valor de um ano anterior.
+        mask = matrix.present[:, column]
+        row_profile[mask, month.month - 1] = matrix.values[mask, column]
+
+    row_categories = np.array([CATEGORY_INDEX.get(category, -1) for category, _ in matrix.rows], dtype=np.intp)
+    known = row_categories >= 0
+    category_values = np.zeros((len(PROJECTION_CATEGORIES), 12))
+    np.add.at(category_values, row_categories[known], row_profile[known])
+
+    goal_rows = [
+        index for index, (category, _) in enumerate(matrix.rows)
+        if category in INVESTMENT_CATEGORIES + GOAL_CATEGORIES and matrix.metas[index].max() > 0
+    ]
+
+    start = next_month(matrix.months[-1]) if matrix.months else month_start(date.today())
+    return PlanProfile(
+        start=start,
+        category_values=category_values,
+        goals=[matrix.rows[index] for index in goal_rows],
+        goal_categories=row_categories[goal_rows],
+        goal_values=row_profile[goal_rows],
+        goal_metas=matrix.metas[goal_rows].max(axis=1) if goal_rows else np.zeros(0),
+    )
+
+
+@lru_cache(maxsize=128)
+def cached_plan_profile(life_plan_id, updated_at):
+    from life_plan.models import LifePlanItem
+
+    return build_plan_profile(build_plan_matrix(LifePlanItem.objects.filter(life_plan_id=life_plan_id)))
+
+
+def plan_profile(life_plan):
+    """Ano-base do plano, memorizado por (plano, updated_at)."""
+    return cached_plan_profile(life_plan.pk, life_plan.updated_at)
+
+
+def monthly_rate(annual_rate):
+    return np.power(1 + np.asarray(annual_rate, dtype=float), 1 / 12) - 1
+
+
+def scenario_arrays(scenarios):
+    """
+    Converte uma lista de premissas em arrays (cenários, ...):
+    crescimento anual por categoria, retorno mensal e saldos iniciais.
+    """
+    growth = np.zeros((len(scenarios), len(PROJECTION_CATEGORIES)))
+    for row, assumptions in enumerate(scenarios):
+        growth[row, INCOME_INDEXES] = assumptions.get('income_growth', 0)
+        growth[row, EXPENSE_INDEXES + GOAL_INDEXES] = assumptions.get('inflation', 0)
+        for category, rate in assumptions.get('category_growth', {}).items():
+            growth[row, CATEGORY_INDEX[category]] = rate
+
+    return {
+        'growth': growth,
+        'monthly_return': monthly_rate([assumptions.get('investment_return', 0) for assumptions in scenarios]),
+        'initial_cash': np.array([assumptions.get('initial_cash', 0) for assumptions in scenarios], dtype=float),
+        'initial_investments': np.array(
+            [assumptions.get('initial_investments', 0) for assumptions in scenarios], dtype=float
+        ),
+    }
+
+
+def project(profile, arrays, years):
+    """
+    Projeta mês a mês todos os cenários de uma vez.
+
+    Os fluxos têm formato (cenários, categorias, meses). O saldo investido usa a forma
+    fechada de B[t] = B[t-1] * (1 + r) + aporte[t]:
+    B[t] = (1 + r)^(t+1) * (B0 + soma_{s<=t} aporte[s] / (1 + r)^(s+1)).
+    """
+    horizon = years * 12
+    steps = np.arange(horizon)
+    calendar_months = (profile.start.month - 1 + steps) % 12
+
+    growth = np.power(1 + arrays['growth'][:, :, None], steps // 12)
+    flows = profile.category_values[:, calendar_months] * growth
+
+    income = flows[:, INCOME_INDEXES].sum(axis=1)
+    expenses = flows[:, EXPENSE_INDEXES].sum(axis=1)
+    contributions = flows[:, INVESTMENT_INDEXES].sum(axis=1)
+    goal_spending = flows[:, GOAL_INDEXES].sum(axis=1)
+
+    compound = np.power(1 + arrays['monthly_return'][:, None], steps + 1)
+    investment_balance = compound * (
+        arrays['initial_investments'][:, None] + np.cumsum(contributions / compound, axis=1)
+    )
+    cash_balance = arrays['initial_cash'][:, None] + np.cumsum(
+        income - expenses - contributions - goal_spending, axis=1
+    )
+
+    goal_series = profile.goal_values[:, calendar_months] * growth[:, profile.goal_categories]
+    invested = np.isin(profile.goal_categories, INVESTMENT_INDEXES)[None, :, None]
+    goal_accumulated = np.where(
+        invested,
+        compound[:, None, :] * np.cumsum(goal_series / compound[:, None, :], axis=2),
+        np.cumsum(goal_series, axis=2),
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        goal_progress = goal_accumulated / profile.goal_metas[None, :, None]
+    reached = goal_progress >= 1
+
+    return {
+        'income': income,
+        'expenses': expenses,
+        'contributions': contributions,
+        'goal_spending': goal_spending,
+        'cash_balance': cash_balance,
+        'investment_balance': investment_balance,
+        'net_worth': cash_balance + investment_balance,
+        'cumulative_contributions': np.cumsum(contributions, axis=1),
+        'goal_progress': goal_progress,
+        'goal_reached_at': np.where(reached.any(axis=2), reached.argmax(axis=2), -1),
+    }
+
+
+def projection_months(profile, years):
+    months = [profile.start]
+    for _ in range(years * 12 - 1):
+        months.append(next_month(months[-1]))
+    return months
+
+
+def projection_detail(profile, assumptions, years):
+    """Séries mensais completas de um único cenário."""
+    result = project(profile, scenario_arrays([assumptions]), years)
+    months = projection_months(profile, years)
+    series = [
+        'income', 'expenses', 'contributions', 'goal_spending',
+        'cash_balance', 'investment_balance', 'net_worth', 'cumulative_contributions',
+    ]
+
+    goals = []
+    for index, (category, name) in enumerate(profile.goals):
+        reached_at = int(result['goal_reached_at'][0, index])
+        goals.append({
+            "category": category,
+            "name": name,
+            "meta": round(float(profile.goal_metas[index]), 2),
+            "progress": round(float(result['goal_progress'][0, index, -1]), 4),
+            "reached_at": months[reached_at].isoformat() if reached_at >= 0 else None,
+        })
+
+    return {
+        "months": [month.isoformat() for month in months],
+        **{name: result[name][0].round(2).tolist() for name in series},
+        "goals": goals,
+    }
+
+
+def projection_summaries(profile, scenarios, years):
+    """Indicadores finais de muitos cenários, avaliados em blocos para limitar a memória."""
+    summaries = []
+    for offset in range(0, len(scenarios), SCENARIO_CHUNK_SIZE):
+        result = project(profile, scenario_arrays(scenarios[offset:offset + SCENARIO_CHUNK_SIZE]), years)
+        columns = zip(
+            result['cash_balance'][:, -1].round(2).tolist(),
+            result['investment_balance'][:, -1].round(2).tolist(),
+            result['net_worth'][:, -1].round(2).tolist(),
+            result['cash_balance'].min(axis=1).round(2).tolist(),
+            (result['goal_reached_at'] >= 0).sum(axis=1).tolist(),
+        )
+        summaries.extend(
+            {
+                "final_cash": final_cash,
+                "final_investments": final_investments,
+                "final_net_worth": final_net_worth,
+                "min_cash": min_cash,
+                "goals_reached": goals_reached,
+            }
+            for final_cash, final_investments, final_net_worth, min_cash, goals_reached in columns
+        )
+    return summaries
@@ -0,0 +1,450 @@
+import io
+from datetime import datetime
+
+import numpy as np
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from reportlab.lib.colors import HexColor
+
+from life_plan.rollups import month_start
+
+CATEGORY_ORDER = [
+    "receitas",
+    "renda_extra",
+    "estudos",
+    "custos",
+    "lucroPrejuizo",
+    "investimentos",
+    "realizacoes",
+    "intercambio",
+    "empresas",
+    "pessoais",
+]
+
+CATEGORY_DISPLAY_NAMES = {
+    "receitas": "Receitas",
+    "renda_extra": "Renda Extra",
+    "estudos": "Estudos",
+    "custos": "Custos",
+    "lucroPrejuizo": "Lucro/Prejuízo",
+    "investimentos": "Investimentos",
+    "realizacoes": "Realizações",
+    "intercambio": "Intercâmbio",
+    "empresas": "Empresas",
+    "pessoais": "Pessoais",
+}
+
+PROFIT_LOSS_ROW = "lucroPrejuizo"
+
+MONTH_ABBREVIATIONS = {
+    1: 'jan', 2: 'fev', 3: 'mar', 4: 'abr',
+    5: 'mai', 6: 'jun', 7: 'jul', 8: 'ago',
+    9: 'set', 10: 'out', 11: 'nov', 12: 'dez'
+}
+
+
+def month_label(month):
+    return f"{MONTH_ABBREVIATIONS[month.month]} - {month.year}"
+
+
+class PlanMatrix:
+    """
+    Valores de um plano como uma matriz numérica (linha x mês).
+
+    Cada linha é um par (categoria, nome); `values` e `metas` têm formato
+    (len(rows), len(months)). Totais, subtotais e lucro/prejuízo são
+    lidos diretamente da matriz, sem reprocessar os itens.
+    """
+
+    def __init__(self, months, rows, values, metas, present=None):
+        self.months = months
+        self.rows = rows
+        self.values = values
+        self.metas = metas
+        self.present = present if present is not None else np.ones(values.shape, dtype=bool)
+        self.category_rows = {}
+        for index, (category, _) in enumerate(rows):
+            self.category_rows.setdefault(category, []).append(index)
+
+    def __contains__(self, category):
+        return category in self.category_rows
+
+    def category_block(self, category):
+        """Nomes e submatriz de valores da categoria, na ordem em que aparecem no plano."""
+        indexes = self.category_rows.get(category, [])
+        return [self.rows[index][1] for index in indexes], self.values[indexes]
+
+    def category_subtotals(self, category):
+        return self.category_block(category)[1].sum(axis=0)
+
+    def profit_loss(self):
+        """(receitas + renda extra) - custos - estudos, mês a mês."""
+        return (
+            self.category_subtotals("receitas")
+            + self.category_subtotals("renda_extra")
+            - self.category_subtotals("custos")
+            - self.category_subtotals("estudos")
+        )
+
+    def to_columns(self):
+        """
+        Representação colunar para a API: eixo de meses e, por linha, categoria,
+        nome e arrays de valor/meta alinhados aos meses (None onde não há item).
+        """
+        values = np.where(self.present, self.values.round(2), None).tolist()
+        metas = np.where(self.present, self.metas.round(2), None).tolist()
+        return {
+            "months": [month.isoformat() for month in self.months],
+            "rows": [
+                {"category": category, "name": name, "values": row_values, "metas": row_metas}
+                for (category, name), row_values, row_metas in zip(self.rows, values, metas)
+            ],
+        }
+
+
+def build_plan_matrix(items):
+    """Monta a PlanMatrix em uma única passada ordenada sobre `values_list` dos itens."""
+    row_index = {}
+    month_index = {}
+    row_positions = []
+    month_keys = []
+    values = []
+    metas = []
+
+    for category, name, item_date, value, meta in (
+        items.order_by('pk').values_list('category', 'name', 'date', 'value', 'meta').iterator(chunk_size=2000)
+    ):
+        row_positions.append(row_index.setdefault((category, name), len(row_index)))
+        month = month_start(item_date)
+        month_keys.append(month_index.setdefault(month, len(month_index)))
+        values.append(value)
+        metas.append(meta)
+
+    months = sorted(month_index)
+    column_of = np.empty(len(month_index), dtype=np.intp)
+    for column, month in enumerate(months):
+        column_of[month_index[month]] = column
+
+    shape = (len(row_index), len(months))
+    value_matrix = np.zeros(shape)
+    meta_matrix = np.zeros(shape)
+    present = np.zeros(shape, dtype=bool)
+    if values:
+        coordinates = (np.asarray(row_positions, dtype=np.intp), column_of[np.asarray(month_keys, dtype=np.intp)])
+        np.add.at(value_matrix, coordinates, np.asarray(values, dtype=float))
+        np.add.at(meta_matrix, coordinates, np.asarray(metas, dtype=float))
+        present[coordinates] = True
+
+    return PlanMatrix(months, list(row_index), value_matrix, meta_matrix, present)
+
+
+def add_header_footer(canvas, doc):
+    """Adds header and footer to each page."""
+    canvas.saveState()
+    
+    canvas.setFillColor(HexColor("#F8F9FF"))
+    canvas.rect(0, 0, doc.pagesize[0], doc.pagesize[1], fill=1, stroke=0)
+    
+    canvas.setFillColor(HexColor("#818CF8"))
+    canvas.setFillAlpha(0.1)
+    canvas.circle(doc.pagesize[0] - 50 * mm, doc.pagesize[1] - 50 * mm, 100 * mm, fill=1, stroke=0)
+    
+    canvas.setFillColor(HexColor("#EC4899"))
+    canvas.setFillAlpha(0.1)
+    canvas.circle(50 * mm, 50 * mm, 80 * mm, fill=1, stroke=0)
+    
+    canvas.setFillAlpha(1)
+    
+    canvas.setStrokeColorRGB(0.8, 0.8, 0.8)
+    canvas.line(15 * mm, doc.pagesize[1] - 20 * mm, doc.pagesize[0] - 15 * mm, doc.pagesize[1] - 20 * mm)
+    
+    canvas.setStrokeColorRGB(0.8, 0.8, 0.8)
+    canvas.line(15 * mm, 15 * mm, doc.pagesize[0] - 15 * mm, 15 * mm)
+    
+    canvas.setFont("Helvetica", 9)
+    page_num = canvas.getPageNumber()
+    text = f"Página {page_num}"
+    canvas.setFillColor(HexColor("#DB2777"))
+    canvas.drawRightString(doc.pagesize[0] - 15 * mm, 10 * mm, text)
+
+    canvas.setFont("Helvetica-Bold", 12)
+    canvas.setFillColor(HexColor("#DB2777"))
+    canvas.drawString(15 * mm, doc.pagesize[1] - 15 * mm, doc.title)
+    
+    canvas.restoreState()
+
+
+def add_dark_header_footer(canvas, doc):
+    """Adds header and footer to each page with dark theme."""
+    canvas.saveState()
+    
+    canvas.setFillColor(HexColor("#0F172A"))
+    canvas.rect(0, 0, doc.pagesize[0], doc.pagesize[1], fill=1, stroke=0)
+    
+    canvas.setFillColor(HexColor("#DB2777"))
+    canvas.setFillAlpha(0.1)
+    canvas.circle(doc.pagesize[0] - 50 * mm, doc.pagesize[1] - 50 * mm, 100 * mm, fill=1, stroke=0)
+    
+    canvas.setFillColor(HexColor("#8B5CF6"))
+    canvas.setFillAlpha(0.1)
+    canvas.circle(50 * mm, 50 * mm, 80 * mm, fill=1, stroke=0)
+    
+    canvas.setFillAlpha(1)
+    
+    canvas.setStrokeColor(HexColor("#334155"))
+    canvas.line(15 * mm, doc.pagesize[1] - 20 * mm, doc.pagesize[0] - 15 * mm, doc.pagesize[1] - 20 * mm)
+    
+    canvas.setStrokeColor(HexColor("#334155"))
+    canvas.line(15 * mm, 15 * mm, doc.pagesize[0] - 15 * mm, 15 * mm)
+    
+    canvas.setFont("Helvetica", 9)
+    page_num = canvas.getPageNumber()
+    text = f"Página {page_num}"
+    canvas.setFillColor(HexColor("#EC4899"))
+    canvas.drawRightString(doc.pagesize[0] - 15 * mm, 10 * mm, text)
+    
+    canvas.setFont("Helvetica-Bold", 12)
+    canvas.setFillColor(HexColor("#EC4899"))
+    canvas.drawString(15 * mm, doc.pagesize[1] - 15 * mm, doc.title)
+    
+    canvas.restoreState()
+
+
+def render_plan_pdf(life_plan, is_dark_mode=False):
+    """Renderiza o relatório do plano em PDF (paisagem A4) e devolve os bytes."""
+    buffer = io.BytesIO()
+
+    pdf = SimpleDocTemplate(
+        buffer, 
+        pagesize=landscape(A4), 
+        rightMargin=15 * mm, 
+        leftMargin=15 * mm, 
+        topMargin=25 * mm, 
+        bottomMargin=20 * mm,
+        title=life_plan.name
+    )
+
+    styles = getSampleStyleSheet()
+
+    if is_dark_mode:
+        text_color = HexColor("#FFFFFF")
+        heading_color = HexColor("#EC4899")
+        subheading_color = HexColor("#8B5CF6")
+        card_bg_color = HexColor("#1E293B")
+        card_border_color = HexColor("#334155") 
+        table_header_bg = HexColor("#334155")
+        table_header_text = HexColor("#FFFFFF")
+        table_odd_row_bg = HexColor("#1E293B")
+        table_even_row_bg = HexColor("#0F172A")
+        table_border_color = HexColor("#475569")
+        positive_value_color = HexColor("#10B981")
+        negative_value_color = HexColor("#EF4444")
+    else:
+        text_color = HexColor("#1E293B")
+        heading_color = HexColor("#DB2777")
+        subheading_color = HexColor("#4F46E5")
+        card_bg_color = HexColor("#FFFFFF")
+        card_border_color = HexColor("#E0E7FF")
+        table_header_bg = HexColor("#818CF8")
+        table_header_text = HexColor("#FFFFFF")
+        table_odd_row_bg = HexColor("#FFFFFF")
+        table_even_row_bg = HexColor("#F1F5F9")
+        table_border_color = HexColor("#E2E8F0")
+        positive_value_color = HexColor("#059669")
+        negative_value_color = HexColor("#DC2626")
+
+    title_style = ParagraphStyle(
+        'Title', 
+        parent=styles['Title'],
+        fontSize=16, 
+        textColor=heading_color,
+        alignment=TA_CENTER,
+        spaceAfter=5 * mm
+    )
+
+    subtitle_style = ParagraphStyle(
+        'Subtitle', 
+        parent=styles['Heading2'],
+        fontSize=12, 
+        textColor=subheading_color,
+        alignment=TA_CENTER,
+        spaceAfter=10 * mm
+    )
+
+    date_style = ParagraphStyle(
+        'Date', 
+        parent=styles['Normal'],
+        fontSize=9, 
+        textColor=text_color,
+        alignment=TA_CENTER,
+        spaceAfter=10 * mm
+    )
+
+    category_style = ParagraphStyle(
+        'Category', 
+        parent=styles['Heading2'],
+        fontSize=12, 
+        textColor=heading_color,
+        alignment=TA_LEFT,
+        spaceBefore=8 * mm,
+        spaceAfter=4 * mm,
+        fontName='Helvetica-Bold'
+    )
+
+    header_cell_style = ParagraphStyle(
+        'HeaderCell',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=table_header_text,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+
+    name_cell_style = ParagraphStyle(
+        'NameCell',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=text_color,
+        alignment=TA_LEFT,
+        fontName='Helvetica'
+    )
+
+    value_cell_style = ParagraphStyle(
+        'ValueCell',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=text_color,
+        alignment=TA_RIGHT,
+        fontName='Helvetica'
+    )
+
+    positive_value_style = ParagraphStyle(
+        'PositiveValueCell',
+        parent=value_cell_style,
+        textColor=positive_value_color
+    )
+
+    negative_value_style = ParagraphStyle(
+        'NegativeValueCell',
+        parent=value_cell_style,
+        textColor=negative_value_color
+    )
+
+    subtotal_cell_style = ParagraphStyle(
+        'SubtotalCell',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=table_header_text,
+        alignment=TA_RIGHT,
+        fontName='Helvetica-Bold'
+    )
+
+    subtotal_name_style = ParagraphStyle(
+        'SubtotalNameCell',
+        parent=subtotal_cell_style,
+        alignment=TA_LEFT
+    )
+
+    elements = []
+
+    elements.append(Paragraph("Plano de Vida", title_style))
+    elements.append(Paragraph(life_plan.name, subtitle_style))
+
+    report_date = f"Data de geração: {datetime.now().strftime('%d/%m/%Y')}"
+    elements.append(Paragraph(report_date, date_style))
+
+    matrix = build_plan_matrix(life_plan.items.all())
+    months = matrix.months
+
+    def money(value):
+        return f"R$ {value:,.2f}"
+
+    for category_name in CATEGORY_ORDER:
+        if category_name not in matrix and category_name != PROFIT_LOSS_ROW:
+            continue
+
+        display_category = CATEGORY_DISPLAY_NAMES.get(category_name, category_name.capitalize())
+
+        elements.append(Paragraph(display_category, category_style))
+
+        header_row = [Paragraph("Nome", header_cell_style)]
+        for month in months:
+            header_row.append(Paragraph(month_label(month), header_cell_style))
+        header_row.append(Paragraph("Total", header_cell_style))
+
+        table_data = [header_row]
+
+        if category_name == PROFIT_LOSS_ROW:
+            subtotals = matrix.profit_loss()
+            total_profit = subtotals.sum()
+
+            profit_loss_row = [Paragraph("Lucro/Prejuízo", name_cell_style)]
+            for profit in subtotals:
+                style = positive_value_style if profit >= 0 else negative_value_style
+                profit_loss_row.append(Paragraph(money(profit), style))
+
+            style = positive_value_style if total_profit >= 0 else negative_value_style
+            profit_loss_row.append(Paragraph(money(total_profit), style))
+            table_data.append(profit_loss_row)
+        else:
+            names, block = matrix.category_block(category_name)
+            subtotals = block.sum(axis=0)
+            row_totals = block.sum(axis=1)
+
+            for item_name, values, total_value in zip(names, block, row_totals):
+                row = [Paragraph(item_name, name_cell_style)]
+                row.extend(Paragraph(money(value), value_cell_style) for value in values)
+                row.append(Paragraph(money(total_value), value_cell_style))
+                table_data.append(row)
+
+        if len(table_data) > 1:
+            subtotal_row = [Paragraph("Subtotal", subtotal_name_style)]
+            subtotal_row.extend(Paragraph(money(subtotal), subtotal_cell_style) for subtotal in subtotals)
+            subtotal_row.append(Paragraph(money(subtotals.sum()), subtotal_cell_style))
+            table_data.append(subtotal_row)
+
+        available_width = pdf.width
+        name_col_width = available_width * 0.2
+        total_col_width = available_width * 0.1
+        date_col_width = (available_width - name_col_width - total_col_width) / max(len(months), 1)
+
+        col_widths = [name_col_width] + [date_col_width] * len(months) + [total_col_width]
+
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
+
+        table_style = [
+            ('BACKGROUND', (0, 0), (-1, 0), table_header_bg),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('TOPPADDING', (0, 0), (-1, 0), 8),
+
+            ('GRID', (0, 0), (-1, -1), 0.5, table_border_color),
+
+            ('BACKGROUND', (0, 1), (-1, -2), table_odd_row_bg),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [table_odd_row_bg, table_even_row_bg]),
+
+            ('BACKGROUND', (0, -1), (-1, -1), table_header_bg),
+
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+
+            ('WORDWRAP', (0, 0), (-1, -1), True),
+        ]
+
+        table.setStyle(TableStyle(table_style))
+
+        elements.append(table)
+        elements.append(Spacer(1, 5 * mm))
+
+    if is_dark_mode:
+        pdf.build(elements, onFirstPage=add_dark_header_footer, onLaterPages=add_dark_header_footer)
+    else:
+        pdf.build(elements, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
+
+    return buffer.getvalue()
@@ -0,0 +1,197 @@
+from datetime import date
+from decimal import Decimal, ROUND_CEILING
+from functools import reduce
+from itertools import groupby
+from operator import itemgetter, or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from life_plan.cache import invalidate_plan_exports
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def add_months(value, months):
+    """Primeiro dia do mês `months` meses depois de `value`; None fora do intervalo de `date`."""
+    index = value.year * 12 + value.month - 1 + months
+    if index // 12 > date.max.year:
+        return None
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_filter(months, field='date'):
+    """Q com um intervalo [início, próximo mês) por mês, para aproveitar índices em `date`."""
+    return reduce(or_, (
+        Q(**{f'{field}__gte': month, f'{field}__lt': next_month(month)})
+        for month in months
+    ))
+
+
+def refresh_monthly_summaries(life_plan_id, dates=None):
+    """
+    Recalcula o resumo mensal (mês, categoria) do plano.
+
+    Quando `dates` é informado, apenas os meses tocados são recalculados
+    a partir dos itens daquele mês; sem `dates`, o plano inteiro é reconstruído.
+    """
+    from life_plan.models import LifePlanItem, LifePlanMonthlySummary
+
+    items = LifePlanItem.objects.filter(life_plan_id=life_plan_id)
+    summaries = LifePlanMonthlySummary.objects.filter(life_plan_id=life_plan_id)
+
+    if dates is not None:
+        months = sorted({month_start(value) for value in dates})
+        if not months:
+            return
+        items = items.filter(months_filter(months))
+        summaries = summaries.filter(month__in=months)
+
+    rows = (
+        items.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'category')
+        .annotate(total_value=Sum('value'), total_meta=Sum('meta'), item_count=Count('id'))
+    )
+
+    with transaction.atomic():
+        summaries.delete()
+        LifePlanMonthlySummary.objects.bulk_create([
+            LifePlanMonthlySummary(life_plan_id=life_plan_id, **row)
+            for row in rows
+        ])
+
+
+GOAL_KEYS_LIMIT = 200
+# Projeções além deste horizonte (ou fora do intervalo de `date`) ficam sem data.
+PROJECTION_HORIZON_MONTHS = 100 * 12
+MAX_PERCENT = Decimal('99999999.99')
+
+
+def clamp_percent(value):
+    """Percentual limitado ao que cabe em LifePlanGoalProgress.percent (max_digits=10)."""
+    return max(-MAX_PERCENT, min(MAX_PERCENT, value)).quantize(Decimal('0.01'))
+
+
+def build_goal_progress(rows):
+    """
+    Calcula o progresso de cada (categoria, nome) a partir de linhas
+    (categoria, nome, data, valor, meta) ordenadas por categoria, nome e data.
+
+    A meta da linha é a maior meta registrada; a conclusão é o primeiro mês em que o
+    acumulado atinge a meta ou, se ainda não atingiu, a extrapolação pela média mensal
+    (vazia além de PROJECTION_HORIZON_MONTHS); o percentual é limitado a MAX_PERCENT.
+    """
+    for (category, name), group in groupby(rows, key=itemgetter(0, 1)):
+        group = list(group)
+        meta = max(row[4] for row in group)
+        months = sorted({month_start(row[2]) for row in group})
+
+        cumulative = Decimal(0)
+        reached = None
+        for _, _, item_date, value, _ in group:
+            cumulative += value
+            if reached is None and meta > 0 and cumulative >= meta:
+                reached = month_start(item_date)
+
+        projected = reached
+        if projected is None and meta > 0 and cumulative > 0:
+            monthly_average = cumulative / len(months)
+            remaining = ((meta - cumulative) / monthly_average).to_integral_value(rounding=ROUND_CEILING)
+            if remaining <= PROJECTION_HORIZON_MONTHS:
+                projected = add_months(months[-1], int(remaining))
+
+        yield {
+            'category': category,
+            'name': name,
+            'cumulative_value': cumulative,
+            'meta': meta,
+            'percent': clamp_percent(cumulative * 100 / meta) if meta > 0 else None,
+            'item_count': len(group),
+            'first_month': months[0],
+            'last_month': months[-1],
+            'projected_completion': projected,
+        }
+
+
+def refresh_goal_progress(life_plan_id, keys=None):
+    """
+    Recalcula o progresso das metas do plano.
+
+    Com `keys` ({(categoria, nome)}), apenas essas linhas são relidas, pelo índice
+    (plano, categoria, nome, data); sem `keys`, o plano inteiro é reconstruído.
+    """
+    from life_plan.models import LifePlanGoalProgress, LifePlanItem
+
+    items = LifePlanItem.objects.filter(life_plan_id=life_plan_id)
+    progress = LifePlanGoalProgress.objects.filter(life_plan_id=life_plan_id)
+
+    if keys is not None:
+        keys = set(keys)
+        if not keys:
+            return
+        if len(keys) <= GOAL_KEYS_LIMIT:
+            keys_filter = reduce(or_, (Q(category=category, name=name) for category, name in keys))
+            items = items.filter(keys_filter)
+            progress = progress.filter(keys_filter)
+
+    rows = items.order_by('category', 'name', 'date', 'pk').values_list('category', 'name', 'date', 'value', 'meta')
+
+    with transaction.atomic():
+        progress.delete()
+        LifePlanGoalProgress.objects.bulk_create([
+            LifePlanGoalProgress(life_plan_id=life_plan_id, **row)
+            for row in build_goal_progress(rows.iterator(chunk_size=2000))
+        ])
+
+
+PROFIT_LOSS_CATEGORIES = ['receitas', 'renda_extra', 'custos', 'estudos']
+
+
+def profit_loss_by_month(summaries):
+    """Lucro/prejuízo por mês: (receitas + renda extra) - (custos + estudos)."""
+    rows = (
+        summaries.filter(category__in=PROFIT_LOSS_CATEGORIES)
+        .order_by('month')
+        .values('month')
+        .annotate(
+            receitas=Sum('total_value', filter=Q(category='receitas'), default=Decimal(0)),
+            renda_extra=Sum('total_value', filter=Q(category='renda_extra'), default=Decimal(0)),
+            custos=Sum('total_value', filter=Q(category__in=['custos', 'estudos']), default=Decimal(0)),
+        )
+    )
+    return [
+        {
+            "date": row['month'],
+            "profit_loss": float(row['receitas'] + row['renda_extra'] - row['custos']),
+        }
+        for row in rows
+    ]
+
+
+def items_changed(life_plan_id, dates=None, keys=None):
+    """
+    Deve ser chamado após qualquer escrita em itens de um plano
+    (criação, edição, exclusão ou substituição em lote).
+
+    `dates` limita o recálculo dos resumos mensais e `keys` ({(categoria, nome)})
+    o do progresso das metas; quando omitidos, o plano inteiro é recalculado.
+
+    Além dos resumos, avança `updated_at` do plano, que compõe a chave
+    de cache das exportações, e descarta as exportações renderizadas em memória.
+    """
+    from life_plan.models import LifePlan
+
+    refresh_monthly_summaries(life_plan_id, dates)
+    refresh_goal_progress(life_plan_id, keys)
+    LifePlan.objects.filter(pk=life_plan_id).update(updated_at=timezone.now())
+    invalidate_plan_exports(life_plan_id)
@@ -0,0 +1,126 @@
+from datetime import date
+from functools import lru_cache
+
+from django.db import transaction
+from life_plan.rollups import items_changed
+
+
+DEFAULT_PLAN_NAME = "Meu Plano de Vida"
+
+DEFAULT_ITEMS = {
+    'receitas': [
+        {"name": "Salário", "value": 5000.00, "meta": 5000.00},
+        {"name": "Freelance", "value": 1000.00, "meta": 1000.00},
+        {"name": "Outras Receitas", "value": 500.00, "meta": 500.00},
+    ],
+    'renda_extra': [
+        {"name": "Aluguel", "value": 800.00, "meta": 9600.00},
+        {"name": "Dividendos", "value": 300.00, "meta": 3600.00},
+        {"name": "Venda de Produtos", "value": 400.00, "meta": 4800.00},
+        {"name": "Plataforma", "value": 4420.00, "meta": 6000.00},
+    ],
+    'custos': [
+        {"name": "Moradia", "value": 1800.00, "meta": 1800.00},
+        {"name": "Alimentação", "value": 1200.00, "meta": 1200.00},
+        {"name": "Transporte", "value": 600.00, "meta": 600.00},
+        {"name": "Saúde", "value": 400.00, "meta": 400.00},
+        {"name": "Lazer", "value": 500.00, "meta": 500.00},
+        {"name": "Serviços", "value": 450.00, "meta": 450.00},
+    ],
+    'estudos': [
+        {"name": "Curso de Especialização", "value": 500.00, "meta": 6000.00},
+        {"name": "Idiomas", "value": 200.00, "meta": 2400.00},
+        {"name": "Livros/Material", "value": 100.00, "meta": 1200.00},
+    ],
+    'investimentos': [
+        {"name": "Reserva de Emergência", "value": 500.00, "meta": 6000.00},
+        {"name": "Renda Fixa", "value": 150.00, "meta": 1800.00},
+        {"name": "Renda Variável", "value": 100.00, "meta": 1200.00},
+    ],
+    'realizacoes': [
+        {"name": "Viagem Nacional", "value": 3000.00, "meta": 3000.00, "month": 7},
+        {"name": "Compra de Notebook", "value": 5000.00, "meta": 5000.00, "month": 10},
+        {"name": "Reforma do Quarto", "value": 2500.00, "meta": 2500.00, "month": 12},
+    ],
+    'intercambio': [
+        {"name": "Poupança para Intercâmbio", "value": 1000.00, "meta": 12000.00},
+    ],
+    'empresas': [
+        {"name": "Projeto Freelance", "value": 2000.00, "meta": 5000.00, "month": 6},
+        {"name": "Startup Tecnologia", "value": 10000.00, "meta": 50000.00, "month": 3},
+        {"name": "E-commerce", "value": 5000.00, "meta": 20000.00, "month": 9},
+        {"name": "Consultoria", "value": 1500.00, "meta": 15000.00, "month": 1},
+        {"name": "Curso Online", "value": 3000.00, "meta": 12000.00, "month": 4},
+    ],
+    'pessoais': [
+        {"name": "Desenvolvimento Pessoal", "value": 200.00, "meta": 2400.00},
+        {"name": "Terapia", "value": 300.00, "meta": 3600.00},
+        {"name": "Atividade Física", "value": 150.00, "meta": 1800.00},
+        {"name": "Hobby", "value": 100.00, "meta": 1200.00},
+        {"name": "Voluntariado", "value": 50.00, "meta": 600.00},
+    ],
+}
+
+MONTHLY_CATEGORIES = ['receitas', 'renda_extra', 'custos', 'estudos', 'investimentos', 'intercambio', 'pessoais']
+SCHEDULED_CATEGORIES = ['realizacoes', 'empresas']
+
+SEED_BATCH_SIZE = 500
+
+
+@lru_cache(maxsize=1)
+def default_plan_template():
+    """
+    Compila o modelo padrão uma única vez: uma tupla de
+    (mês, categoria, nome, valor, meta) já na ordem de inserção,
+    incluindo a linha de lucro/prejuízo de cada mês.
+    """
+    receitas_total = sum(item["value"] for item in DEFAULT_ITEMS['receitas'])
+    renda_extra_total = sum(item["value"] for item in DEFAULT_ITEMS['renda_extra'])
+    custos_total = sum(item["value"] for item in DEFAULT_ITEMS['custos'])
+    estudos_total = sum(item["value"] for item in DEFAULT_ITEMS['estudos'])
+    lucro = (receitas_total + renda_extra_total) - (custos_total + estudos_total)
+
+    rows = []
+    for month in range(1, 13):
+        for category in MONTHLY_CATEGORIES:
+            for item in DEFAULT_ITEMS[category]:
+                rows.append((month, category, item["name"], item["value"], item["meta"]))
+
+        for category in SCHEDULED_CATEGORIES:
+            for item in DEFAULT_ITEMS[category]:
+                if item.get("month") == month:
+                    rows.append((month, category, item["name"], item["value"], item["meta"]))
+
+        rows.append((month, 'lucro_prejuizo', "Lucro/Prejuízo Mensal", lucro, lucro))
+
+    return tuple(rows)
+
+
+def build_default_items(plan, year):
+    """Monta em memória os itens padrão de um ano para o plano informado."""
+    from life_plan.models import LifePlanItem
+
+    dates = {month: date(year, month, 1) for month in range(1, 13)}
+    return [
+        LifePlanItem(
+            life_plan=plan,
+            category=category,
+            name=name,
+            value=value,
+            date=dates[month],
+            meta=meta,
+        )
+        for month, category, name, value, meta in default_plan_template()
+    ]
+
+
+def seed_default_items(plan, year):
+    """Persiste os itens padrão do ano com inserts em lote."""
+    from life_plan.models import LifePlanItem
+
+    with transaction.atomic():
+        items = LifePlanItem.objects.bulk_create(
+            build_default_items(plan, year), batch_size=SEED_BATCH_SIZE
+        )
+        items_changed(plan.id)
+    return items
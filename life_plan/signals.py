@@ -0,0 +1,9 @@
+from allauth.account.signals import user_signed_up
+from django.dispatch import receiver
+from life_plan.models import LifePlan
+
+
+@receiver(user_signed_up)
+def create_default_plan_on_signup(sender, request, user, **kwargs):
+    """Provisiona o plano padrão para usuários criados pelo fluxo do allauth (incluindo login social)."""
+    LifePlan.create_default_plan(user=user)
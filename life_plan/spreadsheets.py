@@ -0,0 +1,113 @@
+from itertools import chain, groupby
+from operator import itemgetter
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from life_plan.exports import iter_item_rows
+from life_plan.models import LifePlanItem
+from life_plan.reports import CATEGORY_DISPLAY_NAMES, CATEGORY_ORDER, PROFIT_LOSS_ROW, month_label
+from life_plan.rollups import month_start
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+MONEY_FORMAT = '"R$" #,##0.00;[Red]-"R$" #,##0.00'
+
+TITLE_FONT = Font(bold=True, size=16, color="4F46E5")
+CATEGORY_FONT = Font(bold=True, size=12, color="4F46E5")
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill("solid", fgColor="818CF8")
+SUBTOTAL_FONT = Font(bold=True)
+SUBTOTAL_FILL = PatternFill("solid", fgColor="E0E7FF")
+
+
+def iter_category_rows(life_plan, category, month_index):
+    """
+    (nome, valores por mês) de cada linha da categoria, em uma única passada
+    ordenada por nome e data; só uma linha fica em memória por vez.
+    """
+    items = LifePlanItem.objects.filter(life_plan=life_plan, category=category)
+    rows = iter_item_rows(items, ('name', 'date', 'value'), ordering=('name', 'date', 'pk'))
+    for name, group in groupby(rows, key=itemgetter(0)):
+        values = [0.0] * len(month_index)
+        for _, item_date, value in group:
+            values[month_index[month_start(item_date)]] += float(value)
+        yield name, values
+
+
+def write_plan_xlsx(life_plan, output):
+    """
+    Grava em `output` o plano no mesmo layout do PDF (categoria x mês, subtotais
+    e lucro/prejuízo) usando uma planilha write-only, que não mantém as linhas em memória.
+    """
+    months = list(LifePlanItem.objects.filter(life_plan=life_plan).dates('date', 'month'))
+    month_index = {month: index for index, month in enumerate(months)}
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Plano de Vida")
+    sheet.column_dimensions['A'].width = 32
+    for column in range(2, len(months) + 3):
+        sheet.column_dimensions[get_column_letter(column)].width = 15
+
+    def cell(value, font=None, fill=None, money=False):
+        result = WriteOnlyCell(sheet, value=value)
+        if font:
+            result.font = font
+        if fill:
+            result.fill = fill
+        if money:
+            result.number_format = MONEY_FORMAT
+        return result
+
+    def header_row():
+        return [cell("Nome", HEADER_FONT, HEADER_FILL)] + [
+            cell(label, HEADER_FONT, HEADER_FILL) for label in chain(map(month_label, months), ["Total"])
+        ]
+
+    def value_row(name, values, font=None, fill=None):
+        return [cell(name, font, fill)] + [
+            cell(value, font, fill, money=True) for value in chain(values, [sum(values)])
+        ]
+
+    title = cell("Plano de Vida", TITLE_FONT)
+    title.alignment = Alignment(horizontal='left')
+    sheet.append([title])
+    sheet.append([life_plan.name])
+    sheet.append([])
+
+    subtotals = {}
+    for category in CATEGORY_ORDER:
+        display_category = CATEGORY_DISPLAY_NAMES.get(category, category.capitalize())
+
+        if category == PROFIT_LOSS_ROW:
+            zeros = [0.0] * len(months)
+            profit_loss = [
+                receitas + renda_extra - custos - estudos
+                for receitas, renda_extra, custos, estudos in zip(*(
+                    subtotals.get(name, zeros) for name in ('receitas', 'renda_extra', 'custos', 'estudos')
+                ))
+            ]
+            sheet.append([cell(display_category, CATEGORY_FONT)])
+            sheet.append(header_row())
+            sheet.append(value_row("Lucro/Prejuízo", profit_loss))
+            sheet.append(value_row("Subtotal", profit_loss, SUBTOTAL_FONT, SUBTOTAL_FILL))
+            sheet.append([])
+            continue
+
+        rows = iter_category_rows(life_plan, category, month_index)
+        first = next(rows, None)
+        if first is None:
+            continue
+
+        sheet.append([cell(display_category, CATEGORY_FONT)])
+        sheet.append(header_row())
+        category_subtotals = [0.0] * len(months)
+        for name, values in chain([first], rows):
+            sheet.append(value_row(name, values))
+            category_subtotals = [total + value for total, value in zip(category_subtotals, values)]
+        sheet.append(value_row("Subtotal", category_subtotals, SUBTOTAL_FONT, SUBTOTAL_FILL))
+        sheet.append([])
+        subtotals[category] = category_subtotals
+
+    workbook.save(output)
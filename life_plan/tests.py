@@ -1,3 +1,638 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from rest_framework.test import APIClient
+from life_plan import cache as export_cache
+from life_plan.bulk import ItemValueOverflow, clone_plan, reconcile_plan_items, roll_forward_year
+from life_plan.imports import ImportFormatError, import_plan_items
+from life_plan.models import LifePlan, LifePlanGoalProgress, LifePlanItem, LifePlanMonthlySummary
+from life_plan.projection import CATEGORY_INDEX, plan_profile
+from life_plan.rollups import (
+    MAX_PERCENT, build_goal_progress, items_changed, refresh_goal_progress, refresh_monthly_summaries,
+)
+
+User = get_user_model()
+
+
+def plan_items(life_plan):
+    return set(
+        LifePlanItem.objects.filter(life_plan=life_plan).values_list('category', 'name', 'date', 'value', 'meta')
+    )
+
+
+class ReconcilePlanItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ana", email="ana@example.com")
+        self.life_plan = LifePlan.objects.create(user=self.user, name="Plano")
+        self.rows = [
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('receitas', 'Salário', date(2025, 2, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('custos', 'Aluguel', date(2025, 1, 1), Decimal('1500.00'), Decimal('0.00')),
+        ]
+        reconcile_plan_items(self.life_plan, self.rows)
+
+    def test_creates_missing_items(self):
+        self.assertEqual(plan_items(self.life_plan), set(self.rows))
+
+    def test_unchanged_rows_keep_their_items(self):
+        pks = set(LifePlanItem.objects.filter(life_plan=self.life_plan).values_list('pk', flat=True))
+
+        result = reconcile_plan_items(self.life_plan, self.rows)
+
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'deleted': 0})
+        self.assertEqual(set(LifePlanItem.objects.filter(life_plan=self.life_plan).values_list('pk', flat=True)), pks)
+
+    def test_updates_changes_and_deletes_leftovers(self):
+        salary = LifePlanItem.objects.get(life_plan=self.life_plan, name='Salário', date=date(2025, 1, 1))
+        rows = [
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5500.00'), Decimal('6000.00')),
+            ('receitas', 'Salário', date(2025, 2, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('investimentos', 'Tesouro', date(2025, 1, 1), Decimal('300.00'), Decimal('0.00')),
+        ]
+
+        result = reconcile_plan_items(self.life_plan, rows)
+
+        self.assertEqual(result, {'created': 1, 'updated': 1, 'deleted': 1})
+        self.assertEqual(plan_items(self.life_plan), set(rows))
+        self.assertTrue(LifePlanItem.objects.filter(pk=salary.pk, value=Decimal('5500.00')).exists())
+
+    def test_duplicate_keys_are_matched_one_to_one(self):
+        row = ('custos', 'Mercado', date(2025, 3, 1), Decimal('800.00'), Decimal('0.00'))
+
+        self.assertEqual(reconcile_plan_items(self.life_plan, [row, row])['created'], 2)
+        self.assertEqual(reconcile_plan_items(self.life_plan, [row]), {'created': 0, 'updated': 0, 'deleted': 1})
+        self.assertEqual(LifePlanItem.objects.filter(life_plan=self.life_plan).count(), 1)
+
+    def test_other_plans_are_not_touched(self):
+        other = LifePlan.objects.create(user=self.user, name="Outro")
+        reconcile_plan_items(other, self.rows[:1])
+
+        reconcile_plan_items(self.life_plan, [])
+
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan).exists())
+        self.assertEqual(plan_items(other), set(self.rows[:1]))
+
+
+def csv_file(*lines, name="itens.csv"):
+    return SimpleUploadedFile(name, "\n".join(lines).encode("utf-8"), content_type="text/csv")
+
+
+HEADER = "category,name,value,date,meta"
+
+
+class ImportPlanItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ana", email="ana@example.com")
+        self.life_plan = LifePlan.objects.create(user=self.user, name="Plano")
+
+    def test_imports_valid_rows_in_batches(self):
+        upload = csv_file(
+            HEADER,
+            "receitas,Salário,5000,2025-01-01,",
+            "custos,Aluguel,1500.50,2025-02,",
+            "",
+            "investimentos,Tesouro,300,15/03/2025,1000",
+        )
+
+        result = import_plan_items(self.life_plan, upload, batch_size=2)
+
+        self.assertEqual(result, {'rows': 3, 'created': 3, 'error_count': 0, 'errors': []})
+        self.assertEqual(plan_items(self.life_plan), {
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('custos', 'Aluguel', date(2025, 2, 1), Decimal('1500.50'), Decimal('0.00')),
+            ('investimentos', 'Tesouro', date(2025, 3, 15), Decimal('300.00'), Decimal('1000.00')),
+        })
+
+    def test_invalid_row_rolls_back_everything(self):
+        upload = csv_file(
+            HEADER,
+            "receitas,Salário,5000,2025-01-01,",
+            "viagens,Praia,abc,2025-13-01,",
+        )
+
+        result = import_plan_items(self.life_plan, upload, batch_size=1)
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(result['error_count'], 1)
+        self.assertEqual(result['errors'][0]['row'], 3)
+        self.assertEqual(set(result['errors'][0]['errors']), {'category', 'value', 'date'})
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan).exists())
+
+    def test_non_finite_numbers_are_row_errors(self):
+        upload = csv_file(
+            HEADER,
+            "receitas,Salário,nan,2025-01-01,",
+            "receitas,Bônus,inf,2025-01-01,",
+            "receitas,Extra,100,2025-01-01,sNaN",
+        )
+
+        result = import_plan_items(self.life_plan, upload, batch_size=10)
+
+        self.assertEqual(result['error_count'], 3)
+        self.assertEqual([error['errors'] for error in result['errors']], [
+            {'value': "Número inválido."}, {'value': "Número inválido."}, {'meta': "Número inválido."},
+        ])
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan).exists())
+
+    def test_partial_skips_invalid_rows(self):
+        upload = csv_file(
+            HEADER,
+            "receitas,Salário,5000,2025-01-01,",
+            "receitas,,5000,2025-02-01,",
+        )
+
+        result = import_plan_items(self.life_plan, upload, batch_size=10, partial=True)
+
+        self.assertEqual((result['created'], result['error_count']), (1, 1))
+        self.assertEqual(LifePlanItem.objects.filter(life_plan=self.life_plan).count(), 1)
+
+    def test_replace_removes_current_items(self):
+        LifePlanItem.objects.create(
+            life_plan=self.life_plan, category='custos', name='Antigo', date=date(2024, 1, 1), value=Decimal('10.00')
+        )
+
+        import_plan_items(self.life_plan, csv_file(HEADER, "receitas,Salário,5000,2025-01-01,"), batch_size=10, replace=True)
+
+        self.assertEqual(list(LifePlanItem.objects.filter(life_plan=self.life_plan).values_list('name', flat=True)), ['Salário'])
+
+    def test_rejects_missing_columns_and_unknown_formats(self):
+        with self.assertRaises(ImportFormatError):
+            import_plan_items(self.life_plan, csv_file("category,name", "receitas,Salário"), batch_size=10)
+        with self.assertRaises(ImportFormatError):
+            import_plan_items(self.life_plan, csv_file(HEADER, name="itens.txt"), batch_size=10)
+
+    def test_endpoint_status_codes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = f"/api/v1/life-plan/{self.life_plan.pk}/import/"
+        invalid = ("receitas,Salário,5000,2025-01-01,", "receitas,Bônus,xyz,2025-01-01,")
+
+        response = client.post(url, {'file': csv_file(HEADER, *invalid)}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+
+        response = client.post(url, {'file': csv_file(HEADER, *invalid), 'partial': 'true'}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+
+
+class GoalProgressTests(TestCase):
+    def test_projection_beyond_the_horizon_is_left_empty(self):
+        rows = [('investimentos', 'Reserva', date(2026, 1, 1), Decimal('1.00'), Decimal('100000.00'))]
+
+        progress, = build_goal_progress(rows)
+
+        self.assertIsNone(progress['projected_completion'])
+        self.assertEqual(progress['percent'], Decimal('0.00'))
+
+    def test_projection_within_the_horizon(self):
+        rows = [
+            ('investimentos', 'Reserva', date(2026, 1, 1), Decimal('100.00'), Decimal('1000.00')),
+            ('investimentos', 'Reserva', date(2026, 2, 1), Decimal('100.00'), Decimal('1000.00')),
+        ]
+
+        progress, = build_goal_progress(rows)
+
+        self.assertEqual(progress['projected_completion'], date(2026, 10, 1))
+        self.assertEqual(progress['percent'], Decimal('20.00'))
+
+    def test_percent_fits_the_field(self):
+        rows = [('receitas', 'Bônus', date(2026, 1, 1), Decimal('99999999.99'), Decimal('0.01'))]
+
+        progress, = build_goal_progress(rows)
+
+        self.assertEqual(progress['percent'], MAX_PERCENT)
+        self.assertEqual(progress['projected_completion'], date(2026, 1, 1))
+
+    def test_items_changed_saves_unreachable_goals(self):
+        user = User.objects.create_user(username="ana", email="ana@example.com")
+        life_plan = LifePlan.objects.create(user=user, name="Plano")
+        LifePlanItem.objects.create(
+            life_plan=life_plan, category='investimentos', name='Reserva', date=date(2026, 1, 1),
+            value=Decimal('1.00'), meta=Decimal('100000.00'),
+        )
+
+        items_changed(life_plan.id)
+
+        progress = LifePlanGoalProgress.objects.get(life_plan=life_plan)
+        self.assertIsNone(progress.projected_completion)
+        self.assertEqual(progress.cumulative_value, Decimal('1.00'))
+
+
+class LifePlanAPITestCase(TestCase):
+    """Plano de um usuário autenticado, com itens gravados pelo mesmo caminho da API (items_changed)."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="ana", email="ana@example.com")
+        self.life_plan = LifePlan.objects.create(user=self.user, name="Plano")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def url(self, action):
+        return f"/api/v1/life-plan/{self.life_plan.pk}/{action}/"
+
+    def add_items(self, *rows, life_plan=None):
+        life_plan = life_plan or self.life_plan
+        LifePlanItem.objects.bulk_create([
+            LifePlanItem(life_plan=life_plan, category=category, name=name, date=item_date, value=value, meta=meta)
+            for category, name, item_date, value, meta in rows
+        ])
+        items_changed(life_plan.id)
+
+    def summary(self, month, category, life_plan=None):
+        return LifePlanMonthlySummary.objects.get(life_plan=life_plan or self.life_plan, month=month, category=category)
+
+
+class CellOperationsTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('receitas', 'Bônus', date(2025, 1, 15), Decimal('1000.00'), Decimal('0.00')),
+            ('investimentos', 'Reserva', date(2025, 1, 1), Decimal('500.00'), Decimal('6000.00')),
+        )
+
+    def patch(self, *operations):
+        return self.client.patch(self.url("cells"), {"operations": list(operations)}, format="json")
+
+    def test_upsert_updates_rollups_and_returns_the_touched_totals(self):
+        response = self.patch(
+            {"category": "receitas", "name": "Salário", "month": "2025-01", "value": "5500.00"},
+            {"category": "investimentos", "name": "Reserva", "month": "2025-02", "value": "700.00"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(total["month"], total["category"], total["total_value"]) for total in response.data["totals"]],
+            [(date(2025, 1, 1), "receitas", 6500.0), (date(2025, 2, 1), "investimentos", 700.0)],
+        )
+        self.assertEqual(self.summary(date(2025, 1, 1), 'receitas').total_value, Decimal('6500.00'))
+        self.assertEqual(self.summary(date(2025, 2, 1), 'investimentos').item_count, 1)
+        progress = LifePlanGoalProgress.objects.get(life_plan=self.life_plan, name='Reserva')
+        self.assertEqual(progress.cumulative_value, Decimal('1200.00'))
+        self.assertEqual(progress.percent, Decimal('20.00'))
+
+    def test_cell_matches_items_on_any_day_of_the_month(self):
+        response = self.patch({"category": "receitas", "name": "Bônus", "month": "2025-01", "value": "1200.00"})
+
+        self.assertEqual(response.status_code, 200)
+        bonus = LifePlanItem.objects.get(life_plan=self.life_plan, name='Bônus')
+        self.assertEqual((bonus.date, bonus.value), (date(2025, 1, 15), Decimal('1200.00')))
+
+    def test_delete_removes_the_cell_and_its_summary(self):
+        response = self.patch({"op": "delete", "category": "investimentos", "name": "Reserva", "month": "2025-01"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan, name='Reserva').exists())
+        self.assertFalse(LifePlanMonthlySummary.objects.filter(life_plan=self.life_plan, category='investimentos').exists())
+        self.assertFalse(LifePlanGoalProgress.objects.filter(life_plan=self.life_plan, name='Reserva').exists())
+
+    def test_last_operation_on_a_cell_wins(self):
+        self.patch(
+            {"category": "custos", "name": "Aluguel", "month": "2025-03", "value": "1500.00"},
+            {"op": "delete", "category": "custos", "name": "Aluguel", "month": "2025-03"},
+            {"category": "custos", "name": "Aluguel", "month": "2025-03", "value": "1600.00"},
+        )
+
+        self.assertEqual(
+            list(LifePlanItem.objects.filter(life_plan=self.life_plan, name='Aluguel').values_list('value', flat=True)),
+            [Decimal('1600.00')],
+        )
+
+    def test_rejects_unknown_categories(self):
+        response = self.patch({"category": "viagens", "name": "Praia", "month": "2025-01", "value": "10.00"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan, name='Praia').exists())
+
+
+class RollForwardTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('custos', 'Aluguel', date(2025, 1, 1), Decimal('1000.00'), Decimal('0.00')),
+            ('receitas', 'Salário', date(2024, 2, 29), Decimal('5000.00'), Decimal('0.00')),
+            ('receitas', 'Salário', date(2025, 2, 1), Decimal('5000.00'), Decimal('0.00')),
+        )
+
+    def test_copies_the_year_with_adjustments(self):
+        response = self.client.post(
+            self.url("roll-forward"),
+            {"source_year": 2025, "target_year": 2026, "adjustments": {"custos": "10"}},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 2, 'deleted': 0})
+        self.assertEqual(self.summary(date(2026, 1, 1), 'custos').total_value, Decimal('1100.00'))
+        self.assertEqual(self.summary(date(2026, 2, 1), 'receitas').total_value, Decimal('5000.00'))
+
+    def test_leap_day_falls_back_to_the_28th(self):
+        roll_forward_year(self.life_plan, 2024, 2023)
+
+        self.assertTrue(LifePlanItem.objects.filter(life_plan=self.life_plan, date=date(2023, 2, 28)).exists())
+
+    def test_existing_target_year_requires_replace(self):
+        self.add_items(('custos', 'Aluguel', date(2026, 1, 1), Decimal('900.00'), Decimal('0.00')))
+        payload = {"source_year": 2025, "target_year": 2026}
+
+        self.assertEqual(self.client.post(self.url("roll-forward"), payload, format="json").status_code, 400)
+
+        response = self.client.post(self.url("roll-forward"), {**payload, "replace": True}, format="json")
+        self.assertEqual(response.data, {'created': 2, 'deleted': 1})
+        self.assertEqual(self.summary(date(2026, 1, 1), 'custos').total_value, Decimal('1000.00'))
+
+    def test_overflowing_adjustment_writes_nothing(self):
+        self.add_items(('receitas', 'Herança', date(2025, 3, 1), Decimal('90000000.00'), Decimal('0.00')))
+
+        with self.assertRaises(ItemValueOverflow):
+            roll_forward_year(self.life_plan, 2025, 2026, {'receitas': Decimal('50')})
+
+        self.assertFalse(LifePlanItem.objects.filter(life_plan=self.life_plan, date__year=2026).exists())
+
+        response = self.client.post(
+            self.url("roll-forward"),
+            {"source_year": 2025, "target_year": 2026, "adjustments": {"receitas": "50"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("adjustments", response.data)
+
+    def test_adjustments_are_bounded(self):
+        response = self.client.post(
+            self.url("roll-forward"),
+            {"source_year": 2025, "target_year": 2026, "adjustments": {"custos": "5000"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ClonePlanTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('investimentos', 'Reserva', date(2025, 1, 1), Decimal('500.00'), Decimal('6000.00')),
+        )
+        self.other = User.objects.create_user(username="bia", email="bia@example.com")
+
+    def test_clone_copies_items_and_rollups(self):
+        clone = clone_plan(self.life_plan, self.other, name="Cópia")
+
+        self.assertEqual((clone.user, clone.name), (self.other, "Cópia"))
+        self.assertEqual(plan_items(clone), plan_items(self.life_plan))
+        self.assertEqual(self.summary(date(2025, 1, 1), 'receitas', life_plan=clone).total_value, Decimal('5000.00'))
+        self.assertEqual(LifePlanGoalProgress.objects.get(life_plan=clone, name='Reserva').percent, Decimal('8.33'))
+
+    def test_endpoint_is_staff_only_and_rejects_users_with_a_plan(self):
+        payload = {"user": self.other.pk}
+        self.assertEqual(self.client.post(self.url("clone"), payload, format="json").status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(self.url("clone"), payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(LifePlanItem.objects.filter(life_plan__user=self.other).count(), 2)
+
+        self.assertEqual(self.client.post(self.url("clone"), payload, format="json").status_code, 400)
+
+
+class MonthlySummaryTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('receitas', 'Bônus', date(2025, 1, 20), Decimal('1000.00'), Decimal('0.00')),
+            ('custos', 'Aluguel', date(2025, 1, 1), Decimal('1500.00'), Decimal('0.00')),
+            ('custos', 'Aluguel', date(2025, 2, 1), Decimal('1500.00'), Decimal('0.00')),
+        )
+
+    def test_items_changed_aggregates_by_month_and_category(self):
+        summary = self.summary(date(2025, 1, 1), 'receitas')
+
+        self.assertEqual((summary.total_value, summary.item_count), (Decimal('6000.00'), 2))
+        self.assertEqual(LifePlanMonthlySummary.objects.filter(life_plan=self.life_plan).count(), 3)
+
+    def test_refresh_limited_to_the_touched_months(self):
+        LifePlanItem.objects.filter(life_plan=self.life_plan, name='Aluguel').update(value=Decimal('1600.00'))
+
+        refresh_monthly_summaries(self.life_plan.id, [date(2025, 2, 10)])
+
+        self.assertEqual(self.summary(date(2025, 1, 1), 'custos').total_value, Decimal('1500.00'))
+        self.assertEqual(self.summary(date(2025, 2, 1), 'custos').total_value, Decimal('1600.00'))
+
+    def test_items_changed_drops_emptied_months_and_bumps_updated_at(self):
+        updated_at = LifePlan.objects.get(pk=self.life_plan.pk).updated_at
+        LifePlanItem.objects.filter(life_plan=self.life_plan, date=date(2025, 2, 1)).delete()
+
+        items_changed(self.life_plan.id, [date(2025, 2, 1)], {('custos', 'Aluguel')})
+
+        self.assertFalse(LifePlanMonthlySummary.objects.filter(life_plan=self.life_plan, month=date(2025, 2, 1)).exists())
+        self.assertGreater(LifePlan.objects.get(pk=self.life_plan.pk).updated_at, updated_at)
+
+    def test_item_endpoint_keeps_the_summaries_in_sync(self):
+        item = LifePlanItem.objects.get(life_plan=self.life_plan, name='Bônus')
+
+        response = self.client.delete(f"/api/v1/life-plan-item/{item.pk}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.summary(date(2025, 1, 1), 'receitas').total_value, Decimal('5000.00'))
+
+
+class GoalEndpointTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('investimentos', 'Reserva', date(2025, 1, 1), Decimal('1000.00'), Decimal('3000.00')),
+            ('investimentos', 'Reserva', date(2025, 2, 1), Decimal('1000.00'), Decimal('3000.00')),
+            ('realizacoes', 'Viagem', date(2025, 1, 1), Decimal('500.00'), Decimal('500.00')),
+        )
+
+    def test_lists_progress_filtered_by_category(self):
+        response = self.client.get(self.url("goals"), {"category": "investimentos"})
+
+        self.assertEqual(response.status_code, 200)
+        progress, = response.data
+        self.assertEqual(
+            (progress['name'], progress['percent'], progress['projected_completion']), ('Reserva', '66.67', '2025-03-01')
+        )
+
+    def test_reached_goals_report_the_month_they_were_reached(self):
+        response = self.client.get(self.url("goals"), {"category": "realizacoes"})
+
+        self.assertEqual(response.data[0]['projected_completion'], '2025-01-01')
+
+    def test_refresh_limited_to_the_touched_keys(self):
+        LifePlanItem.objects.filter(life_plan=self.life_plan).update(value=Decimal('1500.00'))
+
+        refresh_goal_progress(self.life_plan.id, {('investimentos', 'Reserva')})
+
+        progress = {row.name: row for row in LifePlanGoalProgress.objects.filter(life_plan=self.life_plan)}
+        self.assertEqual(progress['Reserva'].percent, Decimal('100.00'))
+        self.assertEqual(progress['Viagem'].cumulative_value, Decimal('500.00'))
+
+
+class MatrixEndpointTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            ('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')),
+            ('receitas', 'Salário', date(2025, 3, 1), Decimal('5200.00'), Decimal('0.00')),
+            ('custos', 'Aluguel', date(2025, 2, 1), Decimal('1500.00'), Decimal('100.00')),
+        )
+
+    def test_rows_are_aligned_to_the_months(self):
+        response = self.client.get(self.url("matrix"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['months'], ['2025-01-01', '2025-02-01', '2025-03-01'])
+        rows = {(row['category'], row['name']): row for row in response.data['rows']}
+        self.assertEqual(rows[('receitas', 'Salário')]['values'], [5000.0, None, 5200.0])
+        self.assertEqual(rows[('custos', 'Aluguel')]['values'], [None, 1500.0, None])
+        self.assertEqual(rows[('custos', 'Aluguel')]['metas'], [None, 100.0, None])
+
+    def test_window_limits_the_months(self):
+        response = self.client.get(self.url("matrix"), {"from": "2025-02", "to": "2025-02"})
+
+        self.assertEqual(response.data['months'], ['2025-02-01'])
+        self.assertEqual([row['name'] for row in response.data['rows']], ['Aluguel'])
+
+
+class ExportCacheTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        export_cache.render_cache.clear()
+        self.add_items(('receitas', 'Salário', date(2025, 1, 1), Decimal('5000.00'), Decimal('0.00')))
+
+    def edit_cell(self, value):
+        self.client.patch(
+            self.url("cells"),
+            {"operations": [{"category": "receitas", "name": "Salário", "month": "2025-01", "value": value}]},
+            format="json",
+        )
+
+    def test_csv_etag_is_revalidated_until_the_plan_changes(self):
+        etag = self.client.get(self.url("export-csv"))['ETag']
+
+        self.assertEqual(self.client.get(self.url("export-csv"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.edit_cell("5100.00")
+        response = self.client.get(self.url("export-csv"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_same_content_keeps_the_same_etag(self):
+        etag = self.client.get(self.url("export-csv"))['ETag']
+
+        self.edit_cell("5100.00")
+        self.edit_cell("5000.00")
+
+        self.assertEqual(self.client.get(self.url("export-csv"))['ETag'], etag)
+
+    def test_rendered_pdf_is_reused_until_the_plan_changes(self):
+        with mock.patch("life_plan.api.viewsets.render_plan_pdf", return_value=b"%PDF-1.4") as render:
+            first = self.client.get(self.url("export-pdf"))
+            second = self.client.get(self.url("export-pdf"))
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(first['ETag'], second['ETag'])
+
+            self.edit_cell("5100.00")
+            self.client.get(self.url("export-pdf"))
+            self.assertEqual(render.call_count, 2)
+
+    def test_content_hash_memo_is_bounded(self):
+        plans = [self.life_plan] + [LifePlan.objects.create(user=self.user, name=f"Plano {index}") for index in range(3)]
+
+        with mock.patch.object(export_cache, "CONTENT_HASHES_SIZE", 2):
+            for life_plan in plans:
+                export_cache.plan_content_hash(life_plan)
+
+            self.assertLessEqual(len(export_cache._content_hashes), 2)
+            self.assertIn(plans[-1].pk, export_cache._content_hashes)
+
+
+def monthly_rows(year, category, name, value, meta=Decimal('0.00')):
+    return [(category, name, date(year, month, 1), value, meta) for month in range(1, 13)]
+
+
+class ProjectionTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(
+            *monthly_rows(2025, 'receitas', 'Salário', Decimal('5000.00')),
+            *monthly_rows(2025, 'custos', 'Aluguel', Decimal('3000.00')),
+            *monthly_rows(2025, 'investimentos', 'Reserva', Decimal('1000.00'), Decimal('24000.00')),
+        )
+
+    def test_flat_scenario(self):
+        response = self.client.post(self.url("projection"), {"years": 2, "assumptions": {}}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual((data['months'][0], len(data['months'])), ('2026-01-01', 24))
+        self.assertEqual(data['cash_balance'][11], 12000.0)
+        self.assertEqual(data['investment_balance'][-1], 24000.0)
+        self.assertEqual(data['net_worth'][-1], 48000.0)
+        self.assertEqual(data['goals'], [
+            {"category": "investimentos", "name": "Reserva", "meta": 24000.0, "progress": 1.0, "reached_at": "2027-12-01"},
+        ])
+
+    def test_scenarios_return_one_summary_each(self):
+        response = self.client.post(
+            self.url("projection"),
+            {"years": 2, "scenarios": [{}, {"inflation": 0.1, "initial_cash": -50000}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        flat, inflated = response.data['scenarios']
+        self.assertEqual(flat['final_cash'], 24000.0)
+        self.assertLess(inflated['final_cash'], flat['final_cash'] - 50000)
+        self.assertLess(inflated['min_cash'], 0)
+
+    def test_rejects_both_assumptions_and_scenarios(self):
+        response = self.client.post(self.url("projection"), {"assumptions": {}, "scenarios": [{}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_base_year_keeps_earlier_values_for_months_missing_later(self):
+        self.add_items(('receitas', 'Salário', date(2026, 3, 1), Decimal('6000.00'), Decimal('0.00')))
+
+        profile = plan_profile(LifePlan.objects.get(pk=self.life_plan.pk))
+
+        income = profile.category_values[CATEGORY_INDEX['receitas']]
+        self.assertEqual(income[2], 6000)
+        self.assertEqual(income[0], 5000)
+        self.assertEqual(profile.start, date(2026, 4, 1))
+
+
+class MonteCarloTests(LifePlanAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_items(*monthly_rows(2025, 'investimentos', 'Reserva', Decimal('1000.00'), Decimal('24000.00')))
+
+    def simulate(self, **params):
+        return self.client.post(self.url("monte-carlo"), {"years": 2, "paths": 100, **params}, format="json")
+
+    def test_without_volatility_every_path_is_the_contributions(self):
+        response = self.simulate(expected_return=0, volatility=0)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['contributed'][-1], 24000.0)
+        self.assertEqual({band[-1] for band in data['percentiles'].values()}, {24000.0})
+        self.assertEqual(data['goals'][0]['probability'], 1.0)
+
+    def test_seed_makes_runs_reproducible(self):
+        first = self.simulate(paths=4500, seed=42).data
+        second = self.simulate(paths=4500, seed=42).data
+
+        self.assertEqual(first['percentiles'], second['percentiles'])
+        self.assertEqual(first['goals'], second['goals'])
+        self.assertLess(first['percentiles']['p5'][-1], first['percentiles']['p95'][-1])
 
-# Create your tests here.
+    def test_rejects_non_investment_categories(self):
+        self.assertEqual(self.simulate(categories=["custos"]).status_code, 400)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, UserReferral, WithdrawalRequest
+from .models import AuthToken, User, UserReferral, WithdrawalRequest
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('email', 'username', 'first_name', 'phone', 'user_type', 'payment_made',
@@ -42,6 +42,22 @@ class WithdrawalRequestAdmin(admin.ModelAdmin):
     def user(self, obj):
         return obj.user.email
 
+class AuthTokenAdmin(admin.ModelAdmin):
+    list_display = ('user', 'device', 'created_at', 'expires_at', 'revoked_at')
+    search_fields = ('user__email', 'device')
+    list_filter = ('created_at', 'expires_at', 'revoked_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('digest', 'created_at')
+    actions = ('revoke',)
+
+    @admin.action(description="Revogar tokens selecionados")
+    def revoke(self, request, queryset):
+        from users.authentication import revoke_tokens
+
+        revoke_tokens(queryset)
+
 admin.site.register(User, CustomUserAdmin)
 admin.site.register(UserReferral, UserReferralAdmin)
-admin.site.register(WithdrawalRequest, WithdrawalRequestAdmin)
\ No newline at end of file
+admin.site.register(WithdrawalRequest, WithdrawalRequestAdmin)
+admin.site.register(AuthToken, AuthTokenAdmin)
\ No newline at end of file
@@ -1,4 +1,3 @@
-import requests
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
@@ -7,9 +6,19 @@ from plans_subscriptions.models import Subscription
 from users.models import UserReferral, UserType, WithdrawalRequest
 from allauth.socialaccount.models import SocialAccount
 from django.db.models import Sum
+from life_plan.models import LifePlan
+from users.providers import ProviderError, ProviderUnavailable, verify_identity
 
 User = get_user_model()
 
+SOCIAL_PROVIDER_LABELS = {'google': 'Google', 'facebook': 'Facebook'}
+
+
+def social_error(provider, unavailable=False):
+    if unavailable:
+        return f"Failed to fetch user info from {SOCIAL_PROVIDER_LABELS[provider]}."
+    return f"Invalid {SOCIAL_PROVIDER_LABELS[provider]} access token"
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -120,60 +129,10 @@ class RegisterSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({"referral_code": "Código de referência inválido."})
 
         if id_token_google:
-            try:
-                response = requests.get(
-                    'https://www.googleapis.com/oauth2/v3/userinfo',
-                    headers={'Authorization': f'Bearer {id_token_google}'}
-                )
-                user_info = response.json()
-                if response.status_code != 200 or 'email' not in user_info:
-                    raise serializers.ValidationError({"id_token": "Invalid Google access token"})
-                social_account = SocialAccount.objects.filter(uid=user_info['sub'], provider='google').first()
-                if social_account:
-                    raise serializers.ValidationError("Este usuário já está registrado com uma conta Google.")
-                user = User.objects.create(
-                    email=user_info['email'],
-                    username=user_info['email'],
-                    first_name=user_info.get('first_name', ''),
-                    last_name=user_info.get('last_name', ''),
-                    phone=validated_data.get('phone', ''),
-                    user_type=UserType.USER_TYPE_COLLABORATOR,
-                    payment_made=True,
-                )
-                user.set_unusable_password()
-                user.save()
-                SocialAccount.objects.create(user=user, uid=user_info['sub'], provider='google')
-                return user
-            except requests.RequestException as e:
-                raise serializers.ValidationError({"id_token": "Failed to fetch user info from Google."})
+            return self.create_social_user('google', id_token_google, 'id_token', validated_data)
 
         if facebook_token:
-            try:
-                response = requests.get(
-                    'https://graph.facebook.com/me',
-                    params={'fields': 'id, email, first_name, last_name', 'access_token': facebook_token}
-                )
-                user_info = response.json()
-                if response.status_code != 200 or 'email' not in user_info:
-                    raise serializers.ValidationError({"facebook_token": "Invalid Facebook access token"})
-                social_account = SocialAccount.objects.filter(uid=user_info['id'], provider='facebook').first()
-                if social_account:
-                    raise serializers.ValidationError("Este usuário já está registrado com uma conta Facebook.")
-                user = User.objects.create(
-                    email=user_info['email'],
-                    username=user_info['email'],
-                    first_name=user_info.get('first_name', ''),
-                    last_name=user_info.get('last_name', ''),
-                    phone=validated_data.get('phone', ''),
-                    user_type=UserType.USER_TYPE_COLLABORATOR,
-                    payment_made=True,
-                )
-                user.set_unusable_password()
-                user.save()
-                SocialAccount.objects.create(user=user, uid=user_info['id'], provider='facebook')
-                return user
-            except requests.RequestException as e:
-                raise serializers.ValidationError({"facebook_token": "Failed to fetch user info from Facebook."})
+            return self.create_social_user('facebook', facebook_token, 'facebook_token', validated_data)
 
         validated_data['email'] = validated_data['email'].lower()
         user = User.objects.create(
@@ -193,6 +152,37 @@ class RegisterSerializer(serializers.ModelSerializer):
                 referred_user=user
             )
 
+        LifePlan.create_default_plan(user=user)
+
+        return user
+
+    def create_social_user(self, provider, token, field, validated_data):
+        provider_label = SOCIAL_PROVIDER_LABELS[provider]
+        # A view assíncrona já verifica o token fora da thread e repassa a identidade no contexto.
+        user_info = self.context.get('identities', {}).get(provider)
+        if user_info is None:
+            try:
+                user_info = verify_identity(provider, token)
+            except ProviderUnavailable:
+                raise serializers.ValidationError({field: social_error(provider, unavailable=True)})
+            except ProviderError:
+                raise serializers.ValidationError({field: social_error(provider)})
+
+        if SocialAccount.objects.filter(uid=user_info['uid'], provider=provider).exists():
+            raise serializers.ValidationError(f"Este usuário já está registrado com uma conta {provider_label}.")
+        user = User.objects.create(
+            email=user_info['email'],
+            username=user_info['email'],
+            first_name=user_info['first_name'],
+            last_name=user_info['last_name'],
+            phone=validated_data.get('phone', ''),
+            user_type=UserType.USER_TYPE_COLLABORATOR,
+            payment_made=True,
+        )
+        user.set_unusable_password()
+        user.save()
+        SocialAccount.objects.create(user=user, uid=user_info['uid'], provider=provider)
+        LifePlan.create_default_plan(user=user)
         return user
     
     
@@ -0,0 +1,122 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers
+from users.api.serializers import RegisterSerializer, social_error
+from users.authentication import issue_token, request_device
+from users.models import UserReferral
+from users.providers import ProviderError, ProviderUnavailable, averify_identity
+from users.token import login_payload, social_users
+
+SOCIAL_FIELDS = {
+    'login': (('access_token', 'google'), ('facebook_token', 'facebook')),
+    'register': (('id_token', 'google'), ('facebook_token', 'facebook')),
+}
+
+
+def request_json(request):
+    """Corpo da requisição (JSON ou formulário) como dicionário."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST.dict()
+
+
+def social_token(data, flow):
+    """Primeiro token social preenchido (campos vazios são ignorados, como no RegisterSerializer)."""
+    for field, provider in SOCIAL_FIELDS[flow]:
+        if data.get(field):
+            return field, provider, str(data[field])
+    return None, None, None
+
+
+def json_response(data, status):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder, safe=False)
+
+
+async def alogin_response(request, data, user):
+    token, key = await sync_to_async(issue_token)(user, request_device(request, data))
+    referral_count = getattr(user, 'referral_count', None)
+    if referral_count is None:
+        referral_count = await UserReferral.objects.filter(referred_by=user).acount()
+    return json_response(login_payload(request, user, token, key, referral_count), 200)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCombinedLoginView(View):
+    """
+    Versão assíncrona do CombinedLoginView (mesmo contrato), para rodar sob ASGI:
+    enquanto a chamada ao Google/Facebook está em andamento o worker atende outras
+    requisições, em vez de ficar uma thread parada por login social.
+    """
+
+    async def post(self, request):
+        data = request_json(request)
+
+        if 'username' in data and 'password' in data:
+            user = await aauthenticate(request, username=data.get('username'), password=data.get('password'))
+            if user is not None:
+                return await alogin_response(request, data, user)
+            return json_response({"error": _("Invalid credentials")}, 401)
+
+        field, provider, token = social_token(data, 'login')
+        if provider is None:
+            return json_response({"error": _("Invalid login request")}, 400)
+
+        try:
+            user_info = await averify_identity(provider, token)
+        except ProviderUnavailable as e:
+            return json_response({"error": str(e)}, 400)
+        except ProviderError:
+            return json_response({'error': f'Failed to retrieve user information from {provider.capitalize()}.'}, 400)
+
+        user = await social_users(provider, user_info['uid']).afirst()
+        if user is None:
+            return json_response({'error': 'No social account found for this user'}, 404)
+        return await alogin_response(request, data, user)
+
+
+def register_user(serializer):
+    """Validação e gravação do cadastro (síncronas: o ORM em transação não tem API assíncrona)."""
+    if not serializer.is_valid():
+        return serializer.errors, 400
+    try:
+        serializer.save()
+    except serializers.ValidationError as exc:
+        return exc.detail, 400
+    return serializer.data, 201
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSocialRegisterView(View):
+    """
+    Cadastro com Google/Facebook sob ASGI: o token é verificado de forma assíncrona e a
+    identidade é repassada ao RegisterSerializer, que só grava o usuário.
+    """
+
+    async def post(self, request):
+        data = request_json(request)
+        field, provider, token = social_token(data, 'register')
+        if provider is None:
+            return json_response({"error": _("Invalid registration request")}, 400)
+
+        try:
+            user_info = await averify_identity(provider, token)
+        except ProviderUnavailable:
+            return json_response({field: [social_error(provider, unavailable=True)]}, 400)
+        except ProviderError:
+            return json_response({field: [social_error(provider)]}, 400)
+
+        serializer = RegisterSerializer(data=data, context={'identities': {provider: user_info}})
+        body, status = await sync_to_async(register_user)(serializer)
+        return json_response(body, status)
@@ -0,0 +1,232 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenUserCache:
+    """
+    Cache LRU em memória, com TTL, de digest do token -> (usuário, token).
+    Limitado em número de entradas; as entradas guardam o id do usuário
+    para permitir a invalidação de todos os tokens de um usuário.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key, (_, (user, _)) in self._entries.items() if user.pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RevocationSet:
+    """
+    Conjunto em memória dos digests de tokens revogados e ainda não expirados,
+    consultado antes de qualquer cache ou banco.
+
+    A primeira consulta carrega o conjunto inteiro; depois, a cada `refresh_interval`
+    segundos, só as revogações posteriores à última leitura são buscadas (pelo índice
+    em `revoked_at`), o que propaga as revogações feitas por outros processos. Os
+    digests guardam a própria expiração e os expirados são descartados periodicamente.
+    """
+
+    def __init__(self, refresh_interval, prune_interval=300):
+        self.refresh_interval = refresh_interval
+        self.prune_interval = prune_interval
+        self._digests = {}
+        self._watermark = None
+        self._next_refresh = 0
+        self._next_prune = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, digest):
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        return digest in self._digests
+
+    def add(self, revoked):
+        """Registra pares (digest, expires_at) revogados neste processo."""
+        with self._lock:
+            self._digests.update(revoked)
+
+    def refresh(self):
+        from users.models import AuthToken
+
+        with self._lock:
+            # Outra thread pode ter atualizado enquanto esta esperava o lock.
+            if time.monotonic() < self._next_refresh:
+                return
+            now = timezone.now()
+            revoked = AuthToken.objects.filter(revoked_at__isnull=False, expires_at__gt=now)
+            if self._watermark is not None:
+                # A margem cobre revogações gravadas por transações que terminaram depois da última leitura.
+                revoked = revoked.filter(revoked_at__gt=self._watermark - timedelta(seconds=self.refresh_interval))
+            self._digests.update(revoked.values_list('digest', 'expires_at'))
+            self._watermark = now
+            if time.monotonic() >= self._next_prune:
+                self.prune(now)
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def prune(self, now):
+        """Descarta os digests já expirados (esses tokens são recusados pela expiração)."""
+        for digest in [digest for digest, expires_at in self._digests.items() if expires_at <= now]:
+            del self._digests[digest]
+        self._next_prune = time.monotonic() + self.prune_interval
+
+    def clear(self):
+        with self._lock:
+            self._digests = {}
+            self._watermark = None
+            self._next_refresh = 0
+            self._next_prune = 0
+
+
+token_cache = TokenUserCache(
+    max_entries=getattr(settings, "TOKEN_AUTH_CACHE_SIZE", 10000),
+    ttl=getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60),
+)
+
+revoked_tokens = RevocationSet(refresh_interval=getattr(settings, "TOKEN_REVOCATION_REFRESH", 5))
+
+
+def shared_cache():
+    """Cache compartilhado entre processos (alias em TOKEN_AUTH_SHARED_CACHE), se configurado."""
+    alias = getattr(settings, "TOKEN_AUTH_SHARED_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def shared_cache_key(digest):
+    return f"auth-token:{digest}"
+
+
+def invalidate_token(digest):
+    token_cache.discard(digest)
+    cache = shared_cache()
+    if cache is not None:
+        cache.delete(shared_cache_key(digest))
+
+
+def invalidate_user_tokens(user_id):
+    """Remove dos caches todos os tokens do usuário."""
+    token_cache.discard_user(user_id)
+    cache = shared_cache()
+    if cache is not None:
+        from users.models import AuthToken
+
+        digests = AuthToken.objects.filter(user_id=user_id).values_list('digest', flat=True)
+        cache.delete_many([shared_cache_key(digest) for digest in digests])
+
+
+def revoke_tokens(queryset):
+    """Revoga os tokens ativos do queryset, atualizando o conjunto de revogados e os caches."""
+    revoked = dict(queryset.filter(revoked_at__isnull=True).values_list('digest', 'expires_at'))
+    if not revoked:
+        return 0
+    digests = list(revoked)
+    queryset.model.objects.filter(digest__in=digests).update(revoked_at=timezone.now())
+    revoked_tokens.add(revoked)
+    for digest in digests:
+        invalidate_token(digest)
+    return len(digests)
+
+
+def request_device(request, data=None):
+    """Identificação do dispositivo: campo `device` enviado pelo cliente ou o User-Agent."""
+    data = request.data if data is None else data
+    return str(data.get('device') or request.META.get('HTTP_USER_AGENT', ''))[:255]
+
+
+def issue_token(user, device=''):
+    """
+    Emite um token para o dispositivo, revogando o anterior do mesmo dispositivo
+    (cada dispositivo tem no máximo um token ativo). Devolve (token, chave).
+    """
+    from users.models import AuthToken
+
+    revoke_tokens(AuthToken.objects.filter(user=user, device=device))
+    return AuthToken.issue(user, device)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Autenticação por AuthToken (cabeçalho `Authorization: Token <chave>`).
+
+    Tokens revogados são recusados pelo conjunto em memória antes de qualquer consulta;
+    os demais são procurados no LRU do processo, no cache compartilhado (opcional) e só
+    então no banco. A expiração é conferida também nos tokens vindos do cache.
+    """
+
+    def authenticate_credentials(self, key):
+        from users.models import AuthToken
+
+        digest = AuthToken.digest_key(key)
+        if digest in revoked_tokens:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        cached = token_cache.get(digest)
+
+        cache = shared_cache()
+        if cached is None and cache is not None:
+            cached = cache.get(shared_cache_key(digest))
+            if cached is not None:
+                token_cache.set(digest, cached)
+
+        if cached is None:
+            try:
+                token = AuthToken.objects.select_related('user').get(digest=digest, revoked_at__isnull=True)
+            except AuthToken.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+            cached = (token.user, token)
+            token_cache.set(digest, cached)
+            if cache is not None:
+                cache.set(shared_cache_key(digest), cached, getattr(settings, "TOKEN_AUTH_SHARED_CACHE_TTL", 300))
+
+        if cached[1].is_expired:
+            invalidate_token(digest)
+            raise exceptions.AuthenticationFailed(_("Token expired."))
+
+        # Cada requisição recebe cópias, para que alterações em request.user não vazem para o cache.
+        user, token = copy.copy(cached[0]), copy.copy(cached[1])
+        token.user = user
+        return user, token
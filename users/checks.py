@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def google_audience_check(app_configs, **kwargs):
+    """Sem audiência configurada, o login com ID token do Google é recusado em toda requisição."""
+    from users.providers import google_audiences
+
+    provider = getattr(settings, 'SOCIAL_AUTH_IDENTITY_PROVIDER', 'users.providers.HttpIdentityProvider')
+    if provider != 'users.providers.HttpIdentityProvider' or google_audiences():
+        return []
+    return [Warning(
+        "Nenhuma audiência configurada para ID tokens do Google; o login com id_token será recusado.",
+        hint="Defina GOOGLE_OAUTH2_CLIENT_ID ou GOOGLE_ID_TOKEN_AUDIENCES.",
+        id='users.W001',
+    )]
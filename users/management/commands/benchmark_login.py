@@ -0,0 +1,104 @@
+import statistics
+import time
+
+from allauth.socialaccount.models import SocialAccount
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory
+from users.models import UserReferral
+from users.token import CombinedLoginView
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula (dentro de uma transação desfeita ao final) usuários e indicações e mede, "
+        "para cada tipo de login do CombinedLoginView, as consultas e a latência p50/p95."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20000, help="Quantidade de usuários a popular.")
+        parser.add_argument("--repeat", type=int, default=200, help="Logins por tipo.")
+
+    def handle(self, *args, **options):
+        # O hash de senha rápido tira do tempo o custo do PBKDF2, que não depende das consultas,
+        # e o provedor local responde sem rede: o benchmark mede o lado do banco.
+        with transaction.atomic(), override_settings(
+            PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+            SOCIAL_AUTH_IDENTITY_PROVIDER="users.providers.StubIdentityProvider",
+            SOCIAL_AUTH_STUB_DELAY=0,
+        ):
+            user = self.seed(options["users"])
+            branches = {
+                "senha": {"username": user.email, "password": PASSWORD},
+                "google": {"access_token": f"benchmark-google:{user.email}"},
+                "facebook": {"facebook_token": f"benchmark-facebook:{user.email}"},
+            }
+
+            self.stdout.write(self.style.MIGRATE_HEADING("Login (ms)"))
+            for label, data in branches.items():
+                self.report(label, *self.run(data, options["repeat"]))
+
+            self.stdout.write(self.style.MIGRATE_HEADING("Referência"))
+            self.report("agregado global de indicações (antigo)", *self.time_legacy_aggregate(options["repeat"]))
+
+            transaction.set_rollback(True)
+
+    def seed(self, user_count):
+        self.stdout.write(f"Populando {user_count} usuário(s)...")
+        users = User.objects.bulk_create([
+            User(username=f"benchmark-{index}", email=f"benchmark-{index}@example.com", referral_code=f"BL{index:08d}")
+            for index in range(user_count)
+        ], batch_size=2000)
+        # Metade dos usuários indicados por um décimo dos demais, para que a tabela de indicações cresça com a base.
+        referrers = users[: max(user_count // 10, 1)]
+        UserReferral.objects.bulk_create([
+            UserReferral(referred_by=referrers[index % len(referrers)], referred_user=referred)
+            for index, referred in enumerate(users[user_count // 2:])
+        ], batch_size=2000)
+
+        user = referrers[0]
+        user.set_password(PASSWORD)
+        user.save()
+        SocialAccount.objects.create(user=user, uid="benchmark-google", provider="google")
+        SocialAccount.objects.create(user=user, uid="benchmark-facebook", provider="facebook")
+        self.stdout.write(f"{UserReferral.objects.count()} indicações.")
+        return user
+
+    def run(self, data, repeat):
+        view = CombinedLoginView.as_view()
+        factory = APIRequestFactory()
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            request = factory.post("/login/", data, format="json", HTTP_USER_AGENT="benchmark")
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"Login falhou: {response.status_code} {response.data}")
+            queries = len(captured)
+        return timings, queries
+
+    def time_legacy_aggregate(self, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            UserReferral.objects.values("referred_by").annotate(
+                referral_count=Count("referred_user")
+            ).aggregate(total_referrals=Count("referred_by"))
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, 1
+
+    def report(self, label, timings, queries):
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f"{label:<40} consultas {queries:>3}  p50 {statistics.median(timings):>8.3f}  p95 {p95:>8.3f}"
+        )
@@ -0,0 +1,104 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from allauth.socialaccount.models import SocialAccount
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from users.providers import aclose_provider
+
+User = get_user_model()
+
+USER_PREFIX = "loadtest-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o login social síncrono (pool de threads, como um servidor WSGI) com o assíncrono "
+        "(ASGI, um único event loop) com um provedor local lento. Os usuários criados são removidos ao final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Logins por modo.")
+        parser.add_argument("--threads", type=int, default=8, help="Threads do modo síncrono (workers WSGI).")
+        parser.add_argument("--concurrency", type=int, default=200, help="Logins simultâneos no modo assíncrono.")
+        parser.add_argument("--delay", type=float, default=0.2, help="Latência simulada do provedor, em segundos.")
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+        with override_settings(
+            SOCIAL_AUTH_IDENTITY_PROVIDER="users.providers.StubIdentityProvider",
+            SOCIAL_AUTH_STUB_DELAY=options["delay"],
+        ):
+            self.seed(count)
+            try:
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"{count} logins, provedor com {options['delay'] * 1000:.0f} ms de latência"
+                ))
+                self.report(f"síncrono ({options['threads']} threads)", *self.run_sync(count, options["threads"]))
+                self.report(
+                    f"assíncrono ({options['concurrency']} simultâneos)",
+                    *asyncio.run(self.run_async(count, options["concurrency"])),
+                )
+            finally:
+                User.objects.filter(username__startswith=USER_PREFIX).delete()
+                connections.close_all()
+
+    def seed(self, count):
+        User.objects.filter(username__startswith=USER_PREFIX).delete()
+        users = User.objects.bulk_create([
+            User(username=f"{USER_PREFIX}{index}", email=f"{USER_PREFIX}{index}@example.com", referral_code=f"LT{index:08d}")
+            for index in range(count)
+        ], batch_size=2000)
+        SocialAccount.objects.bulk_create([
+            SocialAccount(user=user, uid=user.username, provider="google") for user in users
+        ], batch_size=2000)
+
+    def payload(self, index, mode):
+        # Tokens diferentes por modo, para que o cache de identidades não esconda a latência do provedor.
+        return {"access_token": f"{USER_PREFIX}{index}:{mode}-{index}@example.com", "device": mode}
+
+    def run_sync(self, count, threads):
+        url = reverse("auth-token")
+
+        def login(index):
+            start = time.perf_counter()
+            response = Client().post(url, self.payload(index, "sync"), content_type="application/json")
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(login, range(count)))
+        return time.perf_counter() - start, results
+
+    async def run_async(self, count, concurrency):
+        url = reverse("auth-token-async")
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login(index):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(url, self.payload(index, "async"), content_type="application/json")
+                return time.perf_counter() - start, response.status_code
+
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(login(index) for index in range(count)))
+            return time.perf_counter() - start, results
+        finally:
+            await aclose_provider()
+
+    def report(self, label, elapsed, results):
+        latencies = [latency * 1000 for latency, _ in results]
+        errors = sum(1 for _, status_code in results if status_code != 200)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f"{label:<32} total {elapsed:>7.2f} s  {len(results) / elapsed:>8.1f} logins/s  "
+            f"p50 {statistics.median(latencies):>8.1f} ms  p95 {p95:>8.1f} ms  erros {errors}"
+        )
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from users.models import AuthToken
+
+
+class Command(BaseCommand):
+    help = "Remove os tokens expirados e os revogados há mais tempo que o período de retenção."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Quantidade de tokens removidos por DELETE.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas conta os tokens que seriam removidos.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        revoked_before = now - timedelta(seconds=getattr(settings, "AUTH_TOKEN_REVOKED_RETENTION", 7 * 24 * 3600))
+        # Cada condição usa o seu índice (expires_at / revoked_at).
+        stale = AuthToken.objects.filter(Q(expires_at__lte=now) | Q(revoked_at__lte=revoked_before))
+
+        if options["dry_run"]:
+            self.stdout.write(f"{stale.count()} token(s) seriam removidos.")
+            return
+
+        # Lotes pequenos evitam uma transação longa travando a tabela de tokens.
+        purged = 0
+        while True:
+            batch = list(stale.values_list("pk", flat=True)[: options["batch_size"]])
+            if not batch:
+                break
+            AuthToken.objects.filter(pk__in=batch).delete()
+            purged += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"{purged} token(s) removido(s)."))
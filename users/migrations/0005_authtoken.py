@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:53
+
+import hashlib
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_drf_tokens(apps, schema_editor):
+    """Mantém válidos os tokens já emitidos: cada Token do DRF vira um AuthToken com expiração nova."""
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('users', 'AuthToken')
+
+    expires_at = timezone.now() + timedelta(seconds=getattr(settings, 'AUTH_TOKEN_TTL', 30 * 24 * 3600))
+    AuthToken.objects.bulk_create(
+        (
+            AuthToken(
+                digest=hashlib.sha256(key.encode()).hexdigest(),
+                user_id=user_id,
+                device='legacy',
+                expires_at=expires_at,
+            )
+            for key, user_id in Token.objects.values_list('key', 'user_id').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_privacy_accepted_user_privacy_accepted_date_and_more'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='Digest')),
+                ('device', models.CharField(blank=True, default='', max_length=255, verbose_name='Device')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+                ('revoked_at', models.DateTimeField(blank=True, null=True, verbose_name='Revoked At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Auth Token',
+                'verbose_name_plural': 'Auth Tokens',
+                'indexes': [models.Index(fields=['user', 'device'], name='authtoken_user_device'), models.Index(fields=['expires_at'], name='authtoken_expires_at'), models.Index(fields=['revoked_at'], name='authtoken_revoked_at')],
+            },
+        ),
+        migrations.RunPython(copy_drf_tokens, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,11 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 class UserType:
@@ -74,6 +80,51 @@ class UserReferral(models.Model):
         return f"{self.referred_user.email} referred by {self.referred_by.email}"
 
 
+class AuthToken(models.Model):
+    """
+    Token de API por dispositivo, com expiração e revogação. Apenas o
+    SHA-256 da chave é guardado; a chave em si só é conhecida na emissão.
+    """
+    digest = models.CharField(max_length=64, unique=True, verbose_name=_("Digest"))
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens', verbose_name=_("User"))
+    device = models.CharField(max_length=255, blank=True, default='', verbose_name=_("Device"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
+    expires_at = models.DateTimeField(verbose_name=_("Expires At"))
+    revoked_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Revoked At"))
+
+    class Meta:
+        verbose_name = _("Auth Token")
+        verbose_name_plural = _("Auth Tokens")
+        indexes = [
+            models.Index(fields=['user', 'device'], name='authtoken_user_device'),
+            models.Index(fields=['expires_at'], name='authtoken_expires_at'),
+            models.Index(fields=['revoked_at'], name='authtoken_revoked_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.device or '-'} (expira em {self.expires_at:%Y-%m-%d})"
+
+    @staticmethod
+    def digest_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user, device=''):
+        """Cria um token para o dispositivo e devolve (token, chave)."""
+        key = secrets.token_hex(20)
+        token = cls.objects.create(
+            digest=cls.digest_key(key),
+            user=user,
+            device=device[:255],
+            expires_at=timezone.now() + timedelta(seconds=getattr(settings, 'AUTH_TOKEN_TTL', 30 * 24 * 3600)),
+        )
+        return token, key
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+
 class WithdrawalRequest(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_("User"))
     amount = models.DecimalField(_("Amount"), max_digits=10, decimal_places=2)
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+
+import httpx
+import jwt
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+GOOGLE_USERINFO_URL = 'https://www.googleapis.com/oauth2/v3/userinfo'
+GOOGLE_JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+FACEBOOK_ME_URL = 'https://graph.facebook.com/me'
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Token recusado pelo provedor (inválido, expirado ou sem e-mail)."""
+
+
+class ProviderUnavailable(ProviderError):
+    """Falha de rede ou timeout ao falar com o provedor."""
+
+
+def identity(uid, email, first_name='', last_name=''):
+    return {'uid': str(uid), 'email': email, 'first_name': first_name or '', 'last_name': last_name or ''}
+
+
+def looks_like_jwt(token):
+    return token.count('.') == 2
+
+
+def provider_payload(response):
+    """JSON da resposta do provedor (requests ou httpx), exigindo status 200 e e-mail."""
+    try:
+        payload = response.json()
+    except ValueError:
+        raise ProviderError("Resposta inválida do provedor.")
+    if response.status_code != 200 or 'email' not in payload:
+        raise ProviderError("Token recusado pelo provedor.")
+    return payload
+
+
+def google_identity(payload):
+    return identity(payload['sub'], payload['email'], payload.get('given_name'), payload.get('family_name'))
+
+
+def facebook_params(token):
+    return {'fields': 'id,email,first_name,last_name', 'access_token': token}
+
+
+def facebook_identity(payload):
+    return identity(payload['id'], payload['email'], payload.get('first_name'), payload.get('last_name'))
+
+
+class HttpIdentityProvider:
+    """
+    Troca tokens do Google/Facebook pela identidade do usuário.
+
+    As chamadas saem por uma única requests.Session por processo (conexões keep-alive
+    reaproveitadas) com timeouts de conexão/leitura; as views assíncronas usam um
+    httpx.AsyncClient com o mesmo pool e timeouts. ID tokens do Google (JWT) são
+    verificados localmente com as chaves públicas (JWKS) em cache, sem chamada externa.
+    """
+
+    def __init__(self):
+        self.timeout = getattr(settings, 'SOCIAL_AUTH_HTTP_TIMEOUT', (3.05, 5))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=getattr(settings, 'SOCIAL_AUTH_HTTP_POOL_SIZE', 20),
+            max_retries=0,
+        )
+        self.session.mount('https://', adapter)
+        self.jwks_client = jwt.PyJWKClient(
+            GOOGLE_JWKS_URL,
+            cache_jwk_set=True,
+            lifespan=getattr(settings, 'GOOGLE_JWKS_CACHE_TTL', 3600),
+            timeout=self.timeout[0] + self.timeout[1],
+        )
+
+        # Um AsyncClient por event loop: o cliente não pode ser usado fora do loop em que foi criado.
+        self.async_clients = weakref.WeakKeyDictionary()
+
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self.async_clients.get(loop)
+        if client is None:
+            client = self.async_clients[loop] = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=getattr(settings, 'SOCIAL_AUTH_HTTP_POOL_SIZE', 20)),
+            )
+        return client
+
+    async def aclose(self):
+        """Fecha o AsyncClient do event loop atual (no desligamento do servidor ASGI)."""
+        client = self.async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def get_json(self, url, **kwargs):
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            raise ProviderUnavailable(str(exc))
+        return provider_payload(response)
+
+    async def aget_json(self, url, **kwargs):
+        try:
+            response = await self.async_client().get(url, **kwargs)
+        except httpx.HTTPError as exc:
+            raise ProviderUnavailable(str(exc))
+        return provider_payload(response)
+
+    def google(self, token):
+        if looks_like_jwt(token):
+            return self.google_id_token(token)
+        return google_identity(self.get_json(GOOGLE_USERINFO_URL, headers={'Authorization': f'Bearer {token}'}))
+
+    async def agoogle(self, token):
+        if looks_like_jwt(token):
+            # A verificação é local; só a busca do JWKS (raramente, fora do cache) bloqueia a thread.
+            return await sync_to_async(self.google_id_token, thread_sensitive=False)(token)
+        payload = await self.aget_json(GOOGLE_USERINFO_URL, headers={'Authorization': f'Bearer {token}'})
+        return google_identity(payload)
+
+    def google_id_token(self, token):
+        audiences = google_audiences()
+        if not audiences:
+            # Sem audiência, um ID token emitido para qualquer outro app seria aceito; o
+            # system check users.W001 avisa na inicialização e aqui o login é só recusado.
+            logger.error("ID token do Google recusado: GOOGLE_OAUTH2_CLIENT_ID/GOOGLE_ID_TOKEN_AUDIENCES não configurados.")
+            raise ProviderUnavailable("Login com Google indisponível no momento.")
+        try:
+            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+            claims = jwt.decode(
+                token,
+                signing_key.key,
+                algorithms=['RS256'],
+                audience=audiences,
+                options={'require': ['exp', 'iss', 'sub', 'aud']},
+            )
+        except jwt.PyJWKClientConnectionError as exc:
+            raise ProviderUnavailable(str(exc))
+        except jwt.PyJWTError:
+            raise ProviderError("ID token do Google inválido.")
+        if claims['iss'] not in GOOGLE_ISSUERS or not claims.get('email') or claims.get('email_verified') is not True:
+            raise ProviderError("ID token do Google inválido.")
+        return identity(claims['sub'], claims['email'], claims.get('given_name'), claims.get('family_name'))
+
+    def facebook(self, token):
+        return facebook_identity(self.get_json(FACEBOOK_ME_URL, params=facebook_params(token)))
+
+    async def afacebook(self, token):
+        return facebook_identity(await self.aget_json(FACEBOOK_ME_URL, params=facebook_params(token)))
+
+    def verify(self, provider, token):
+        return getattr(self, provider)(token)
+
+    async def averify(self, provider, token):
+        return await getattr(self, f'a{provider}')(token)
+
+
+class StubIdentityProvider:
+    """
+    Provedor local para desenvolvimento, testes e carga, sem rede. O token é `<uid>`
+    ou `<uid>:<email>`; tokens começando com `invalid` são recusados. SOCIAL_AUTH_STUB_DELAY
+    simula a latência (em segundos) de um provedor lento.
+    """
+
+    def __init__(self):
+        self.delay = getattr(settings, 'SOCIAL_AUTH_STUB_DELAY', 0)
+
+    def verify(self, provider, token):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.stub_identity(provider, token)
+
+    async def averify(self, provider, token):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.stub_identity(provider, token)
+
+    async def aclose(self):
+        pass
+
+    def stub_identity(self, provider, token):
+        if not token or token.startswith('invalid'):
+            raise ProviderError("Token recusado pelo provedor.")
+        uid, _, email = token.partition(':')
+        return identity(uid, email or f'{uid}@{provider}.example.com', 'Stub', provider.capitalize())
+
+
+def google_audiences():
+    client_id = settings.SOCIALACCOUNT_PROVIDERS.get('google', {}).get('OAUTH2_CLIENT_ID')
+    return [audience for audience in [client_id, *getattr(settings, 'GOOGLE_ID_TOKEN_AUDIENCES', [])] if audience]
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Instância única por processo do provedor configurado em SOCIAL_AUTH_IDENTITY_PROVIDER."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = import_string(
+                    getattr(settings, 'SOCIAL_AUTH_IDENTITY_PROVIDER', 'users.providers.HttpIdentityProvider')
+                )()
+    return _provider
+
+
+async def aclose_provider():
+    """Libera as conexões assíncronas do provedor no event loop atual (lifespan ASGI, fim de comandos)."""
+    if _provider is not None:
+        await _provider.aclose()
+
+
+@receiver(setting_changed)
+def reset_provider(setting, **kwargs):
+    global _provider
+    if setting.startswith('SOCIAL_AUTH_'):
+        _provider = None
+
+
+def identity_cache():
+    return caches[getattr(settings, 'SOCIAL_IDENTITY_CACHE', 'default')]
+
+
+def identity_cache_key(provider, token):
+    return f"social-identity:{provider}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def verify_identity(provider, token):
+    """
+    Identidade ({uid, email, first_name, last_name}) do token de `provider` ('google' ou
+    'facebook'). Resultados verificados ficam em cache por SOCIAL_IDENTITY_CACHE_TTL segundos,
+    então logins repetidos com o mesmo token não saem para a rede; falhas não são guardadas.
+    """
+    cache = identity_cache()
+    key = identity_cache_key(provider, token)
+    result = cache.get(key)
+    if result is None:
+        result = get_provider().verify(provider, token)
+        cache.set(key, result, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 300))
+    return result
+
+
+async def averify_identity(provider, token):
+    """Versão assíncrona de verify_identity, para as views ASGI: a chamada ao provedor não ocupa uma thread."""
+    cache = identity_cache()
+    key = identity_cache_key(provider, token)
+    result = await cache.aget(key)
+    if result is None:
+        result = await get_provider().averify(provider, token)
+        await cache.aset(key, result, getattr(settings, 'SOCIAL_IDENTITY_CACHE_TTL', 300))
+    return result
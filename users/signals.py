@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.authentication import invalidate_token, invalidate_user_tokens
+from users.models import AuthToken
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=AuthToken)
+@receiver(post_delete, sender=AuthToken)
+def invalidate_changed_token(sender, instance, **kwargs):
+    invalidate_token(instance.digest)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token_cache(sender, instance, **kwargs):
+    """Alterações no usuário (inclusive troca de senha e desativação) descartam os tokens em cache."""
+    invalidate_user_tokens(instance.pk)
@@ -1,3 +1,254 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from allauth.socialaccount.models import SocialAccount
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from users.authentication import RevocationSet, issue_token, revoked_tokens, token_cache
+from users.checks import google_audience_check
+from users.models import AuthToken
+from users.providers import (
+    HttpIdentityProvider, ProviderError, ProviderUnavailable, StubIdentityProvider, verify_identity,
+)
+
+User = get_user_model()
+
+PASSWORD = "test-password"
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthTokenTests(TestCase):
+    def setUp(self):
+        # Os caches de autenticação são do processo e sobrevivem ao rollback de cada teste.
+        token_cache.clear()
+        revoked_tokens.clear()
+        self.user = User.objects.create_user(username="ana", email="ana@example.com", password=PASSWORD)
+
+    def login(self, device="phone"):
+        response = APIClient().post(
+            reverse("auth-token"), {"username": "ana@example.com", "password": PASSWORD, "device": device}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data["token"]
+
+    def client_for(self, key):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {key}")
+        return client
+
+    def assertAuthenticated(self, key, expected=True):
+        response = self.client_for(key).post(reverse("auth-token-rotate"), format="json")
+        self.assertEqual(response.status_code == 200, expected)
+        return response
+
+    def test_login_issues_one_token_per_device(self):
+        phone = self.login("phone")
+        laptop = self.login("laptop")
+        phone_again = self.login("phone")
+
+        self.assertEqual(AuthToken.objects.filter(user=self.user, revoked_at__isnull=True).count(), 2)
+        self.assertIsNotNone(AuthToken.objects.get(digest=AuthToken.digest_key(phone)).revoked_at)
+        self.assertEqual(self.client_for(phone).get("/api/v1/users/").status_code, 401)
+        self.assertEqual(self.client_for(laptop).get("/api/v1/users/").status_code, 200)
+        self.assertEqual(self.client_for(phone_again).get("/api/v1/users/").status_code, 200)
+
+    def test_only_the_digest_is_stored(self):
+        key = self.login()
+        token = AuthToken.objects.get(user=self.user)
+        self.assertEqual(token.digest, AuthToken.digest_key(key))
+        self.assertNotIn(key, token.digest)
+
+    def test_rotate_replaces_the_token(self):
+        key = self.login()
+        response = self.assertAuthenticated(key)
+
+        new_key = response.data["token"]
+        self.assertNotEqual(new_key, key)
+        self.assertAuthenticated(key, expected=False)
+        self.assertEqual(AuthToken.objects.get(digest=AuthToken.digest_key(new_key)).device, "phone")
+
+    def test_logout_revokes_only_the_current_token(self):
+        phone, laptop = self.login("phone"), self.login("laptop")
+
+        response = self.client_for(phone).post(reverse("auth-logout"), format="json")
+
+        self.assertEqual(response.data, {"revoked": 1})
+        self.assertEqual(self.client_for(phone).get("/api/v1/users/").status_code, 401)
+        self.assertEqual(self.client_for(laptop).get("/api/v1/users/").status_code, 200)
+
+    def test_logout_all_revokes_every_token(self):
+        phone, laptop = self.login("phone"), self.login("laptop")
+
+        response = self.client_for(phone).post(reverse("auth-logout"), {"all": "true"}, format="json")
+
+        self.assertEqual(response.data, {"revoked": 2})
+        self.assertEqual(self.client_for(laptop).get("/api/v1/users/").status_code, 401)
+
+    def test_logout_all_false_is_not_truthy(self):
+        phone, laptop = self.login("phone"), self.login("laptop")
+
+        response = self.client_for(phone).post(reverse("auth-logout"), {"all": "false"}, format="json")
+
+        self.assertEqual(response.data, {"revoked": 1})
+        self.assertEqual(self.client_for(laptop).get("/api/v1/users/").status_code, 200)
+
+    def test_logout_rejects_invalid_all(self):
+        key = self.login()
+
+        response = self.client_for(key).post(reverse("auth-logout"), {"all": "sometimes"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("all", response.data)
+        self.assertEqual(self.client_for(key).get("/api/v1/users/").status_code, 200)
+
+    def test_expired_token_is_rejected_even_when_cached(self):
+        key = self.login()
+        self.assertEqual(self.client_for(key).get("/api/v1/users/").status_code, 200)
+
+        token = AuthToken.objects.get(digest=AuthToken.digest_key(key))
+        AuthToken.objects.filter(pk=token.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        cached_user, cached_token = token_cache.get(token.digest)
+        cached_token.expires_at = timezone.now() - timedelta(seconds=1)
+
+        response = self.client_for(key).get("/api/v1/users/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_revocation_by_another_process_is_picked_up_on_refresh(self):
+        revocations = RevocationSet(refresh_interval=0)
+        first, _ = issue_token(self.user, "phone")
+        second, _ = issue_token(self.user, "laptop")
+        self.assertNotIn(second.digest, revocations)
+
+        # Revogação gravada direto no banco, sem passar por este processo.
+        AuthToken.objects.filter(pk=second.pk).update(revoked_at=timezone.now())
+
+        self.assertIn(second.digest, revocations)
+
+        issue_token(self.user, "phone")
+        self.assertIn(first.digest, revocations)
+
+    def test_expired_revocations_are_pruned(self):
+        revocations = RevocationSet(refresh_interval=0, prune_interval=0)
+        now = timezone.now()
+        revocations.add({"old": now - timedelta(seconds=1), "recent": now + timedelta(hours=1)})
+
+        self.assertNotIn("old", revocations)
+        self.assertIn("recent", revocations)
+
+
+GOOGLE_CLIENT_ID = "client-id.apps.googleusercontent.com"
+
+
+@override_settings(
+    SOCIALACCOUNT_PROVIDERS={"google": {"OAUTH2_CLIENT_ID": GOOGLE_CLIENT_ID}},
+    GOOGLE_ID_TOKEN_AUDIENCES=[],
+)
+class GoogleIdTokenTests(TestCase):
+    """ID tokens assinados com uma chave local; o JWKS do Google é substituído pela chave pública."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def setUp(self):
+        self.provider = HttpIdentityProvider()
+        signing_key = mock.Mock(key=self.private_key.public_key())
+        patcher = mock.patch.object(self.provider.jwks_client, "get_signing_key_from_jwt", return_value=signing_key)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def id_token(self, **overrides):
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": GOOGLE_CLIENT_ID,
+            "sub": "google-uid",
+            "email": "ana@example.com",
+            "email_verified": True,
+            "given_name": "Ana",
+            "family_name": "Souza",
+            "exp": int(time.time()) + 300,
+        }
+        claims.update(overrides)
+        return jwt.encode({key: value for key, value in claims.items() if value is not None}, self.private_key, algorithm="RS256")
+
+    def test_valid_token(self):
+        self.assertEqual(self.provider.google(self.id_token()), {
+            "uid": "google-uid", "email": "ana@example.com", "first_name": "Ana", "last_name": "Souza",
+        })
+
+    def test_rejected_claims(self):
+        cases = {
+            "outro app": {"aud": "other-client-id"},
+            "sem audiência": {"aud": None},
+            "emissor": {"iss": "https://evil.example.com"},
+            "expirado": {"exp": int(time.time()) - 60},
+            "e-mail não verificado": {"email_verified": False},
+            "sem email_verified": {"email_verified": None},
+            "email_verified como texto": {"email_verified": "true"},
+            "sem e-mail": {"email": None},
+        }
+        for label, overrides in cases.items():
+            with self.subTest(label), self.assertRaises(ProviderError):
+                self.provider.google(self.id_token(**overrides))
+
+    def test_missing_audience_refuses_the_login(self):
+        with override_settings(SOCIALACCOUNT_PROVIDERS={"google": {}}, GOOGLE_ID_TOKEN_AUDIENCES=[]):
+            with self.assertLogs("users.providers", "ERROR"), self.assertRaises(ProviderUnavailable):
+                self.provider.google(self.id_token())
+
+    def test_missing_audience_is_reported_by_the_system_check(self):
+        self.assertEqual(google_audience_check(None), [])
+        with override_settings(SOCIALACCOUNT_PROVIDERS={"google": {}}, GOOGLE_ID_TOKEN_AUDIENCES=[]):
+            self.assertEqual([message.id for message in google_audience_check(None)], ["users.W001"])
+
+    def test_extra_audiences(self):
+        with override_settings(GOOGLE_ID_TOKEN_AUDIENCES=["ios-client-id"]):
+            self.assertEqual(self.provider.google(self.id_token(aud="ios-client-id"))["uid"], "google-uid")
+
+
+@override_settings(SOCIAL_AUTH_IDENTITY_PROVIDER="users.providers.StubIdentityProvider", SOCIAL_AUTH_STUB_DELAY=0)
+class SocialLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        revoked_tokens.clear()
+        self.user = User.objects.create_user(username="ana", email="ana@example.com")
+        SocialAccount.objects.create(user=self.user, uid="google-uid", provider="google")
+
+    def test_verified_identities_are_cached(self):
+        with mock.patch.object(StubIdentityProvider, "verify", autospec=True, side_effect=StubIdentityProvider.verify) as verify:
+            first = verify_identity("google", "google-uid:ana@example.com")
+            second = verify_identity("google", "google-uid:ana@example.com")
+
+        self.assertEqual(first, second)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_rejections_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ProviderError):
+                verify_identity("google", "invalid-token")
+
+    def test_login_with_social_account(self):
+        response = APIClient().post(reverse("auth-token"), {"access_token": "google-uid"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AuthToken.objects.get(digest=AuthToken.digest_key(response.data["token"])).user, self.user)
+
+    def test_login_without_social_account(self):
+        response = APIClient().post(reverse("auth-token"), {"facebook_token": "unknown"}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_login_skips_empty_tokens(self):
+        SocialAccount.objects.create(user=self.user, uid="facebook-uid", provider="facebook")
+        response = self.client.post(
+            reverse("auth-token-async"), {"access_token": "", "facebook_token": "facebook-uid"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
@@ -1,19 +1,57 @@
 from django.contrib.auth import get_user_model
-from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate
-from allauth.socialaccount.models import SocialAccount
 from django.utils.translation import gettext_lazy as _
-from rest_framework.permissions import AllowAny
-from users.models import UserReferral
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from users.authentication import issue_token, request_device, revoke_tokens
+from users.models import AuthToken, UserReferral
 from django.db.models import Count
-from life_plan.models import LifePlan
-import requests
+from users.providers import ProviderError, ProviderUnavailable, verify_identity
 
 User = get_user_model()
 
+
+def login_users():
+    """Usuários anotados com a contagem das próprias indicações (sem agregar a tabela inteira)."""
+    return User.objects.annotate(referral_count=Count('referrals_made'))
+
+
+def login_payload(request, user, token, key, referral_count):
+    """Corpo da resposta de login, comum às views síncronas e assíncronas."""
+    image_url = request.build_absolute_uri(user.image.url) if user.image else None
+
+    return {
+        'token': key,
+        'expires_at': token.expires_at,
+        'name': f'{user.first_name} {user.last_name}',
+        'user_type': user.user_type,
+        'plan_name': user.plan,
+        'last_payment': user.last_payment,
+        'payment_made': user.payment_made,
+        'email': user.email,
+        'phone': user.phone,
+        'image_url': image_url,
+        'referral_code': user.referral_code,
+        'referral_count': referral_count
+    }
+
+
+def login_response(request, user):
+    """Emite o token do dispositivo e monta a resposta comum aos três tipos de login."""
+    token, key = issue_token(user, request_device(request))
+    referral_count = getattr(user, 'referral_count', None)
+    if referral_count is None:
+        referral_count = UserReferral.objects.filter(referred_by=user).count()
+    return Response(login_payload(request, user, token, key, referral_count), status=status.HTTP_200_OK)
+
+
+def social_users(provider, uid):
+    """Usuário da conta social, com a contagem de indicações, em uma única consulta."""
+    return login_users().filter(socialaccount__provider=provider, socialaccount__uid=uid)
+
+
 class CombinedLoginView(APIView):
     permission_classes = [AllowAny]
 
@@ -22,113 +60,59 @@ class CombinedLoginView(APIView):
             username = request.data.get('username')
             password = request.data.get('password')
 
-            print(username, password)
             user = authenticate(request, username=username, password=password)
             if user is not None:
-                LifePlan.create_default_plan(user=user)
-                token, created = Token.objects.get_or_create(user=user)
-                image_url = request.build_absolute_uri(user.image.url) if user.image else None
-                referral_count = UserReferral.objects.values('referred_by').annotate(referral_count=Count('referred_user')).aggregate(total_referrals=Count('referred_by'))['total_referrals'] or 0
-
-                return Response({
-                    'token': token.key,
-                    'name': f'{user.first_name} {user.last_name}',
-                    'user_type': user.user_type,
-                    'plan_name': user.plan,
-                    'last_payment': user.last_payment,
-                    'payment_made': user.payment_made,
-                    'email': user.email,
-                    'phone': user.phone,
-                    'image_url': image_url,
-                    'referral_code': user.referral_code,
-                    'referral_count': referral_count
-                }, status=status.HTTP_200_OK)
+                return login_response(request, user)
             else:
                 return Response({"error": _("Invalid credentials")}, status=status.HTTP_401_UNAUTHORIZED)
 
         elif 'access_token' in request.data:
-            access_token = request.data.get('access_token')
-
-            try:
-                response = requests.get(
-                    'https://www.googleapis.com/oauth2/v3/userinfo',
-                    headers={'Authorization': f'Bearer {access_token}'}
-                )
-                user_info = response.json()
-
-                if response.status_code != 200 or 'email' not in user_info:
-                    return Response({'error': 'Failed to retrieve user information from Google.'}, status=status.HTTP_400_BAD_REQUEST)
-
-                social_account = SocialAccount.objects.filter(uid=user_info['sub'], provider='google').first()
-
-                if social_account:
-                    user = social_account.user
-                    LifePlan.create_default_plan(user=user)
-
-                    token, created = Token.objects.get_or_create(user=user)
-                    image_url = request.build_absolute_uri(user.image.url) if user.image else None
-
-                    referral_count = UserReferral.objects.values('referred_by').annotate(referral_count=Count('referred_user')).aggregate(total_referrals=Count('referred_by'))['total_referrals'] or 0
-
-                    return Response({
-                        'token': token.key,
-                        'name': f'{user.first_name} {user.last_name}',
-                        'user_type': user.user_type,
-                        'plan_name': user.plan,
-                        'last_payment': user.last_payment,
-                        'payment_made': user.payment_made,
-                        'email': user.email,
-                        'phone': user.phone,
-                        'image_url': image_url,
-                        'referral_code': user.referral_code,
-                        'referral_count': referral_count
-                    }, status=status.HTTP_200_OK)
-                else:
-                    return Response({'error': 'No social account found for this user'}, status=status.HTTP_404_NOT_FOUND)
-
-            except requests.RequestException as e:
-                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return self.social_login(request, 'google', request.data.get('access_token'))
 
         elif 'facebook_token' in request.data:
-            facebook_token = request.data.get('facebook_token')
-
-            try:
-                response = requests.get(
-                    f'https://graph.facebook.com/me?fields=id,name,email&access_token={facebook_token}'
-                )
-                user_info = response.json()
-
-                if response.status_code != 200 or 'email' not in user_info:
-                    return Response({'error': 'Failed to retrieve user information from Facebook.'}, status=status.HTTP_400_BAD_REQUEST)
-
-                social_account = SocialAccount.objects.filter(uid=user_info['id'], provider='facebook').first()
-
-                if social_account:
-                    user = social_account.user
-                    LifePlan.create_default_plan(user=user)
-
-                    token, created = Token.objects.get_or_create(user=user)
-                    image_url = request.build_absolute_uri(user.image.url) if user.image else None
-
-                    referral_count = UserReferral.objects.values('referred_by').annotate(referral_count=Count('referred_user')).aggregate(total_referrals=Count('referred_by'))['total_referrals'] or 0
-
-                    return Response({
-                        'token': token.key,
-                        'name': f'{user.first_name} {user.last_name}',
-                        'user_type': user.user_type,
-                        'plan_name': user.plan,
-                        'last_payment': user.last_payment,
-                        'payment_made': user.payment_made,
-                        'email': user.email,
-                        'phone': user.phone,
-                        'image_url': image_url,
-                        'referral_code': user.referral_code,
-                        'referral_count': referral_count
-                    }, status=status.HTTP_200_OK)
-                else:
-                    return Response({'error': 'No social account found for this user'}, status=status.HTTP_404_NOT_FOUND)
-
-            except requests.RequestException as e:
-                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-        return Response({"error": _("Invalid login request")}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return self.social_login(request, 'facebook', request.data.get('facebook_token'))
+
+        return Response({"error": _("Invalid login request")}, status=status.HTTP_400_BAD_REQUEST)
+
+    def social_login(self, request, provider, token):
+        try:
+            user_info = verify_identity(provider, str(token or ''))
+        except ProviderUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ProviderError:
+            return Response({'error': f'Failed to retrieve user information from {provider.capitalize()}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = social_users(provider, user_info['uid']).first()
+        if user:
+            return login_response(request, user)
+        else:
+            return Response({'error': 'No social account found for this user'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class LogoutView(APIView):
+    """Revoga o token usado na requisição ou, com `all`, todos os tokens do usuário."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            revoke_all = serializers.BooleanField().to_internal_value(request.data.get('all', False))
+        except serializers.ValidationError as exc:
+            return Response({'all': exc.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        tokens = AuthToken.objects.filter(user=request.user)
+        if not revoke_all and isinstance(request.auth, AuthToken):
+            tokens = tokens.filter(pk=request.auth.pk)
+        revoked = revoke_tokens(tokens)
+        return Response({'revoked': revoked}, status=status.HTTP_200_OK)
+
+
+class RotateTokenView(APIView):
+    """Troca o token usado na requisição por um novo, para o mesmo dispositivo."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.auth, AuthToken):
+            return Response({"error": _("Token authentication required")}, status=status.HTTP_400_BAD_REQUEST)
+
+        token, key = issue_token(request.user, request.auth.device)
+        return Response({'token': key, 'expires_at': token.expires_at}, status=status.HTTP_200_OK)